@@ -5,39 +5,79 @@ Modern REST API for the AI Text Humanizer application
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 from typing import Optional
 import uvicorn
 import tempfile
+import threading
+import importlib.util
+import hmac
 import os
+
+# stripe takes about a second to import, so it is only imported by the
+# payment endpoints (see _stripe)
+STRIPE_AVAILABLE = importlib.util.find_spec("stripe") is not None
+if not STRIPE_AVAILABLE:
+    print("⚠️ Stripe module not available - payment endpoints will be disabled")
+
 try:
-    import stripe
-    STRIPE_AVAILABLE = True
+    from fastapi.responses import ORJSONResponse
+    import orjson  # noqa: F401 - ORJSONResponse needs it at render time
+    FastJSONResponse = ORJSONResponse
 except ImportError:
-    STRIPE_AVAILABLE = False
-    print("⚠️ Stripe module not available - payment endpoints will be disabled")
+    FastJSONResponse = JSONResponse
 
 import json
 from datetime import datetime
 
-# Import our transformer
-from transformer.app import AcademicTextHumanizer, load_spacy_model, download_nltk_resources
+from singleflight import CallerDisconnected, SingleFlight
+from diff_response import RESPONSE_FORMATS, compute_edits
+from engine_router import ENGINE_COST_ORDER, ENGINE_MODULES, EngineRouter
+from jobs import JobRunner, JobStore, COMPLETED, FAILED
+from load_shedding import LoadShedder, Overloaded
+from profiling import RequestProfiler, sample_window
+from shared_cache import make_shared_cache
+from slow_requests import SlowRequestLog
+from traffic import TrafficRecorder
+from upload_limits import (
+    MAX_UPLOAD_BYTES, TIER_LIMITS, BodySizeLimitMiddleware, UploadTooLarge,
+    check_text, format_bytes, limits_for, read_upload_text
+)
+from transformer.parallel import ParallelHumanizer
+from transformer.logging_utils import configure_logging, events
 
-# Download NLTK resources on startup
-download_nltk_resources()
+# Hot-path messages are rate limited and written by a background thread
+# (LOG_LEVEL, LOG_FORMAT=text|json, LOG_RATE_LIMIT_SECONDS, LOG_SAMPLE_RATE)
+configure_logging()
 
-# Initialize Stripe (if available)
+# Stripe settings (if available)
 if STRIPE_AVAILABLE:
-    stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+    STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+    # Points the Stripe client elsewhere, e.g. at benchmarks/stand_ins.py
+    STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_SERVICE_ROLE = os.getenv("SUPABASE_SERVICE_ROLE")
 else:
+    STRIPE_SECRET_KEY = None
     STRIPE_WEBHOOK_SECRET = None
+    STRIPE_API_BASE = None
     SUPABASE_URL = None
     SUPABASE_SERVICE_ROLE = None
 
+def _stripe():
+    """The stripe module, imported and configured on first use"""
+    import stripe
+    if stripe.api_key is None:
+        stripe.api_key = STRIPE_SECRET_KEY
+        if STRIPE_API_BASE:
+            stripe.api_base = STRIPE_API_BASE
+    return stripe
+
 app = FastAPI(
     title="AI Text Humanizer API",
     description="Transform AI-generated text into natural, human-like academic writing",
@@ -46,6 +86,15 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Reject oversized transform bodies before they are buffered or parsed
+# (added before CORS so 413 responses still carry CORS headers)
+MAX_REQUEST_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(MAX_UPLOAD_BYTES)))
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=MAX_REQUEST_BYTES,
+    paths=["/api/transform", "/api/transform-file", "/api/jobs"]
+)
+
 # CORS middleware - allow GitHub Pages
 app.add_middleware(
     CORSMiddleware,
@@ -61,28 +110,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Request/Response models
 class TransformRequest(BaseModel):
     text: str
     use_passive: bool = False
     use_synonyms: bool = False
     seed: Optional[int] = None
+    engine: Optional[str] = None
+    latency_budget_ms: Optional[int] = None
+    tier: Optional[str] = None
+    response_format: str = "full"
 
 class TransformResponse(BaseModel):
     success: bool
-    original_text: str
-    transformed_text: str
+    original_text: Optional[str] = None
+    transformed_text: Optional[str] = None
+    edits: Optional[list] = None
     original_word_count: int
     transformed_word_count: int
     original_sentence_count: int
     transformed_sentence_count: int
     transformations_applied: list
     processing_time: float
+    engine: Optional[str] = None
+    degraded: bool = False
+    partial: bool = False
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    sentences_processed: int
+    sentences_total: Optional[int] = None
+    progress: Optional[float] = None
+    error: Optional[str] = None
+    status_url: str
+    result_url: str
 
 class HealthResponse(BaseModel):
     status: str
     message: str
     version: str
+    engines: Optional[list] = None
 
 class CheckoutRequest(BaseModel):
     price_id: str
@@ -104,22 +177,450 @@ class VerifySessionResponse(BaseModel):
     user_id: str
     amount: float
 
-# Global humanizer instance
-humanizer = None
+class ProfileRequest(BaseModel):
+    requests: int = 1
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the humanizer on startup"""
-    global humanizer
+class SampleProfileRequest(BaseModel):
+    seconds: float = 30.0
+    interval_ms: float = 5.0
+    include_idle: bool = False
+
+# Engines hosted by this process; each request is routed to one of them
+ENABLED_ENGINES = [
+    name.strip() for name in os.getenv("HUMANIZER_ENGINES", "full,fast").split(",") if name.strip()
+]
+engine_router = EngineRouter(
+    default_engine=os.getenv("HUMANIZER_DEFAULT_ENGINE", "full"),
+    fast_budget_ms=int(os.getenv("FAST_ENGINE_BUDGET_MS", "500")),
+    load_threshold=int(os.getenv("ENGINE_LOAD_THRESHOLD", "8"))
+)
+
+# Caches shared by all worker processes for seeded transform results and synonym
+# embeddings: "shm" (shared memory slab), a redis:// URL, "local" (per-process
+# stand-in) or unset to disable
+SHARED_CACHE = os.getenv("SHARED_CACHE", "")
+SHARED_CACHE_NAME = os.getenv("SHARED_CACHE_NAME", "humanizer")
+result_cache = make_shared_cache(
+    SHARED_CACHE,
+    f"{SHARED_CACHE_NAME}_results",
+    size_bytes=int(os.getenv("SHARED_RESULT_CACHE_MB", "64")) * 1024 * 1024,
+    slot_size=256 * 1024
+)
+embedding_cache = make_shared_cache(
+    SHARED_CACHE,
+    f"{SHARED_CACHE_NAME}_embeddings",
+    size_bytes=int(os.getenv("SHARED_EMBEDDING_CACHE_MB", "16")) * 1024 * 1024,
+    slot_size=4096
+)
+
+# Repeated sentences are memoized per engine (0 disables the memo)
+SENTENCE_MEMO_SIZE = int(os.getenv("SENTENCE_MEMO_SIZE", "0"))
+
+# spaCy parses of re-submitted texts are reused (0 disables the parse cache);
+# with PARSE_CACHE_DIR they are also kept on disk as DocBin files
+PARSE_CACHE_KWARGS = {
+    "parse_cache_size": int(os.getenv("PARSE_CACHE_SIZE", "0")),
+    "parse_cache_dir": os.getenv("PARSE_CACHE_DIR") or None,
+}
+
+# A snapshot (python -m transformer.snapshot save <path>) replaces the spaCy
+# and embedding model loading of the full engine; its model settings win
+HUMANIZER_SNAPSHOT = os.getenv("HUMANIZER_SNAPSHOT") or None
+
+# Synonym lookups from a memory-mapped WordNet subset
+# (python -m transformer.wordnet_subset build <path>); without one the NLTK
+# corpus is loaded in the background at startup unless WORDNET_PRELOAD=false
+WORDNET_SUBSET = os.getenv("WORDNET_SUBSET") or None
+WORDNET_PRELOAD = os.getenv("WORDNET_PRELOAD", "true").lower() == "true"
+
+ENGINE_KWARGS = {
+    "full": {
+        "model_name": os.getenv("HUMANIZER_MODEL", "paraphrase-MiniLM-L6-v2"),
+        "quantize": os.getenv("HUMANIZER_QUANTIZE", "false").lower() == "true",
+        "snapshot": HUMANIZER_SNAPSHOT,
+        "wordnet_subset": WORDNET_SUBSET,
+        "preload_wordnet": WORDNET_PRELOAD,
+        "seed": 42,
+        "sentence_memo_size": SENTENCE_MEMO_SIZE,
+        "embedding_cache": embedding_cache,
+        **PARSE_CACHE_KWARGS,
+    },
+    "model_free": {"seed": 42, "sentence_memo_size": SENTENCE_MEMO_SIZE, **PARSE_CACHE_KWARGS},
+    "fast": {"seed": 42},
+}
+
+# Process pool for large file uploads on the default engine
+# (disabled unless HUMANIZER_WORKERS > 0)
+parallel_humanizer = None
+PARALLEL_WORKERS = int(os.getenv("HUMANIZER_WORKERS", "0"))
+PARALLEL_MIN_CHARS = int(os.getenv("PARALLEL_MIN_CHARS", "50000"))
+PARALLEL_CHUNK_CHARS = int(os.getenv("PARALLEL_CHUNK_CHARS", "20000"))
+
+# Engines load in a background thread after the port is bound, so /health
+# answers within milliseconds; requests get a 503 until an engine is loaded.
+# ENGINE_WARMUP=blocking loads everything before the server accepts connections
+ENGINE_WARMUP = os.getenv("ENGINE_WARMUP", "background").lower()
+warmup_state = {"status": "pending", "started_at": None, "finished_at": None}
+
+# Identical in-flight transforms share one execution
+transform_flight = SingleFlight()
+
+# Asynchronous jobs: SQLite metadata plus input/result files, removed after the TTL.
+# Workers sharing JOB_STORE_DIR claim each job once; a running job whose worker
+# stops renewing its lease is picked up again at the next startup
+job_store = JobStore(
+    os.getenv("JOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "humanizer_jobs")),
+    ttl_seconds=int(os.getenv("JOB_TTL_SECONDS", "86400")),
+    lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "60"))
+)
+job_runner = None
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+
+# Transforms stop at this deadline and return a partial result (0 disables)
+TRANSFORM_TIMEOUT_SECONDS = float(os.getenv("TRANSFORM_TIMEOUT_SECONDS", "60"))
+
+# Drops synonyms, then passive voice, when the transform queue or p95 latency
+# passes its threshold, and answers 503 past the last queue depth (0 disables a threshold)
+load_shedder = LoadShedder(
+    synonyms_queue_depth=int(os.getenv("SHED_SYNONYMS_QUEUE_DEPTH", "16")),
+    passive_queue_depth=int(os.getenv("SHED_PASSIVE_QUEUE_DEPTH", "32")),
+    synonyms_p95_ms=int(os.getenv("SHED_SYNONYMS_P95_MS", "0")),
+    passive_p95_ms=int(os.getenv("SHED_PASSIVE_P95_MS", "0")),
+    reject_queue_depth=int(os.getenv("SHED_REJECT_QUEUE_DEPTH", "64")),
+    retry_after_seconds=int(os.getenv("SHED_RETRY_AFTER_SECONDS", "5"))
+)
+
+# Admin endpoints (/admin/...) need this value in the X-Admin-Token header;
+# they answer 404 while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+
+# On-demand profiling: .pstats files for the next N transforms, or collapsed
+# stacks for a sampling window (see profiling.py)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "humanizer_profiles"))
+request_profiler = RequestProfiler(PROFILE_DIR)
+request_profiler.arm(int(os.getenv("PROFILE_NEXT_REQUESTS", "0")))
+
+# Transforms slower than the threshold are kept (without their text) for
+# /admin/slow-requests and optionally appended to a JSONL file
+slow_request_log = SlowRequestLog(
+    threshold_ms=float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "2000")),
+    max_entries=int(os.getenv("SLOW_REQUEST_LOG_SIZE", "200")),
+    path=os.getenv("SLOW_REQUEST_LOG_PATH") or None
+)
+
+# Anonymized request shapes (sizes, options, arrival times) for
+# benchmarks/loadtest.py; off unless TRAFFIC_CAPTURE_PATH is set
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH") or None
+traffic_recorder = None
+if TRAFFIC_CAPTURE_PATH:
+    traffic_recorder = TrafficRecorder(
+        TRAFFIC_CAPTURE_PATH, sample_rate=float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0"))
+    )
+
+def _transform_with_stats(engine, text, use_passive, use_synonyms, seed, allow_parallel=False,
+                          deadline=None, cancel_event=None, progress_callback=None):
+    """Run an engine and compute word/sentence statistics for the result"""
+    if (allow_parallel and parallel_humanizer is not None
+            and engine is engine_router.default() and len(text) >= PARALLEL_MIN_CHARS):
+        return parallel_humanizer.transform_with_stats(
+            text, use_passive, use_synonyms, seed,
+            deadline=deadline, cancel_event=cancel_event, progress_callback=progress_callback
+        )
+
+    return engine.transform_with_stats(
+        text, use_passive, use_synonyms, seed,
+        deadline=deadline, cancel_event=cancel_event, progress_callback=progress_callback
+    )
+
+def _profiled_transform(engine, *args, **kwargs):
+    """
+    _transform_with_stats, profiled while the request profiler is armed.
+    Single-flight only calls this for the caller that starts an execution,
+    so requests that join a running transform do not use up a profile.
+    """
+    profile_sequence = request_profiler.take()
+    if not profile_sequence:
+        return _transform_with_stats(engine, *args, **kwargs)
+    profiled = request_profiler.wrap(_transform_with_stats, f"transform-{engine.name}", profile_sequence)
+    return profiled(engine, *args, **kwargs)
+
+async def _wait_for_disconnect(http_request):
+    """Complete once the client has closed the connection"""
+    import asyncio
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(0.5)
+
+async def _coalesced_transform(engine, text, use_passive, use_synonyms, seed, allow_parallel=False,
+                               http_request=None, trace=None):
+    """
+    Transform text, joining an identical transform if one is already running.
+
+    The run stops at TRANSFORM_TIMEOUT_SECONDS (returning a partial result),
+    or as soon as every client waiting for it has disconnected. trace, if
+    given, receives "result_cache_hit" and "transform_ms" for the slow-request log.
+    """
+    import time
+    import hashlib
+
+    # Seeded results are deterministic, so any worker's earlier result can be reused
+    cache_key = None
+    if result_cache is not None and seed is not None:
+        cache_key = json.dumps([
+            engine.name, use_passive, use_synonyms, seed, allow_parallel,
+            hashlib.sha256(text.encode("utf-8")).hexdigest()
+        ])
+        # Off the event loop: the Redis backend is a blocking client
+        cached = await run_in_threadpool(result_cache.get, cache_key)
+        if cached is not None:
+            if trace is not None:
+                trace["result_cache_hit"] = True
+            return json.loads(cached)
+
+    key = (engine.name, text, use_passive, use_synonyms, seed, allow_parallel)
+    started = time.time()
+    deadline = started + TRANSFORM_TIMEOUT_SECONDS if TRANSFORM_TIMEOUT_SECONDS > 0 else None
+    disconnected = _wait_for_disconnect(http_request) if http_request is not None else None
+    engine_router.in_flight += 1
     try:
-        print("🔄 Initializing AI Text Humanizer...")
-        humanizer = AcademicTextHumanizer(seed=42)
-        print("✅ AI Text Humanizer initialized successfully")
-    except Exception as e:
-        print(f"❌ Error initializing humanizer: {str(e)}")
+        result = await transform_flight.do(
+            key, _profiled_transform, engine, text, use_passive, use_synonyms, seed, allow_parallel, deadline,
+            disconnected=disconnected
+        )
+        if cache_key is not None and not result["partial"]:
+            await run_in_threadpool(result_cache.set, cache_key, json.dumps(result).encode("utf-8"))
+        return result
+    except CallerDisconnected:
+        events.info("client_disconnected", "⚠️ Client disconnected, transform on engine '%s' abandoned", engine.name)
+        raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        engine_router.in_flight -= 1
+        load_shedder.record(time.time() - started)
+        if trace is not None:
+            trace["transform_ms"] = (time.time() - started) * 1000
+
+def _route(engine=None, latency_budget_ms=None, tier=None):
+    """Pick the engine for a request"""
+    if not engine_router.engines and _warming_up():
+        raise HTTPException(
+            status_code=503,
+            detail="Engines are still loading, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    try:
+        # Only an explicit cheap tier routes to the cheapest engine; a missing tier
+        # gets guest size limits but the default engine, as the web frontend sends none
+        chosen, _ = engine_router.route(engine, latency_budget_ms, tier)
+    except KeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown engine '{engine}'. Available engines: {', '.join(engine_router.engines)}"
+        )
+    return chosen
+
+def _shed(use_passive, use_synonyms):
+    """(use_passive, use_synonyms, degraded) allowed at the current load; 503 when overloaded"""
+    try:
+        return load_shedder.apply(use_passive, use_synonyms, engine_router.in_flight)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=e.message, headers={"Retry-After": str(e.retry_after)})
+
+def _build_transform_response(response_format, text, result, engine, use_passive, use_synonyms,
+                              processing_time=0.0, degraded=False):
+    """
+    Build the transform response. With response_format "diff" the texts are
+    replaced by the list of edits that turn the original into the result.
+    """
+    response = TransformResponse(
+        success=True,
+        original_word_count=result["original_word_count"],
+        transformed_word_count=result["transformed_word_count"],
+        original_sentence_count=result["original_sentence_count"],
+        transformed_sentence_count=result["transformed_sentence_count"],
+        transformations_applied=engine.transformations_applied(use_passive, use_synonyms),
+        processing_time=processing_time,
+        engine=engine.name,
+        degraded=degraded,
+        partial=result["partial"]
+    )
+    if response_format == "diff":
+        response.edits = compute_edits(text, result["transformed_text"], use_passive and engine.supports_passive)
+    else:
+        response.original_text = text
+        response.transformed_text = result["transformed_text"]
+    return response
+
+async def _transform_response(response_format, text, result, engine, use_passive, use_synonyms,
+                              start_time, degraded, trace=None):
+    """Build the transform response for a request, diffing off the event loop"""
+    import time
+    args = (response_format, text, result, engine, use_passive, use_synonyms, 0.0, degraded)
+    built = time.time()
+    if response_format == "diff":
+        response = await run_in_threadpool(_build_transform_response, *args)
+    else:
+        response = _build_transform_response(*args)
+    response.processing_time = time.time() - start_time
+    if trace is not None:
+        trace["response_ms"] = (time.time() - built) * 1000
+        _record_slow_request(trace, text, result, engine, use_passive, use_synonyms, response_format,
+                             degraded, response.processing_time * 1000)
+
+    # Serialize directly, skipping the generic encoder, and leave out unused fields
+    return FastJSONResponse(content=response.model_dump(exclude_none=True))
+
+def _record_slow_request(trace, text, result, engine, use_passive, use_synonyms, response_format,
+                         degraded, duration_ms):
+    """Add a transform to the slow-request log if it took at least the threshold"""
+    if not slow_request_log.is_slow(duration_ms):
+        return
+    cache_hit = trace.get("result_cache_hit", False)
+    # A cached result carries the timings of the run that produced it
+    engine_timings = {} if cache_hit else result.get("timings", {})
+    stages_ms = dict(engine_timings.get("stages_ms", {}))
+    for stage in ("transform_ms", "response_ms"):
+        if stage in trace:
+            stages_ms[stage[:-3]] = round(trace[stage], 3)
+    counts = dict(engine_timings.get("counts", {}))
+    counts["result_cache_hit"] = int(cache_hit)
+    slow_request_log.record(
+        trace["endpoint"], duration_ms, text, result,
+        options={
+            "engine": engine.name,
+            "use_passive": use_passive,
+            "use_synonyms": use_synonyms,
+            "requested_passive": trace.get("use_passive"),
+            "requested_synonyms": trace.get("use_synonyms"),
+            "seeded": trace.get("seeded", False),
+            "tier": trace.get("tier"),
+            "response_format": response_format,
+            "degraded": degraded,
+        },
+        timings={"stages_ms": stages_ms, "counts": counts}
+    )
+
+def _run_job(text, options, progress_callback):
+    """Job runner callback: transform a stored job and build its response"""
+    import time
+    started = time.time()
+    engine = engine_router.engines.get(options["engine"])
+    if engine is None:
+        raise RuntimeError(f"Engine '{options['engine']}' is not loaded")
+
+    result = _transform_with_stats(
+        engine, text, options["use_passive"], options["use_synonyms"], options["seed"],
+        allow_parallel=True, progress_callback=progress_callback
+    )
+    response = _build_transform_response(
+        options["response_format"], text, result, engine,
+        options["use_passive"], options["use_synonyms"], time.time() - started
+    )
+    sentences = result["original_sentence_count"]
+    return response.model_dump(exclude_none=True), sentences, sentences
+
+def _check_response_format(response_format):
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown response_format '{response_format}'. Use one of: {', '.join(RESPONSE_FORMATS)}"
+        )
+
+def _fallback_response(text):
+    """Basic fallback transformation used when no engine could be loaded"""
+    events.warning("fallback_transform", "⚠️ Humanizer not available, using basic fallback transformation")
+    return TransformResponse(
+        success=True,
+        original_text=text,
+        transformed_text=text.replace("don't", "do not").replace("can't", "cannot").replace("won't", "will not"),
+        original_word_count=len(text.split()),
+        transformed_word_count=len(text.split()),
+        original_sentence_count=len([s for s in text.split('.') if s.strip()]),
+        transformed_sentence_count=len([s for s in text.split('.') if s.strip()]),
+        transformations_applied=["Basic Contraction Expansion (Fallback)"],
+        processing_time=0.1,
+        engine="fallback"
+    )
+
+def _load_engines():
+    """Load the enabled engines, then start the worker pools"""
+    import time
+    global parallel_humanizer, job_runner
+    warmup_state["status"] = "loading"
+    warmup_state["started_at"] = time.time()
+    # Cheapest engines first, so requests can be served while the others load
+    names = sorted(
+        ENABLED_ENGINES,
+        key=lambda name: ENGINE_COST_ORDER.index(name) if name in ENGINE_COST_ORDER else len(ENGINE_COST_ORDER)
+    )
+    for name in names:
+        if name not in ENGINE_MODULES:
+            print(f"⚠️ Unknown engine '{name}' in HUMANIZER_ENGINES, skipping")
+            continue
+        try:
+            print(f"🔄 Initializing AI Text Humanizer engine: {name}...")
+            engine_router.load(name, ENGINE_KWARGS[name])
+            print(f"✅ Engine '{name}' initialized successfully")
+        except Exception as e:
+            print(f"❌ Error initializing engine '{name}': {str(e)}")
+            # Don't raise the exception - let the API start with the remaining engines
+
+    if not engine_router.engines:
         print("⚠️ API will start but text transformation features may be limited")
-        # Don't raise the exception - let the API start with limited functionality
-        humanizer = None
+
+    default_engine = engine_router.default()
+    if PARALLEL_WORKERS > 0 and default_engine is not None:
+        try:
+            print(f"🔄 Starting {PARALLEL_WORKERS} document workers...")
+            parallel_humanizer = ParallelHumanizer(
+                PARALLEL_WORKERS,
+                module_name=default_engine.module_name,
+                humanizer_kwargs=default_engine.humanizer_kwargs,
+                chunk_chars=PARALLEL_CHUNK_CHARS
+            )
+            parallel_humanizer.warm_up()
+            print("✅ Document workers ready")
+        except Exception as e:
+            print(f"❌ Error starting document workers: {str(e)}")
+            print("⚠️ Large files will be processed in a single thread")
+            parallel_humanizer = None
+
+    # Start the job workers and pick up jobs left by a previous run
+    job_store.cleanup()
+    job_runner = JobRunner(job_store, _run_job, workers=JOB_WORKERS)
+    resumed = job_runner.resume()
+    if resumed:
+        print(f"🔄 Resumed {resumed} unfinished jobs")
+
+    warmup_state["status"] = "ready"
+    warmup_state["finished_at"] = time.time()
+    print(f"✅ Warm-up finished in {warmup_state['finished_at'] - warmup_state['started_at']:.2f}s")
+
+def _warming_up():
+    return warmup_state["status"] != "ready"
+
+def _require_admin(http_request):
+    """404 unless ADMIN_TOKEN is set and sent in the X-Admin-Token header"""
+    token = http_request.headers.get("X-Admin-Token", "")
+    if ADMIN_TOKEN is None or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.on_event("startup")
+async def startup_event():
+    """Load the engines, in the background unless ENGINE_WARMUP=blocking"""
+    if ENGINE_WARMUP == "blocking":
+        _load_engines()
+    else:
+        threading.Thread(target=_load_engines, name="engine-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the document and job worker pools"""
+    if parallel_humanizer is not None:
+        parallel_humanizer.shutdown()
+    if job_runner is not None:
+        job_runner.shutdown()
+    if traffic_recorder is not None:
+        traffic_recorder.close()
+    slow_request_log.close()
 
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -132,183 +633,254 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check; answers while the engines are still loading"""
+    if _warming_up():
+        return HealthResponse(
+            status="starting",
+            message="Engines are loading",
+            version="2.0.0",
+            engines=list(engine_router.engines)
+        )
     return HealthResponse(
         status="healthy",
         message="All systems operational",
-        version="2.0.0"
+        version="2.0.0",
+        engines=list(engine_router.engines)
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until engine warm-up has finished"""
+    if _warming_up():
+        return JSONResponse(
+            status_code=503,
+            content={"status": warmup_state["status"], "engines": list(engine_router.engines)}
+        )
+    return {
+        "status": "ready",
+        "engines": list(engine_router.engines),
+        "warmup_seconds": round(warmup_state["finished_at"] - warmup_state["started_at"], 3)
+    }
+
 @app.post("/api/transform", response_model=TransformResponse)
-async def transform_text(request: TransformRequest):
+async def transform_text(request: TransformRequest, http_request: Request):
     """Transform text using AI Text Humanizer"""
     import time
     start_time = time.time()
     
     try:
-        if not humanizer:
-            # Provide a basic fallback transformation if humanizer is not available
-            print("⚠️ Humanizer not available, using basic fallback transformation")
-            return TransformResponse(
-                success=True,
-                original_text=request.text,
-                transformed_text=request.text.replace("don't", "do not").replace("can't", "cannot").replace("won't", "will not"),
-                original_word_count=len(request.text.split()),
-                transformed_word_count=len(request.text.split()),
-                original_sentence_count=len([s for s in request.text.split('.') if s.strip()]),
-                transformed_sentence_count=len([s for s in request.text.split('.') if s.strip()]),
-                transformations_applied=["Basic Contraction Expansion (Fallback)"],
-                processing_time=0.1
-            )
+        _check_response_format(request.response_format)
+        engine = _route(request.engine, request.latency_budget_ms, request.tier)
+        if engine is None:
+            # Provide a basic fallback transformation if no engine is available
+            return _fallback_response(request.text)
         
         if not request.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
+
+        try:
+            check_text(request.text, limits_for(request.tier))
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=e.message)
+
+        # Only requests that passed validation are captured as replayable traffic
+        if traffic_recorder is not None:
+            traffic_recorder.record(
+                "/api/transform", request.text, request.use_passive, request.use_synonyms, request.seed,
+                request.engine, request.tier, request.latency_budget_ms, request.response_format,
+                ts=start_time
+            )
         
-        # Set seed if provided
-        if request.seed:
-            import random
-            random.seed(request.seed)
+        # Under load, drop the expensive options before transforming
+        use_passive, use_synonyms, degraded = _shed(request.use_passive, request.use_synonyms)
         
-        # Transform the text
-        transformed_text = humanizer.humanize_text(
+        # Transform the text (identical concurrent requests share one run)
+        trace = {
+            "endpoint": "/api/transform", "tier": request.tier, "seeded": request.seed is not None,
+            "use_passive": request.use_passive, "use_synonyms": request.use_synonyms
+        }
+        result = await _coalesced_transform(
+            engine,
             request.text,
-            use_passive=request.use_passive,
-            use_synonyms=request.use_synonyms
+            use_passive,
+            use_synonyms,
+            request.seed,
+            http_request=http_request,
+            trace=trace
         )
         
-        # Calculate statistics
-        from nltk.tokenize import word_tokenize
-        nlp = load_spacy_model()
-        
-        original_word_count = len(word_tokenize(request.text, language='english', preserve_line=True))
-        transformed_word_count = len(word_tokenize(transformed_text, language='english', preserve_line=True))
-        
-        doc_original = nlp(request.text)
-        doc_transformed = nlp(transformed_text)
-        original_sentence_count = len(list(doc_original.sents))
-        transformed_sentence_count = len(list(doc_transformed.sents))
-        
-        # Track transformations applied
-        transformations = ["Contraction Expansion"]
-        if request.use_passive:
-            transformations.append("Passive Voice")
-        if request.use_synonyms:
-            transformations.append("Synonym Replacement")
-        transformations.append("Academic Transitions")
-        
-        processing_time = time.time() - start_time
-        
-        return TransformResponse(
-            success=True,
-            original_text=request.text,
-            transformed_text=transformed_text,
-            original_word_count=original_word_count,
-            transformed_word_count=transformed_word_count,
-            original_sentence_count=original_sentence_count,
-            transformed_sentence_count=transformed_sentence_count,
-            transformations_applied=transformations,
-            processing_time=processing_time
+        return await _transform_response(
+            request.response_format, request.text, result, engine, use_passive, use_synonyms,
+            start_time, degraded, trace
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transformation failed: {str(e)}")
 
 @app.post("/api/transform-file")
 async def transform_file(
+    http_request: Request,
     file: UploadFile = File(...),
     use_passive: bool = Form(False),
     use_synonyms: bool = Form(False),
-    seed: Optional[int] = Form(None)
+    seed: Optional[int] = Form(None),
+    engine: Optional[str] = Form(None),
+    latency_budget_ms: Optional[int] = Form(None),
+    tier: Optional[str] = Form(None),
+    response_format: str = Form("full")
 ):
     """Transform text from uploaded file"""
     import time
     start_time = time.time()
     
     try:
-        if not humanizer:
-            # Provide a basic fallback transformation if humanizer is not available
-            print("⚠️ Humanizer not available, using basic fallback transformation")
-            if not file.filename.endswith('.txt'):
-                raise HTTPException(status_code=400, detail="Only .txt files are supported")
-            
-            content = await file.read()
-            text = content.decode('utf-8', errors='ignore')
-            
-            if not text.strip():
-                raise HTTPException(status_code=400, detail="File is empty")
-            
-            return TransformResponse(
-                success=True,
-                original_text=text,
-                transformed_text=text.replace("don't", "do not").replace("can't", "cannot").replace("won't", "will not"),
-                original_word_count=len(text.split()),
-                transformed_word_count=len(text.split()),
-                original_sentence_count=len([s for s in text.split('.') if s.strip()]),
-                transformed_sentence_count=len([s for s in text.split('.') if s.strip()]),
-                transformations_applied=["Basic Contraction Expansion (Fallback)"],
-                processing_time=0.1
-            )
-        
+        _check_response_format(response_format)
+        chosen = _route(engine, latency_budget_ms, tier)
+
         # Validate file type
         if not file.filename.endswith('.txt'):
             raise HTTPException(status_code=400, detail="Only .txt files are supported")
         
-        # Read file content
-        content = await file.read()
-        text = content.decode('utf-8', errors='ignore')
+        # The form is already spooled (only MAX_UPLOAD_BYTES applies before that); decode
+        # the file in chunks, stopping as soon as the tier's limits are passed
+        try:
+            text = await read_upload_text(file, limits_for(tier))
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=e.message)
         
         if not text.strip():
             raise HTTPException(status_code=400, detail="File is empty")
+
+        # Only requests that passed validation are captured as replayable traffic
+        if traffic_recorder is not None:
+            traffic_recorder.record(
+                "/api/transform-file", text, use_passive, use_synonyms, seed,
+                engine, tier, latency_budget_ms, response_format, ts=start_time
+            )
+
+        if chosen is None:
+            # Provide a basic fallback transformation if no engine is available
+            return _fallback_response(text)
         
-        # Set seed if provided
-        if seed:
-            import random
-            random.seed(seed)
+        # Under load, drop the expensive options before transforming
+        trace = {
+            "endpoint": "/api/transform-file", "tier": tier, "seeded": seed is not None,
+            "use_passive": use_passive, "use_synonyms": use_synonyms
+        }
+        use_passive, use_synonyms, degraded = _shed(use_passive, use_synonyms)
         
-        # Transform the text
-        transformed_text = humanizer.humanize_text(
-            text,
-            use_passive=use_passive,
-            use_synonyms=use_synonyms
+        # Transform the text (identical concurrent uploads share one run);
+        # large documents are split into chunks across the worker pool
+        result = await _coalesced_transform(
+            chosen, text, use_passive, use_synonyms, seed, allow_parallel=True, http_request=http_request,
+            trace=trace
         )
         
-        # Calculate statistics
-        from nltk.tokenize import word_tokenize
-        nlp = load_spacy_model()
-        
-        original_word_count = len(word_tokenize(text, language='english', preserve_line=True))
-        transformed_word_count = len(word_tokenize(transformed_text, language='english', preserve_line=True))
-        
-        doc_original = nlp(text)
-        doc_transformed = nlp(transformed_text)
-        original_sentence_count = len(list(doc_original.sents))
-        transformed_sentence_count = len(list(doc_transformed.sents))
-        
-        # Track transformations applied
-        transformations = ["Contraction Expansion"]
-        if use_passive:
-            transformations.append("Passive Voice")
-        if use_synonyms:
-            transformations.append("Synonym Replacement")
-        transformations.append("Academic Transitions")
-        
-        processing_time = time.time() - start_time
-        
-        return TransformResponse(
-            success=True,
-            original_text=text,
-            transformed_text=transformed_text,
-            original_word_count=original_word_count,
-            transformed_word_count=transformed_word_count,
-            original_sentence_count=original_sentence_count,
-            transformed_sentence_count=transformed_sentence_count,
-            transformations_applied=transformations,
-            processing_time=processing_time
+        return await _transform_response(
+            response_format, text, result, chosen, use_passive, use_synonyms, start_time, degraded, trace
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File transformation failed: {str(e)}")
 
+def _job_response(job):
+    """Status payload for a job row"""
+    total = job["sentences_total"]
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        sentences_processed=job["sentences_processed"],
+        sentences_total=total,
+        progress=min(1.0, job["sentences_processed"] / total) if total else None,
+        error=job["error"],
+        status_url=f"/api/jobs/{job['id']}",
+        result_url=f"/api/jobs/{job['id']}/result"
+    )
+
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+async def create_job(http_request: Request):
+    """
+    Queue a transform and return its job id right away. Accepts the
+    /api/transform JSON body, or a multipart .txt upload with the
+    /api/transform-file form fields.
+    """
+    if job_runner is None:
+        if _warming_up():
+            raise HTTPException(
+                status_code=503,
+                detail="Engines are still loading, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+
+    try:
+        if http_request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await http_request.form()
+            file = form.get("file")
+            if file is None or isinstance(file, str):
+                raise HTTPException(status_code=400, detail="Missing file")
+            if not file.filename.endswith('.txt'):
+                raise HTTPException(status_code=400, detail="Only .txt files are supported")
+            options = TransformRequest.model_validate({**{k: v for k, v in form.items() if k != "file"}, "text": ""})
+            options.text = await read_upload_text(file, limits_for(options.tier))
+        else:
+            try:
+                body = await http_request.json()
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid JSON body")
+            options = TransformRequest.model_validate(body)
+            check_text(options.text, limits_for(options.tier))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=e.message)
+
+    if not options.text.strip():
+        raise HTTPException(status_code=400, detail="Text cannot be empty")
+    _check_response_format(options.response_format)
+
+    engine = _route(options.engine, options.latency_budget_ms, options.tier)
+    if engine is None:
+        raise HTTPException(status_code=503, detail="No transformation engine is available")
+
+    job_id = await run_in_threadpool(job_store.create, options.text, {
+        "engine": engine.name,
+        "use_passive": options.use_passive,
+        "use_synonyms": options.use_synonyms,
+        "seed": options.seed,
+        "response_format": options.response_format,
+    })
+    job_runner.submit(job_id)
+    await run_in_threadpool(job_store.maybe_cleanup)
+
+    return _job_response(await run_in_threadpool(job_store.get, job_id))
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Job status, with progress in sentences processed"""
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Transform response of a completed job"""
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed: {job['error']}")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return Response(content=await run_in_threadpool(job_store.load_result, job_id), media_type="application/json")
+
 @app.get("/api/features")
 async def get_features():
     """Get available transformation features"""
@@ -349,20 +921,79 @@ async def get_stats():
         "status": "operational",
         "features": 4,
         "supported_formats": [".txt"],
-        "max_file_size": "10MB",
+        "max_file_size": format_bytes(MAX_REQUEST_BYTES),
+        "tier_limits": {
+            name: {"max_file_size": format_bytes(limit.max_bytes), "max_words": limit.max_words}
+            for name, limit in TIER_LIMITS.items()
+        },
         "processing_engines": [
             "spaCy 3.8.4",
             "NLTK 3.9.1", 
             "Sentence Transformers 3.4.1"
-        ]
+        ],
+        "coalescing": transform_flight.stats(),
+        "engines": engine_router.stats(),
+        "load_shedding": load_shedder.stats(),
+        "jobs": job_store.counts(),
+        "log_events": events.stats(),
+        "slow_requests": slow_request_log.stats(),
+        "traffic_capture": traffic_recorder.stats() if traffic_recorder is not None else None,
+        "shared_cache": {
+            "results": result_cache.stats() if result_cache is not None else None,
+            "embeddings": embedding_cache.stats() if embedding_cache is not None else None
+        }
     }
 
 
+@app.post("/admin/profile")
+async def profile_next_requests(request: ProfileRequest, http_request: Request):
+    """Profile the next N transforms with cProfile (.pstats files in PROFILE_DIR)"""
+    _require_admin(http_request)
+    if not 0 <= request.requests <= 1000:
+        raise HTTPException(status_code=400, detail="requests must be between 0 and 1000")
+    return {"remaining": request_profiler.arm(request.requests), "directory": PROFILE_DIR}
+
+@app.post("/admin/profile/sample")
+async def profile_sampling_window(request: SampleProfileRequest, http_request: Request):
+    """Sample every thread's stack for a window and write collapsed stacks to PROFILE_DIR"""
+    import time
+    _require_admin(http_request)
+    if not 0 < request.seconds <= 600 or not 1 <= request.interval_ms <= 1000:
+        raise HTTPException(status_code=400, detail="seconds must be in (0, 600] and interval_ms in [1, 1000]")
+    path = os.path.join(PROFILE_DIR, f"sample-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed")
+    sample_window(request.seconds, path, interval=request.interval_ms / 1000, include_idle=request.include_idle)
+    return {"path": path, "seconds": request.seconds}
+
+@app.get("/admin/slow-requests")
+async def slow_requests(http_request: Request, limit: int = 50):
+    """Slowest recent transforms: sizes, options, stage timings and cache hits, newest first"""
+    _require_admin(http_request)
+    return {
+        **slow_request_log.stats(),
+        "path": slow_request_log.path,
+        "entries": slow_request_log.entries(limit)
+    }
+
+@app.get("/admin/profile")
+async def profile_status(http_request: Request):
+    """Requests still to be profiled and the latest profile files"""
+    _require_admin(http_request)
+    status = request_profiler.status()
+    status["directory"] = PROFILE_DIR
+    if os.path.isdir(PROFILE_DIR):
+        status["files"] = sorted(
+            os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)
+            if name.endswith((".pstats", ".collapsed"))
+        )[-50:]
+    return status
+
+
 # Add Stripe endpoints only if Stripe is available
 if STRIPE_AVAILABLE:
     @app.post("/api/create-checkout-session", response_model=CheckoutResponse)
     async def create_checkout_session(request: CheckoutRequest):
         """Create a Stripe Checkout session"""
+        stripe = _stripe()
         try:
             # Create checkout session
             checkout_session = stripe.checkout.Session.create(
@@ -395,6 +1026,7 @@ if STRIPE_AVAILABLE:
     @app.post("/api/verify-session", response_model=VerifySessionResponse)
     async def verify_session(request: VerifySessionRequest):
         """Verify a Stripe checkout session"""
+        stripe = _stripe()
         try:
             # Retrieve the session from Stripe
             session = stripe.checkout.Session.retrieve(request.session_id)
@@ -422,6 +1054,7 @@ if STRIPE_AVAILABLE:
     @app.post("/api/stripe-webhook")
     async def stripe_webhook(request: Request):
         """Handle Stripe webhook events"""
+        stripe = _stripe()
         try:
             payload = await request.body()
             sig_header = request.headers.get('stripe-signature')
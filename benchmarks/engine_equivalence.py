@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Differential equivalence harness for the humanizer engines
+
+Runs the reference engine and each candidate engine over a corpus, with fixed
+seeds and every passive/synonym combination, and reports per candidate:
+
+  - exact-match rate against the reference, overall and per option combination
+  - divergence: 1 - word-level similarity (difflib) to the reference output,
+    mean and max, for stages that are allowed to differ
+  - total time and speed-up over the reference
+
+The reference is benchmarks/reference_app.py, an unmodified copy of
+transformer/app.py from before the engine optimizations: NLTK tagging, one
+encode and cos_sim call per replaced word, and the global random module.
+Keep it pinned, so every candidate is measured against the original output.
+
+Candidates marked "exact" (the current defaults, per-sentence scoring,
+caches, snapshots, the WordNet subset) must reproduce the reference output
+for every case. Candidates marked "bounded" (spaCy tag reuse, the sentence
+memo, the model-free and fast engines, quantized and static vectors, and the
+deployment copies) tag, draw random numbers or pick synonyms differently, so
+their mean divergence must stay within --max-divergence instead.
+
+The reference and the deployment copies (hf-deployment*/transformer*/app.py,
+hf-deployment*/transformer_app.py) only use the global random module and run
+after random.seed(seed). The engines in transformer/ take an explicit rng and
+get random.Random(seed), which draws the same sequence.
+
+Usage (from the repository root):
+
+    python benchmarks/engine_equivalence.py
+    python benchmarks/engine_equivalence.py --corpus samples/ --seeds 1 2 3 --max-divergence 0.2
+    python benchmarks/engine_equivalence.py --snapshot humanizer.snapshot --wordnet-subset wordnet_subset.bin
+
+Exits with status 1 if a candidate fails its check. Candidates that cannot
+be loaded here (missing models or data) are reported as skipped. The exact
+cases among the transformer/ engines also run as tests in
+test_engine_equivalence.py.
+"""
+
+import gc
+import os
+import sys
+import glob
+import time
+import random
+import difflib
+import argparse
+import importlib
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_ENGINE = os.path.join(REPO_ROOT, "benchmarks", "reference_app.py")
+sys.path.insert(0, REPO_ROOT)
+
+OPTION_COMBINATIONS = [(False, False), (True, False), (False, True), (True, True)]
+COMBINATION_LABELS = ["plain", "passive", "synonyms", "both"]
+
+# Used when no --corpus is given: informal prose with contractions, passive
+# voice candidates and words WordNet has synonyms for
+DEFAULT_CORPUS = [
+    "I don't think the committee has read the report yet. It's a good idea to wait. "
+    "The researchers collected the samples in the spring, and they're happy with the results.",
+    "We can't ignore the big problem. The team analyzed the data using a new model. "
+    "Most participants didn't notice the change, but the effect is important.",
+    "The students wrote a detailed summary of the experiment. It isn't perfect, but it's a good start. "
+    "You'll see that the idea works in small groups and in large ones.",
+    "The board approved the new budget after a long discussion. They won't change it this year. "
+    "The author describes the method in the second chapter, and the reviewers liked it.",
+    "Our quick analysis shows a strong trend.\n\nThe dog chased the cat across the yard. "
+    "I'd say the result is clear, though we haven't tested every case.",
+    "This approach is easy to use. The software processes thousands of documents every day. "
+    "Users shouldn't have to wait, and the interface mustn't get in the way.",
+]
+
+
+def run_with_rng(humanizer, text, use_passive, use_synonyms, seed):
+    return humanizer.humanize_text(text, use_passive=use_passive, use_synonyms=use_synonyms,
+                                   rng=random.Random(seed))
+
+
+def run_with_global_seed(humanizer, text, use_passive, use_synonyms, seed):
+    random.seed(seed)
+    return humanizer.humanize_text(text, use_passive=use_passive, use_synonyms=use_synonyms)
+
+
+class Candidate:
+    """
+    An engine configuration to compare with the reference.
+
+    Args:
+        name: Label in the report
+        expect: "exact" or "bounded"
+        load: Callable returning the humanizer
+        run: run_with_rng or run_with_global_seed
+    """
+
+    def __init__(self, name, expect, load, run=run_with_rng):
+        self.name = name
+        self.expect = expect
+        self.load = load
+        self.run = run
+
+
+def _full_engine(**kwargs):
+    from transformer.app import AcademicTextHumanizer, download_nltk_resources
+    download_nltk_resources()
+    return AcademicTextHumanizer(**kwargs)
+
+
+def _module_engine(module_name, **kwargs):
+    module = importlib.import_module(module_name)
+    module.download_nltk_resources()
+    return module.AcademicTextHumanizer(**kwargs)
+
+
+def _file_engine(path):
+    """Imports an engine copy from its file under a unique module name."""
+    name = "equivalence_" + os.path.relpath(path, REPO_ROOT).replace(os.sep, "_").replace("-", "_")[:-3]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.download_nltk_resources()
+    return module.AcademicTextHumanizer()
+
+
+def deployment_copies():
+    """Paths of the engine copies shipped with the deployment folders."""
+    patterns = ["hf-deployment*/transformer*/app.py", "hf-deployment*/transformer_app.py"]
+    return sorted({path for pattern in patterns for path in glob.glob(os.path.join(REPO_ROOT, pattern))})
+
+
+def build_candidates(args):
+    from shared_cache import LocalCache
+
+    candidates = [
+        Candidate("default", "exact", _full_engine),
+        Candidate("unbatched", "exact", lambda: _full_engine(batch_synonym_scoring=False)),
+        Candidate("spacy_tags", "bounded", lambda: _full_engine(pos_tagger="spacy")),
+        Candidate("parse_cache", "exact", lambda: _full_engine(parse_cache_size=64)),
+        Candidate("embedding_cache", "exact", lambda: _full_engine(embedding_cache=LocalCache())),
+        Candidate("sentence_memo", "bounded", lambda: _full_engine(sentence_memo_size=1024)),
+        Candidate("model_free", "bounded", lambda: _module_engine("transformer.app_no_models")),
+        Candidate("fast", "bounded", lambda: _module_engine("transformer.app_fast")),
+    ]
+    if args.quantize:
+        candidates.append(Candidate("quantized", "bounded", lambda: _full_engine(quantize=True)))
+    if args.wordnet_subset:
+        candidates.append(Candidate(
+            "wordnet_subset", "exact", lambda: _full_engine(wordnet_subset=args.wordnet_subset)
+        ))
+    if args.static_vectors:
+        candidates.append(Candidate(
+            "static_vectors", "bounded", lambda: _full_engine(model_name=f"static:{args.static_vectors}")
+        ))
+    if args.snapshot:
+        from transformer.app import AcademicTextHumanizer
+        candidates.append(Candidate(
+            "snapshot", "exact",
+            lambda: AcademicTextHumanizer.from_snapshot(args.snapshot)
+        ))
+    for path in deployment_copies():
+        candidates.append(Candidate(
+            os.path.relpath(path, REPO_ROOT), "bounded", lambda path=path: _file_engine(path), run_with_global_seed
+        ))
+    if args.candidates:
+        candidates = [c for c in candidates if c.name in args.candidates]
+    return candidates
+
+
+def load_corpus(paths):
+    if not paths:
+        return list(DEFAULT_CORPUS)
+    texts = []
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "*.txt"))) if os.path.isdir(path) else [path]
+        for file_path in files:
+            with open(file_path, encoding="utf-8") as f:
+                texts.append(f.read())
+    return texts
+
+
+def run_cases(humanizer, run, corpus, seeds):
+    """(outputs keyed by case, seconds). A case is (text index, seed, combination index)."""
+    # Untimed first call, so lazy loading does not count against the engine
+    run(humanizer, corpus[0], True, True, seeds[0])
+
+    outputs = {}
+    started = time.perf_counter()
+    for i, text in enumerate(corpus):
+        for seed in seeds:
+            for c, (use_passive, use_synonyms) in enumerate(OPTION_COMBINATIONS):
+                try:
+                    outputs[(i, seed, c)] = run(humanizer, text, use_passive, use_synonyms, seed)
+                except Exception as e:
+                    outputs[(i, seed, c)] = f"<error: {type(e).__name__}: {e}>"
+    return outputs, time.perf_counter() - started
+
+
+def divergence(reference, output):
+    """1 - word-level similarity; 0.0 for identical outputs."""
+    if reference == output:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, reference.split(), output.split(), autojunk=False)
+    return 1.0 - matcher.ratio()
+
+
+def compare(candidate, outputs, seconds, reference_outputs, reference_seconds, max_divergence):
+    cases = sorted(reference_outputs)
+    divergences = [divergence(reference_outputs[case], outputs[case]) for case in cases]
+    exact = [reference_outputs[case] == outputs[case] for case in cases]
+
+    per_combination = []
+    for c in range(len(OPTION_COMBINATIONS)):
+        matches = [match for case, match in zip(cases, exact) if case[2] == c]
+        per_combination.append(sum(matches) / len(matches))
+
+    mean_divergence = sum(divergences) / len(divergences)
+    if candidate.expect == "exact":
+        passed = all(exact)
+    else:
+        passed = mean_divergence <= max_divergence
+
+    first_mismatch = next((case for case, match in zip(cases, exact) if not match), None)
+    return {
+        "name": candidate.name,
+        "expect": candidate.expect,
+        "exact_rate": sum(exact) / len(exact),
+        "per_combination": per_combination,
+        "mean_divergence": mean_divergence,
+        "max_divergence": max(divergences),
+        "seconds": seconds,
+        "speedup": reference_seconds / seconds if seconds else None,
+        "passed": passed,
+        "first_mismatch": first_mismatch,
+    }
+
+
+def format_report(results, skipped, reference_seconds, cases, max_divergence):
+    lines = [
+        "# Engine equivalence",
+        "",
+        f"{cases} cases per engine (texts x seeds x {len(OPTION_COMBINATIONS)} option combinations). "
+        f"Reference: benchmarks/reference_app.py, {reference_seconds:.3f}s. Bounded engines pass with a mean "
+        f"divergence of at most {max_divergence:.2f}.",
+        "",
+        "| Engine | Expect | Exact | " + " | ".join(COMBINATION_LABELS)
+        + " | Mean div. | Max div. | Time | Speed-up | Result |",
+        "|--------|--------|-------|" + "|".join("---" for _ in COMBINATION_LABELS)
+        + "|-----------|----------|------|----------|--------|",
+    ]
+    for r in results:
+        speedup = f"{r['speedup']:.2f}x" if r["speedup"] else "-"
+        lines.append(
+            f"| `{r['name']}` | {r['expect']} | {r['exact_rate']:.0%} | "
+            + " | ".join(f"{rate:.0%}" for rate in r["per_combination"])
+            + f" | {r['mean_divergence']:.3f} | {r['max_divergence']:.3f} | {r['seconds']:.3f}s | {speedup} | "
+            + ("✅ pass" if r["passed"] else "❌ fail") + " |"
+        )
+    for name, reason in skipped:
+        lines.append(f"| `{name}` | - | - | " + " | ".join("-" for _ in COMBINATION_LABELS)
+                     + f" | - | - | - | - | skipped: {reason} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare optimized engines with the reference humanizer")
+    parser.add_argument("--corpus", nargs="+", help=".txt files or directories of them (default: built-in)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[1, 2, 3])
+    parser.add_argument("--max-divergence", type=float, default=0.25,
+                        help="Largest mean divergence accepted for bounded engines")
+    parser.add_argument("--candidates", nargs="+", help="Only compare these engines (names from the report)")
+    parser.add_argument("--snapshot", help="Also compare a humanizer loaded from this snapshot")
+    parser.add_argument("--wordnet-subset", help="Also compare the full engine using this WordNet subset")
+    parser.add_argument("--static-vectors", help="Also compare the full engine with this static vector table")
+    parser.add_argument("--quantize", action="store_true", help="Also compare the int8-quantized model")
+    parser.add_argument("--show-mismatch", action="store_true", help="Print the first mismatch per engine")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print(f"🧪 Comparing engines on {len(corpus)} texts, seeds {args.seeds}")
+
+    print("🔄 Running the reference engine...")
+    reference = _file_engine(REFERENCE_ENGINE)
+    reference_outputs, reference_seconds = run_cases(reference, run_with_global_seed, corpus, args.seeds)
+    del reference
+    gc.collect()
+
+    results = []
+    skipped = []
+    for candidate in build_candidates(args):
+        print(f"🔄 {candidate.name}...")
+        try:
+            humanizer = candidate.load()
+        except Exception as e:
+            print(f"⚠️ Skipping {candidate.name}: {type(e).__name__}: {e}")
+            skipped.append((candidate.name, f"{type(e).__name__}: {str(e).splitlines()[0][:80] if str(e) else ''}"))
+            continue
+        outputs, seconds = run_cases(humanizer, candidate.run, corpus, args.seeds)
+        del humanizer
+        gc.collect()
+
+        result = compare(candidate, outputs, seconds, reference_outputs, reference_seconds, args.max_divergence)
+        results.append(result)
+        if args.show_mismatch and result["first_mismatch"] is not None:
+            case = result["first_mismatch"]
+            print(f"   first mismatch (text {case[0]}, seed {case[1]}, {COMBINATION_LABELS[case[2]]}):")
+            print(f"   reference: {reference_outputs[case]}")
+            print(f"   {candidate.name}: {outputs[case]}")
+
+    cases = len(corpus) * len(args.seeds) * len(OPTION_COMBINATIONS)
+    report = format_report(results, skipped, reference_seconds, cases, args.max_divergence)
+    print()
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+    failed = [r["name"] for r in results if not r["passed"]]
+    if failed:
+        print(f"❌ Output changed beyond the allowed bounds: {', '.join(failed)}")
+        sys.exit(1)
+    print("✅ All compared engines are within bounds")
+
+
+if __name__ == "__main__":
+    main()
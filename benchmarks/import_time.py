@@ -0,0 +1,190 @@
+"""
+Import-time and startup benchmark
+
+Measures, in fresh interpreters:
+  - wall-clock import time of the API and engine modules (median of --runs),
+    with the slowest direct imports from python -X importtime
+  - seconds from launching uvicorn until /health answers, and until /ready
+    reports that the engines finished loading
+
+Usage (from the repository root):
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --runs 10 --budget 1.0 --output benchmarks/import_time.md
+
+With --budget, exits with status 1 if a module import or the time to /health
+exceeds that many seconds.
+"""
+
+import os
+import sys
+import time
+import socket
+import platform
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["api_main", "transformer.app", "transformer.app_no_models", "transformer.app_fast"]
+
+_TIMED_IMPORT = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "sys.stdout.write(repr(time.perf_counter() - started))\n"
+)
+
+
+def _run_python(args, env=None):
+    return subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=300
+    )
+
+
+def measure_import(module, runs=5):
+    """Median wall-clock seconds to import module in a fresh interpreter."""
+    timings = []
+    for _ in range(runs):
+        result = _run_python(["-c", _TIMED_IMPORT.format(module=module)])
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def slowest_imports(module, limit=8):
+    """
+    (cumulative seconds, name) of the slowest direct imports of module,
+    from python -X importtime.
+    """
+    result = _run_python(["-X", "importtime", "-c", f"import {module}"])
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Names are indented two spaces per level below the module itself
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            entries.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(entries, reverse=True)[:limit]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def measure_startup(timeout=300):
+    """
+    Seconds from launching uvicorn until /health answers 200 and until
+    /ready answers 200 (None if it did not within timeout).
+    """
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    started = time.perf_counter()
+    health = ready = None
+    try:
+        while time.perf_counter() - started < timeout and process.poll() is None:
+            if health is None and _status(f"{base}/health") == 200:
+                health = time.perf_counter() - started
+            if health is not None and _status(f"{base}/ready") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.02)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return health, ready
+
+
+def _format_seconds(value):
+    return "-" if value is None else f"{value:.3f}s"
+
+
+def build_report(modules, runs, startup):
+    lines = [
+        "# Import-time benchmark",
+        "",
+        f"Python {platform.python_version()} on {platform.system()} {platform.machine()}, "
+        f"median of {runs} fresh interpreters. Generated by `python benchmarks/import_time.py`.",
+        "",
+        "| Module | Import time |",
+        "|--------|-------------|",
+    ]
+    imports = {}
+    for module in modules:
+        imports[module] = measure_import(module, runs)
+        lines.append(f"| `{module}` | {_format_seconds(imports[module])} |")
+
+    for module in modules:
+        lines += ["", f"## Slowest direct imports of `{module}`", "", "| Module | Cumulative |", "|--------|------------|"]
+        for seconds, name in slowest_imports(module):
+            lines.append(f"| `{name}` | {_format_seconds(seconds)} |")
+
+    health = ready = None
+    if startup:
+        health, ready = measure_startup()
+        lines += [
+            "",
+            "## Startup",
+            "",
+            "| Milestone | Seconds after launch |",
+            "|-----------|----------------------|",
+            f"| `/health` answers | {_format_seconds(health)} |",
+            f"| `/ready` (engines loaded) | {_format_seconds(ready)} |",
+        ]
+    return "\n".join(lines) + "\n", imports, health
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import and startup time of the API")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-startup", action="store_true", help="Skip launching uvicorn")
+    parser.add_argument("--budget", type=float, help="Fail if an import or /health takes longer (seconds)")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report, imports, health = build_report(args.modules, args.runs, not args.no_startup)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+    if args.budget is not None:
+        over = [f"{module} ({seconds:.3f}s)" for module, seconds in imports.items() if seconds > args.budget]
+        if not args.no_startup and (health is None or health > args.budget):
+            over.append(f"/health ({_format_seconds(health)})")
+        if over:
+            print(f"❌ Over the {args.budget:.3f}s budget: {', '.join(over)}")
+            sys.exit(1)
+        print(f"✅ Within the {args.budget:.3f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Replay captured traffic against a local API server
+
+Reads a capture written with TRAFFIC_CAPTURE_PATH (see traffic.py), starts
+api_main with uvicorn on a free port (or uses --base-url), waits for /ready
+and sends the same requests with synthetic text of the captured sizes,
+keeping the captured inter-arrival times divided by --speedup. Reports
+throughput, latency percentiles per endpoint, status codes and error rates.
+
+Usage (from the repository root):
+
+    TRAFFIC_CAPTURE_PATH=traffic.jsonl uvicorn api_main:app      # capture
+    python benchmarks/loadtest.py traffic.jsonl
+    python benchmarks/loadtest.py traffic.jsonl --speedup 4 --concurrency 16 --workers 2
+    python benchmarks/loadtest.py traffic.jsonl --env HUMANIZER_ENGINES=fast --output load.md
+
+--speedup 0 ignores arrival times and sends as fast as --concurrency allows.
+Requests that find every client thread busy wait for one; that wait is
+reported as schedule lag, so a lag close to zero means the server kept up.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import socket
+import argparse
+import platform
+import subprocess
+import urllib.request
+import urllib.error
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from traffic import read_capture  # noqa: E402
+
+# Synthetic input: informal sentences with contractions and passive-voice candidates
+SENTENCES = [
+    "I don't think the committee has read the report yet.",
+    "The researchers collected the samples in the spring.",
+    "It's clear that the results can't be explained by chance alone.",
+    "We won't know the full impact until the study is finished.",
+    "The team analyzed the data using a mixed-effects model.",
+    "They're planning to publish the findings next year.",
+    "The students wrote a detailed summary of the experiment.",
+    "This approach isn't perfect, but it's a good start.",
+    "The author describes the method in the second chapter.",
+    "Most participants didn't notice the change in the interface.",
+    "The board approved the new budget after a long discussion.",
+    "You'll see that the effect is stronger in larger groups.",
+]
+
+
+def synthesize_text(chars, rng):
+    """Roughly chars characters of paragraphs built from SENTENCES."""
+    parts = []
+    length = 0
+    while length < max(chars, 1):
+        sentence = rng.choice(SENTENCES)
+        separator = "\n\n" if parts and rng.random() < 0.15 else " "
+        parts.append((separator if parts else "") + sentence)
+        length += len(parts[-1])
+    return "".join(parts)
+
+
+def build_request(entry, rng):
+    """(path, body bytes, content type) reproducing a captured request shape."""
+    text = synthesize_text(entry["chars"], rng)
+    seed = rng.randrange(1, 2 ** 31) if entry.get("seeded") else None
+    options = {
+        "use_passive": entry.get("use_passive", False),
+        "use_synonyms": entry.get("use_synonyms", False),
+        "seed": seed,
+        "engine": entry.get("engine"),
+        "tier": entry.get("tier"),
+        "latency_budget_ms": entry.get("latency_budget_ms"),
+        "response_format": entry.get("response_format", "full"),
+    }
+    options = {key: value for key, value in options.items() if value is not None}
+
+    if entry["endpoint"] == "/api/transform-file":
+        boundary = uuid.uuid4().hex
+        lines = []
+        for key, value in options.items():
+            value = str(value).lower() if isinstance(value, bool) else str(value)
+            lines += [f"--{boundary}", f'Content-Disposition: form-data; name="{key}"', "", value]
+        lines += [
+            f"--{boundary}",
+            'Content-Disposition: form-data; name="file"; filename="replay.txt"',
+            "Content-Type: text/plain",
+            "",
+            text,
+            f"--{boundary}--",
+            "",
+        ]
+        body = "\r\n".join(lines).encode("utf-8")
+        return entry["endpoint"], body, f"multipart/form-data; boundary={boundary}"
+
+    body = json.dumps({"text": text, **options}).encode("utf-8")
+    return "/api/transform", body, "application/json"
+
+
+def send(base_url, path, body, content_type, timeout=300):
+    """(status code or None on a connection error, seconds)"""
+    request = urllib.request.Request(
+        base_url + path, data=body, headers={"Content-Type": content_type}, method="POST"
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def replay(base_url, entries, speedup=1.0, concurrency=8, seed=0):
+    """
+    Sends every captured request and returns one result dict per request
+    (endpoint, status, latency and schedule lag in seconds).
+    """
+    rng = random.Random(seed)
+    requests = [(entry["endpoint"], build_request(entry, rng)) for entry in entries]
+    first_ts = entries[0]["ts"] if entries else 0.0
+
+    def run(endpoint, request, due):
+        lag = max(0.0, time.perf_counter() - due)
+        status, latency = send(base_url, *request)
+        return {"endpoint": endpoint, "status": status, "latency": latency, "lag": lag}
+
+    started = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for entry, (endpoint, request) in zip(entries, requests):
+            due = started
+            if speedup > 0:
+                due += (entry["ts"] - first_ts) / speedup
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(run, endpoint, request, due))
+        results = [future.result() for future in futures]
+    return results, time.perf_counter() - started
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def start_server(env_overrides, workers=1, timeout=300):
+    """Launches uvicorn api_main:app and waits for /ready. Returns (process, base URL)."""
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, **env_overrides)
+    # The replay itself must not be appended to a capture
+    env.pop("TRAFFIC_CAPTURE_PATH", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {process.returncode}")
+        if _status(f"{base_url}/ready") == 200:
+            print(f"✅ Server ready in {time.perf_counter() - started:.2f}s at {base_url}")
+            return process, base_url
+        time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"Server was not ready within {timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def _format_ms(seconds):
+    return f"{seconds * 1000:.1f}ms"
+
+
+def _latency_row(name, results):
+    latencies = [r["latency"] for r in results]
+    errors = sum(1 for r in results if r["status"] is None or r["status"] >= 400)
+    return (
+        f"| {name} | {len(results)} | {errors / len(results):.1%} | "
+        + " | ".join(_format_ms(percentile(latencies, q)) for q in (50, 90, 95, 99))
+        + f" | {_format_ms(max(latencies))} |"
+    )
+
+
+def build_report(results, elapsed, args):
+    by_endpoint = defaultdict(list)
+    for result in results:
+        by_endpoint[result["endpoint"]].append(result)
+    statuses = Counter("connection error" if r["status"] is None else str(r["status"]) for r in results)
+    lags = [r["lag"] for r in results]
+
+    lines = [
+        "# Load test",
+        "",
+        f"Python {platform.python_version()} on {platform.system()} {platform.machine()}. "
+        f"Replay of `{os.path.basename(args.capture)}` with speed-up {args.speedup:g}, "
+        f"concurrency {args.concurrency}. Generated by `python benchmarks/loadtest.py`.",
+        "",
+        f"- Requests: {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.2f} req/s)",
+        f"- Schedule lag: p50 {_format_ms(percentile(lags, 50))}, p95 {_format_ms(percentile(lags, 95))}",
+        f"- Status codes: {', '.join(f'{status} x{count}' for status, count in sorted(statuses.items()))}",
+        "",
+        "| Endpoint | Requests | Errors | p50 | p90 | p95 | p99 | Max |",
+        "|----------|----------|--------|-----|-----|-----|-----|-----|",
+        _latency_row("all", results),
+    ]
+    for endpoint, endpoint_results in sorted(by_endpoint.items()):
+        lines.append(_latency_row(f"`{endpoint}`", endpoint_results))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured transform traffic against api_main")
+    parser.add_argument("capture", help="JSONL capture written with TRAFFIC_CAPTURE_PATH")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Divide inter-arrival times by this (0: no pacing)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum requests in flight")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic texts")
+    parser.add_argument("--base-url", help="Use a running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Environment variable for the started server (repeatable)")
+    parser.add_argument("--output", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    entries = read_capture(args.capture)[:args.limit]
+    if not entries:
+        print(f"❌ No requests in {args.capture}")
+        sys.exit(1)
+
+    process = None
+    base_url = args.base_url
+    if base_url is None:
+        overrides = dict(item.split("=", 1) for item in args.env)
+        process, base_url = start_server(overrides, workers=args.workers)
+    try:
+        print(f"🔄 Replaying {len(entries)} requests...")
+        results, elapsed = replay(base_url.rstrip("/"), entries, args.speedup, args.concurrency, args.seed)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = build_report(results, elapsed, args)
+    print(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Profile AcademicTextHumanizer.humanize_text on a file
+
+Runs the transform once per option combination (passive voice and synonyms
+on/off) and writes, for each, a cProfile .pstats file and a collapsed-stack
+file from a separate sampled run, then prints the functions with the most
+cumulative time.
+
+Usage (from the repository root):
+
+    python benchmarks/profile_humanizer.py sample.txt
+    python benchmarks/profile_humanizer.py sample.txt --engine fast --output profiles --top 15
+
+View the results with snakeviz profiles/full-passive-synonyms.pstats, or
+flamegraph.pl / speedscope on the .collapsed files.
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import random
+import cProfile
+import argparse
+import importlib
+import itertools
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from engine_router import ENGINE_MODULES  # noqa: E402
+from profiling import SamplingProfiler  # noqa: E402
+
+
+def load_engine(name):
+    """A humanizer for the given engine name, as the API builds them."""
+    module = importlib.import_module(ENGINE_MODULES[name])
+    module.download_nltk_resources()
+    return module.AcademicTextHumanizer()
+
+
+def _label(engine, use_passive, use_synonyms):
+    options = [name for name, on in (("passive", use_passive), ("synonyms", use_synonyms)) if on]
+    return "-".join([engine] + (options or ["plain"]))
+
+
+def profile_combination(humanizer, text, use_passive, use_synonyms, seed, interval):
+    """
+    (seconds, cProfile.Profile, SamplingProfiler) for one option combination.
+    The sampled run repeats the transform with the same seed, so the
+    collapsed stacks are not skewed by cProfile's overhead.
+    """
+    random.seed(seed)
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    humanizer.humanize_text(text, use_passive=use_passive, use_synonyms=use_synonyms)
+    profile.disable()
+    seconds = time.perf_counter() - started
+
+    random.seed(seed)
+    sampler = SamplingProfiler(interval=interval)
+    sampler.start(seconds=3600)
+    try:
+        humanizer.humanize_text(text, use_passive=use_passive, use_synonyms=use_synonyms)
+    finally:
+        sampler.stop()
+    return seconds, profile, sampler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile humanize_text with every option combination")
+    parser.add_argument("path", help="Text file to transform")
+    parser.add_argument("--engine", default="full", choices=sorted(ENGINE_MODULES))
+    parser.add_argument("--output", default="profiles", help="Directory for .pstats and .collapsed files")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--interval-ms", type=float, default=5.0, help="Sampling interval")
+    parser.add_argument("--top", type=int, default=10, help="Functions to print per combination")
+    args = parser.parse_args()
+
+    with open(args.path, encoding="utf-8") as f:
+        text = f.read()
+
+    started = time.perf_counter()
+    humanizer = load_engine(args.engine)
+    print(f"🔄 Engine '{args.engine}' loaded in {time.perf_counter() - started:.2f}s")
+    # Untimed first run, so lazy loads (WordNet, caches) do not land in the first profile
+    humanizer.humanize_text(text[:2000], use_passive=True, use_synonyms=True)
+
+    os.makedirs(args.output, exist_ok=True)
+    for use_passive, use_synonyms in itertools.product([False, True], repeat=2):
+        label = _label(args.engine, use_passive, use_synonyms)
+        seconds, profile, sampler = profile_combination(
+            humanizer, text, use_passive, use_synonyms, args.seed, args.interval_ms / 1000
+        )
+        profile.dump_stats(os.path.join(args.output, f"{label}.pstats"))
+        sampler.write(os.path.join(args.output, f"{label}.collapsed"))
+
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(args.top)
+        print(f"\n📈 {label}: {seconds:.3f}s under cProfile, {sampler.samples} samples")
+        print(report.getvalue().split("\n\n", 1)[-1].rstrip())
+
+    print(f"\n✅ Profiles written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""
+Local stand-ins for the Stripe and Supabase APIs
+
+Two small HTTP servers that answer the calls api_main makes, so the payment
+and webhook paths can be benchmarked and stress-tested without live
+accounts:
+
+  - Stripe: POST /v1/checkout/sessions and GET /v1/checkout/sessions/{id}
+    (what checkout.Session.create/retrieve call, via STRIPE_API_BASE)
+  - Supabase PostgREST: GET/POST/PATCH /rest/v1/user_profiles and
+    /rest/v1/usage_limits with eq. filters and merge-duplicates upserts
+
+Both add a configurable latency (plus uniform jitter) to every response and
+fail a share of requests with a configurable status. Webhook events are
+signed like Stripe's, so /api/stripe-webhook accepts them.
+
+Usage (from the repository root):
+
+    python benchmarks/stand_ins.py serve --latency-ms 80 --jitter-ms 40 --failure-rate 0.05
+
+then start the API with the environment printed by serve and drive it, e.g.
+
+    python benchmarks/stand_ins.py webhooks --base-url http://127.0.0.1:8000 --count 200
+    python benchmarks/loadtest.py traffic.jsonl --base-url http://127.0.0.1:8000
+
+to see how slow or failing downstream calls affect transform latency.
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import random
+import hashlib
+import argparse
+import threading
+import urllib.parse
+import urllib.request
+import urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import percentile  # noqa: E402
+
+# Credentials the stand-ins expect; any other value is accepted too, but they must be present
+STRIPE_SECRET_KEY = "sk_test_standin"
+STRIPE_WEBHOOK_SECRET = "whsec_standin"
+SUPABASE_SERVICE_ROLE = "service-role-standin"
+
+SUPABASE_TABLES = {
+    # table -> columns identifying a row for merge-duplicates upserts
+    "user_profiles": ("id",),
+    "usage_limits": ("user_id", "month_year"),
+}
+
+
+class FaultInjector:
+    """
+    Delay and failure decisions for each request.
+
+    Args:
+        latency_ms: Added to every response
+        jitter_ms: Uniform extra delay in [0, jitter_ms]
+        failure_rate: Share of requests answered with failure_status
+        failure_status: HTTP status of injected failures
+        seed: Seed for the failure and jitter draws
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, failure_rate=0.0, failure_status=500, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def decide(self):
+        """(delay seconds, fail?) for one request."""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.failure_rate > 0 and self._random.random() < self.failure_rate
+        return (self.latency_ms + jitter) / 1000, fail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Common request handling: fault injection, JSON replies and counters."""
+
+    server_version = "StandIn/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _handle(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        delay, fail = self.server.faults.decide()
+        if delay:
+            time.sleep(delay)
+        self.server.counts[f"{method} {self.route_name(url.path)}"] += 1
+        if fail:
+            self.server.counts["injected_failures"] += 1
+            self._body()
+            self._reply(self.server.faults.failure_status, self.failure_body())
+            return
+        self.route(method, url.path, urllib.parse.parse_qs(url.query))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+
+class StripeHandler(_Handler):
+    """The checkout session endpoints of the Stripe API."""
+
+    def route_name(self, path):
+        return "/v1/checkout/sessions/{id}" if path.count("/") > 3 else path
+
+    def failure_body(self):
+        return {"error": {"type": "api_error", "message": "Injected failure from the Stripe stand-in"}}
+
+    def route(self, method, path, query):
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self._reply(401, {"error": {"type": "invalid_request_error", "message": "No API key provided"}})
+            return
+
+        if method == "POST" and path == "/v1/checkout/sessions":
+            form = urllib.parse.parse_qs(self._body().decode("utf-8"))
+            self._reply(200, self.server.create_session(form))
+        elif method == "GET" and path.startswith("/v1/checkout/sessions/"):
+            session = self.server.sessions.get(path.rsplit("/", 1)[-1])
+            if session is None:
+                self._reply(404, {"error": {
+                    "type": "invalid_request_error", "code": "resource_missing",
+                    "message": f"No such checkout.session: '{path.rsplit('/', 1)[-1]}'",
+                }})
+            else:
+                self._reply(200, session)
+        else:
+            self._reply(404, {"error": {"type": "invalid_request_error", "message": f"Unrecognized request URL ({method}: {path})"}})
+
+
+class StripeStandIn(ThreadingHTTPServer):
+    """
+    Stripe API stand-in. Sessions are kept in memory and, unless paid is
+    False, are reported as paid as soon as they are created.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, faults, paid=True, amount_total=999):
+        super().__init__(address, StripeHandler)
+        self.faults = faults
+        self.paid = paid
+        self.amount_total = amount_total
+        self.sessions = {}
+        self.counts = Counter()
+
+    def create_session(self, form):
+        metadata = {
+            key[len("metadata["):-1]: values[0] for key, values in form.items() if key.startswith("metadata[")
+        }
+        session_id = f"cs_test_{uuid.uuid4().hex}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "url": f"http://{self.server_address[0]}:{self.server_address[1]}/pay/{session_id}",
+            "mode": form.get("mode", ["payment"])[0],
+            "status": "complete" if self.paid else "open",
+            "payment_status": "paid" if self.paid else "unpaid",
+            "amount_total": self.amount_total,
+            "currency": "usd",
+            "client_reference_id": None,
+            "metadata": metadata,
+            "created": int(time.time()),
+        }
+        self.sessions[session_id] = session
+        return session
+
+
+class SupabaseHandler(_Handler):
+    """A PostgREST subset: eq. filters, inserts, merge-duplicates upserts and updates."""
+
+    def route_name(self, path):
+        return path
+
+    def failure_body(self):
+        return {"code": "PGRST000", "message": "Injected failure from the Supabase stand-in"}
+
+    def route(self, method, path, query):
+        if not self.headers.get("apikey"):
+            self._reply(401, {"message": "No API key found in request"})
+            return
+
+        table = path[len("/rest/v1/"):] if path.startswith("/rest/v1/") else None
+        if table not in SUPABASE_TABLES:
+            self._reply(404, {"code": "42P01", "message": f'relation "public.{table}" does not exist'})
+            return
+
+        filters = {
+            column: values[0][len("eq."):]
+            for column, values in query.items() if values and values[0].startswith("eq.")
+        }
+        store = self.server.tables[table]
+        with self.server.lock:
+            if method == "GET":
+                self._reply(200, [row for row in store if _matches(row, filters)])
+            elif method == "POST":
+                payload = json.loads(self._body() or b"null")
+                rows = payload if isinstance(payload, list) else [payload]
+                merge = "merge-duplicates" in self.headers.get("Prefer", "")
+                for row in rows:
+                    key = {column: str(row.get(column)) for column in SUPABASE_TABLES[table]}
+                    existing = [stored for stored in store if _matches(stored, key)]
+                    if existing and not merge:
+                        self._reply(409, {"code": "23505", "message": "duplicate key value violates unique constraint"})
+                        return
+                    if existing:
+                        existing[0].update(row)
+                    else:
+                        store.append(dict(row))
+                self._reply(201)
+            elif method == "PATCH":
+                changes = json.loads(self._body() or b"{}")
+                for row in store:
+                    if _matches(row, filters):
+                        row.update(changes)
+                self._reply(204)
+
+
+def _matches(row, filters):
+    return all(str(row.get(column)) == value for column, value in filters.items())
+
+
+class SupabaseStandIn(ThreadingHTTPServer):
+    """Supabase REST stand-in with in-memory user_profiles and usage_limits tables."""
+
+    daemon_threads = True
+
+    def __init__(self, address, faults):
+        super().__init__(address, SupabaseHandler)
+        self.faults = faults
+        self.tables = {table: [] for table in SUPABASE_TABLES}
+        self.lock = threading.Lock()
+        self.counts = Counter()
+
+
+def start(server):
+    """Serves in a daemon thread. Returns the base URL."""
+    threading.Thread(target=server.serve_forever, name=type(server).__name__, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def sign_webhook(payload, secret=STRIPE_WEBHOOK_SECRET, timestamp=None):
+    """Stripe-Signature header value for payload (bytes), as Stripe computes it."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signed = f"{timestamp}.".encode("utf-8") + payload
+    signature = hmac.new(secret.encode("utf-8"), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def checkout_completed_event(user_id, user_email, tier="pro"):
+    """A checkout.session.completed event as sent to /api/stripe-webhook."""
+    return {
+        "id": f"evt_{uuid.uuid4().hex}",
+        "object": "event",
+        "type": "checkout.session.completed",
+        "created": int(time.time()),
+        "data": {"object": {
+            "id": f"cs_test_{uuid.uuid4().hex}",
+            "object": "checkout.session",
+            "payment_status": "paid",
+            "amount_total": 999,
+            "metadata": {"user_id": user_id, "user_email": user_email, "tier": tier},
+        }},
+    }
+
+
+def post_webhook(base_url, event, secret=STRIPE_WEBHOOK_SECRET, timeout=60):
+    """Signs and posts an event. Returns (status or None, seconds)."""
+    payload = json.dumps(event).encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/api/stripe-webhook", data=payload, method="POST",
+        headers={"Content-Type": "application/json", "Stripe-Signature": sign_webhook(payload, secret)}
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def serve(args):
+    faults = FaultInjector(args.latency_ms, args.jitter_ms, args.failure_rate, args.failure_status, args.seed)
+    stripe_server = StripeStandIn((args.host, args.stripe_port), faults, paid=not args.unpaid)
+    supabase_server = SupabaseStandIn((args.host, args.supabase_port), faults)
+    stripe_url = start(stripe_server)
+    supabase_url = start(supabase_server)
+
+    print(f"✅ Stripe stand-in at {stripe_url}, Supabase stand-in at {supabase_url}")
+    print("Start the API with:")
+    print(f"    STRIPE_API_BASE={stripe_url} STRIPE_SECRET_KEY={STRIPE_SECRET_KEY} "
+          f"STRIPE_WEBHOOK_SECRET={STRIPE_WEBHOOK_SECRET} \\")
+    print(f"    SUPABASE_URL={supabase_url} SUPABASE_SERVICE_ROLE={SUPABASE_SERVICE_ROLE} uvicorn api_main:app")
+    try:
+        while True:
+            time.sleep(args.report_seconds)
+            counts = stripe_server.counts + supabase_server.counts
+            if counts:
+                print(f"📈 {dict(sorted(counts.items()))}")
+    except KeyboardInterrupt:
+        stripe_server.shutdown()
+        supabase_server.shutdown()
+
+
+def webhooks(args):
+    def send(i):
+        event = checkout_completed_event(f"user-{i % args.users}", f"user{i % args.users}@example.com", args.tier)
+        return post_webhook(args.base_url.rstrip("/"), event, args.secret)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(send, range(args.count)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds for _, seconds in results]
+    statuses = Counter("connection error" if status is None else str(status) for status, _ in results)
+    errors = sum(count for status, count in statuses.items() if status != "200")
+    print(f"Webhooks: {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.2f}/s), "
+          f"errors {errors / len(results):.1%}")
+    print("Latency: " + ", ".join(
+        f"p{q} {percentile(latencies, q) * 1000:.1f}ms" for q in (50, 90, 95, 99)
+    ) + f", max {max(latencies) * 1000:.1f}ms")
+    print(f"Status codes: {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Stripe and Supabase stand-ins")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run both stand-in servers")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--stripe-port", type=int, default=12111)
+    serve_parser.add_argument("--supabase-port", type=int, default=54321)
+    serve_parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    serve_parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform extra delay up to this")
+    serve_parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests that fail")
+    serve_parser.add_argument("--failure-status", type=int, default=500)
+    serve_parser.add_argument("--unpaid", action="store_true", help="Report checkout sessions as unpaid")
+    serve_parser.add_argument("--seed", type=int)
+    serve_parser.add_argument("--report-seconds", type=float, default=10.0, help="Print request counts this often")
+
+    webhook_parser = subparsers.add_parser("webhooks", help="Post signed checkout.session.completed events")
+    webhook_parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    webhook_parser.add_argument("--secret", default=STRIPE_WEBHOOK_SECRET)
+    webhook_parser.add_argument("--count", type=int, default=100)
+    webhook_parser.add_argument("--concurrency", type=int, default=4)
+    webhook_parser.add_argument("--users", type=int, default=20, help="Distinct user ids to spread events over")
+    webhook_parser.add_argument("--tier", default="pro")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args)
+    else:
+        webhooks(args)
+
+
+if __name__ == "__main__":
+    main()
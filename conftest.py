@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the API tests
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from engine_router import EngineRouter
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """
+    TestClient for api_main with only the fast engine loaded, so no models
+    are needed. Startup is not run; the engine is installed directly.
+    """
+    import api_main
+
+    router = EngineRouter(default_engine="fast")
+    router.load("fast", {"seed": 42})
+    monkeypatch.setattr(api_main, "engine_router", router)
+    monkeypatch.setitem(api_main.warmup_state, "status", "ready")
+    return TestClient(api_main.app)
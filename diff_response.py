@@ -0,0 +1,142 @@
+"""
+Compact edit-span responses for transform endpoints
+
+Instead of echoing the original and transformed documents, a diff response
+lists the edits that turn the original into the transformed text, each as a
+compact [offset, length, replacement, stage] array. Applying
+the edits to the original (from last to first, or shifting later offsets)
+reproduces transformed_text exactly.
+
+Offsets and lengths count UTF-16 code units, so the frontend can apply them
+with JavaScript string methods directly.
+"""
+
+import re
+import difflib
+
+from transformer.lexicon import ACADEMIC_TRANSITIONS, CONTRACTION_MAP
+
+RESPONSE_FORMATS = ("full", "diff")
+
+# Words and whitespace runs; every character of the text belongs to one token
+DIFF_TOKEN = re.compile(r'\S+|\s+')
+
+# Sentence units, split before the whitespace that follows terminal punctuation
+SENTENCE_UNIT = re.compile(r'(?<=[.!?])(?=\s)')
+
+# Changed blocks with more tokens than this are sent as one replacement
+MAX_BLOCK_TOKENS = 5000
+
+_TRANSITIONS = set(ACADEMIC_TRANSITIONS)
+_BARE_CONTRACTIONS = {key for key in CONTRACTION_MAP if not key.startswith(("'", "n'"))}
+
+
+def _utf16_len(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _is_contraction(word):
+    word = word.lower().strip('.,;:!?"()[]')
+    return "'" in word or "’" in word or word in _BARE_CONTRACTIONS
+
+
+def _classify(removed, inserted, use_passive):
+    """Best-effort name of the stage that produced an edit."""
+    removed_words = [t for t in removed if not t.isspace()]
+    inserted_words = [t for t in inserted if not t.isspace()]
+
+    if not removed_words and not inserted_words:
+        return "whitespace"
+    if not removed_words and inserted_words and all(w in _TRANSITIONS for w in inserted_words):
+        return "transition"
+    if any(_is_contraction(w) for w in removed_words):
+        return "contraction"
+    if len(removed_words) == 1 and len(inserted_words) == 1:
+        return "synonym"
+    return "passive" if use_passive else "rewrite"
+
+
+def _token_edits(offset, original, transformed, use_passive, edits):
+    """Appends the word-level edits between two short passages."""
+    a = DIFF_TOKEN.findall(original)
+    b = DIFF_TOKEN.findall(transformed)
+
+    if len(a) + len(b) > MAX_BLOCK_TOKENS:
+        edits.append([offset, _utf16_len(original), transformed, _classify(a, b, use_passive)])
+        return
+
+    # UTF-16 offset of each original token
+    offsets = [offset]
+    for token in a:
+        offsets.append(offsets[-1] + _utf16_len(token))
+
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        edits.append([
+            offsets[i1],
+            offsets[i2] - offsets[i1],
+            ''.join(b[j1:j2]),
+            _classify(a[i1:i2], b[j1:j2], use_passive),
+        ])
+
+
+def _sentence_keys(units):
+    return [tuple(unit.lower().split()[-2:]) for unit in units]
+
+
+def compute_edits(original, transformed, use_passive=False):
+    """
+    Returns a list of edits [offset, length, replacement, stage], where
+    offset and length address the original text in UTF-16 code units.
+
+    The engines transform sentence by sentence, so the texts are aligned at
+    sentence level first and only changed sentences are diffed word by word;
+    a single word-level diff over a whole document is quadratic.
+    """
+    if original == transformed:
+        return []
+
+    a = SENTENCE_UNIT.split(original)
+    b = SENTENCE_UNIT.split(transformed)
+
+    if len(a) == len(b):
+        # Sentence count preserved: sentence i became sentence i
+        blocks = [(i, i + 1, i, i + 1) for i in range(len(a)) if a[i] != b[i]]
+    else:
+        # Align on sentence endings, which the transformations rarely touch
+        matcher = difflib.SequenceMatcher(None, _sentence_keys(a), _sentence_keys(b), autojunk=False)
+        blocks = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if i2 - i1 == j2 - j1:
+                blocks.extend(
+                    (i, i + 1, j, j + 1) for i, j in zip(range(i1, i2), range(j1, j2)) if a[i] != b[j]
+                )
+            else:
+                blocks.append((i1, i2, j1, j2))
+
+    edits = []
+    offset = 0
+    position = 0
+    for i1, i2, j1, j2 in blocks:
+        offset += sum(_utf16_len(unit) for unit in a[position:i1])
+        block = ''.join(a[i1:i2])
+        _token_edits(offset, block, ''.join(b[j1:j2]), use_passive, edits)
+        offset += _utf16_len(block)
+        position = i2
+    return edits
+
+
+def apply_edits(original, edits):
+    """Applies edits from compute_edits to the original text."""
+    units = original.encode('utf-16-le')
+    parts = []
+    position = 0
+    for offset, length, replacement, _ in edits:
+        start = offset * 2
+        parts.append(units[position:start].decode('utf-16-le'))
+        parts.append(replacement)
+        position = start + length * 2
+    parts.append(units[position:].decode('utf-16-le'))
+    return ''.join(parts)
@@ -0,0 +1,191 @@
+"""
+Per-request routing between transformer engines hosted in one process
+
+One API process can load several engines (full, model-free and fast) and pick
+one for each request from an explicit engine field, the latency budget, the
+user tier or the current load.
+"""
+
+import random
+import importlib
+from collections import Counter
+
+from transformer.timing import StageTimer
+
+# Engine name -> module providing AcademicTextHumanizer
+ENGINE_MODULES = {
+    "full": "transformer.app",
+    "model_free": "transformer.app_no_models",
+    "fast": "transformer.app_fast",
+}
+
+# Cheapest engine first
+ENGINE_COST_ORDER = ["fast", "model_free", "full"]
+
+# Tiers served by the cheapest engine unless they ask for another one
+CHEAP_TIERS = {"guest", "free"}
+
+SYNONYM_LABELS = {
+    "full": "Synonym Replacement",
+    "model_free": "Synonym Replacement (Dictionary-based)",
+    "fast": "Synonym Replacement (Dictionary-based)",
+}
+
+
+class Engine:
+    """
+    A loaded engine module with its humanizer instance.
+    """
+
+    def __init__(self, name, humanizer_kwargs=None):
+        self.name = name
+        self.module_name = ENGINE_MODULES[name]
+        self.module = importlib.import_module(self.module_name)
+        self.module.download_nltk_resources()
+        self.humanizer_kwargs = humanizer_kwargs or {}
+        self.humanizer = self.module.AcademicTextHumanizer(**self.humanizer_kwargs)
+        self.supports_passive = getattr(self.module, "SUPPORTS_PASSIVE", True)
+
+    def transform_with_stats(self, text, use_passive, use_synonyms, seed, deadline=None, cancel_event=None,
+                             progress_callback=None):
+        """
+        Run the humanizer and compute word/sentence statistics for the result.
+        "partial" is True if the deadline or cancel event stopped it early.
+        progress_callback receives (sentences_processed, sentences_total).
+        "timings" holds the per-stage times and cache hits of the run.
+        """
+        # A seeded generator per request keeps concurrent requests independent
+        rng = random.Random(seed) if seed is not None else None
+        timer = StageTimer()
+        result = self.humanizer.humanize_text_with_status(
+            text,
+            use_passive=use_passive,
+            use_synonyms=use_synonyms,
+            rng=rng,
+            deadline=deadline,
+            cancel_event=cancel_event,
+            progress_callback=progress_callback,
+            timer=timer
+        )
+        with timer.stage("statistics"):
+            statistics = self.statistics(text, result.text)
+        return {
+            "transformed_text": result.text,
+            "partial": not result.completed,
+            **statistics,
+            "timings": timer.to_dict()
+        }
+
+    def statistics(self, text, transformed_text):
+        """Word and sentence counts for the original and transformed text"""
+        if hasattr(self.module, "count_words"):
+            return {
+                "original_word_count": self.module.count_words(text),
+                "transformed_word_count": self.module.count_words(transformed_text),
+                "original_sentence_count": self.module.count_sentences(text),
+                "transformed_sentence_count": self.module.count_sentences(transformed_text),
+            }
+
+        from nltk.tokenize import word_tokenize
+        nlp = self.module.load_spacy_model()
+
+        return {
+            "original_word_count": len(word_tokenize(text, language='english', preserve_line=True)),
+            "transformed_word_count": len(word_tokenize(transformed_text, language='english', preserve_line=True)),
+            # The original was just parsed by humanize_text, so this is a parse cache hit
+            "original_sentence_count": len(list(self.humanizer.parse(text).sents)),
+            "transformed_sentence_count": len(list(nlp(transformed_text).sents)),
+        }
+
+    def memo_stats(self):
+        """Sentence memo counters, or None if the engine has no memo"""
+        memo = getattr(self.humanizer, "sentence_memo", None)
+        return memo.stats() if memo is not None else None
+
+    def parse_cache_stats(self):
+        """Parse cache counters, or None if the engine has no parse cache"""
+        cache = getattr(self.humanizer, "parse_cache", None)
+        return cache.stats() if cache is not None else None
+
+    def transformations_applied(self, use_passive, use_synonyms):
+        """Names of the transformations this engine applies for the given options"""
+        transformations = ["Contraction Expansion"]
+        if use_passive and self.supports_passive:
+            transformations.append("Passive Voice")
+        if use_synonyms:
+            transformations.append(SYNONYM_LABELS[self.name])
+        transformations.append("Academic Transitions")
+        return transformations
+
+
+class EngineRouter:
+    """
+    Chooses a loaded engine for each request.
+
+    Routing order:
+      1. An explicitly requested engine
+      2. A latency budget at or below fast_budget_ms -> cheapest engine
+      3. A cheap tier (guest/free) -> cheapest engine
+      4. in_flight at or above load_threshold -> cheapest engine
+      5. The default engine
+    """
+
+    def __init__(self, default_engine="full", fast_budget_ms=500, load_threshold=8):
+        self.engines = {}
+        self.default_engine = default_engine
+        self.fast_budget_ms = fast_budget_ms
+        self.load_threshold = load_threshold
+        self.in_flight = 0
+        self.routed = Counter()
+
+    def load(self, name, humanizer_kwargs=None):
+        """Load an engine; raises if its module or models cannot be loaded."""
+        self.engines[name] = Engine(name, humanizer_kwargs)
+        return self.engines[name]
+
+    def cheapest(self):
+        for name in ENGINE_COST_ORDER:
+            if name in self.engines:
+                return self.engines[name]
+        return None
+
+    def default(self):
+        return self.engines.get(self.default_engine) or self.cheapest()
+
+    def route(self, engine=None, latency_budget_ms=None, tier=None):
+        """
+        Returns (engine, reason) for a request, or (None, reason) if no engine
+        is loaded. Raises KeyError if an unknown or unloaded engine is requested.
+        """
+        if not self.engines:
+            return None, "unavailable"
+
+        if engine:
+            if engine not in self.engines:
+                raise KeyError(engine)
+            choice, reason = self.engines[engine], "requested"
+        elif latency_budget_ms is not None and latency_budget_ms <= self.fast_budget_ms:
+            choice, reason = self.cheapest(), "latency_budget"
+        elif tier and tier.lower() in CHEAP_TIERS:
+            choice, reason = self.cheapest(), "tier"
+        elif self.in_flight >= self.load_threshold:
+            choice, reason = self.cheapest(), "load"
+        else:
+            choice, reason = self.default(), "default"
+
+        self.routed[choice.name] += 1
+        return choice, reason
+
+    def stats(self):
+        return {
+            "loaded": list(self.engines),
+            "default": self.default_engine,
+            "in_flight": self.in_flight,
+            "routed": dict(self.routed),
+            "sentence_memo": {
+                name: engine.memo_stats() for name, engine in self.engines.items() if engine.memo_stats()
+            },
+            "parse_cache": {
+                name: engine.parse_cache_stats() for name, engine in self.engines.items() if engine.parse_cache_stats()
+            },
+        }
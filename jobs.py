@@ -0,0 +1,309 @@
+"""
+Asynchronous transform jobs
+
+Long documents are queued instead of holding an HTTP connection open for the
+whole transform. Job metadata lives in SQLite and job inputs and results in
+plain files next to it, so queued jobs survive a restart and results can be
+fetched later. Finished jobs are deleted once their TTL has passed.
+
+Several API workers can share one store. A job runs only in the worker that
+claims it (a conditional UPDATE from queued to running), and a running job
+holds a lease its worker keeps renewing; when a worker dies its lease runs out
+and the job is queued again on the next resume().
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Minimum seconds between progress writes for one job
+PROGRESS_INTERVAL = 0.5
+
+# Minimum seconds between TTL sweeps triggered by new jobs
+CLEANUP_INTERVAL = 60
+
+# Seconds a running job stays claimed without a heartbeat from its worker
+LEASE_SECONDS = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    options TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    sentences_processed INTEGER NOT NULL DEFAULT 0,
+    sentences_total INTEGER,
+    error TEXT,
+    lease_expires_at REAL,
+    finished_at REAL
+)
+"""
+
+# Columns added after the first release, for job databases created before them
+_ADDED_COLUMNS = {"lease_expires_at": "REAL", "finished_at": "REAL"}
+
+
+class JobStore:
+    """
+    SQLite job table plus one input and one result file per job.
+
+    Args:
+        directory: Directory holding jobs.sqlite3 and the job files
+        ttl_seconds: Seconds after a job finished before it and its files are removed
+        lease_seconds: Seconds a running job stays claimed without a heartbeat
+    """
+
+    def __init__(self, directory, ttl_seconds=86400, lease_seconds=LEASE_SECONDS):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.db_path = os.path.join(directory, "jobs.sqlite3")
+        self._last_cleanup = 0.0
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+            for name, kind in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            # Jobs finished before finished_at existed expire from their last update
+            db.execute(
+                "UPDATE jobs SET finished_at = updated_at WHERE finished_at IS NULL AND status IN (?, ?)",
+                (COMPLETED, FAILED)
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _path(self, job_id, kind):
+        return os.path.join(self.directory, f"{job_id}.{kind}")
+
+    def _write_file(self, path, data):
+        # Write then rename so readers never see a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def create(self, text, options):
+        """Store a new queued job and return its id."""
+        job_id = uuid.uuid4().hex
+        self._write_file(self._path(job_id, "input.txt"), text.encode("utf-8"))
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, options, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(options), now, now)
+            )
+        return job_id
+
+    def get(self, job_id):
+        """Job metadata as a dict, or None for unknown or expired jobs."""
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        return job
+
+    def load_input(self, job_id):
+        with open(self._path(job_id, "input.txt"), "rb") as f:
+            return f.read().decode("utf-8")
+
+    def load_result(self, job_id):
+        """Raw JSON bytes of a completed job's result."""
+        with open(self._path(job_id, "result.json"), "rb") as f:
+            return f.read()
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id):
+        """
+        Mark a queued job running under a fresh lease. Returns False if it is
+        not queued any more (another worker claimed it, or it finished).
+        """
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, sentences_processed = 0, error = NULL, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now + self.lease_seconds, now, job_id, QUEUED)
+            )
+            return cursor.rowcount == 1
+
+    def renew_leases(self, job_ids):
+        """Extend the leases of running jobs (heartbeat from their worker)."""
+        expires = time.time() + self.lease_seconds
+        with self._connect() as db:
+            db.executemany(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ?",
+                [(expires, job_id, RUNNING) for job_id in job_ids]
+            )
+
+    def requeue_expired(self):
+        """Queue running jobs whose lease has run out again; returns how many."""
+        now = time.time()
+        with self._connect() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? "
+                "AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+                (QUEUED, now, RUNNING, now)
+            )
+            return cursor.rowcount
+
+    def update_progress(self, job_id, sentences_processed, sentences_total=None):
+        self._update(job_id, sentences_processed=sentences_processed, sentences_total=sentences_total)
+
+    def complete(self, job_id, result, sentences_processed, sentences_total):
+        """Store the result (a JSON-serializable dict) and mark the job completed."""
+        self._write_file(self._path(job_id, "result.json"), json.dumps(result).encode("utf-8"))
+        self._update(
+            job_id,
+            status=COMPLETED,
+            sentences_processed=sentences_processed,
+            sentences_total=sentences_total,
+            finished_at=time.time()
+        )
+
+    def fail(self, job_id, error):
+        self._update(job_id, status=FAILED, error=error, finished_at=time.time())
+
+    def queued(self):
+        """Ids of queued jobs, oldest first."""
+        with self._connect() as db:
+            rows = db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)).fetchall()
+        return [row["id"] for row in rows]
+
+    def cleanup(self):
+        """Delete completed and failed jobs that finished more than the TTL ago, with their files."""
+        self._last_cleanup = time.time()
+        cutoff = self._last_cleanup - self.ttl_seconds
+        with self._connect() as db:
+            expired = [row["id"] for row in db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (COMPLETED, FAILED, cutoff)
+            )]
+            db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+        for job_id in expired:
+            for kind in ("input.txt", "result.json"):
+                try:
+                    os.remove(self._path(job_id, kind))
+                except FileNotFoundError:
+                    pass
+        return len(expired)
+
+    def maybe_cleanup(self):
+        """Run cleanup() if the last sweep was more than CLEANUP_INTERVAL ago."""
+        if time.time() - self._last_cleanup >= CLEANUP_INTERVAL:
+            self.cleanup()
+
+    def counts(self):
+        with self._connect() as db:
+            rows = db.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a thread pool, renewing the leases of the jobs it is
+    running from a heartbeat thread.
+
+    Args:
+        store: JobStore holding the jobs
+        run_job: Callable (text, options, progress_callback) -> (result dict,
+            sentences_processed, sentences_total); progress_callback takes
+            (sentences_processed, sentences_total)
+        workers: Number of jobs run at once
+    """
+
+    def __init__(self, store, run_job, workers=1):
+        self.store = store
+        self.run_job = run_job
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._active = set()
+        self._active_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._renew_leases, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def submit(self, job_id):
+        self.executor.submit(self._run, job_id)
+
+    def resume(self):
+        """
+        Submit queued jobs, after queueing again the running jobs whose worker
+        stopped renewing their lease. Jobs another worker claims first are
+        skipped, so every worker sharing the store can call this at startup.
+        """
+        self.store.requeue_expired()
+        job_ids = self.store.queued()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    def _renew_leases(self):
+        while not self._stopped.wait(self.store.lease_seconds / 3):
+            with self._active_lock:
+                job_ids = list(self._active)
+            if job_ids:
+                try:
+                    self.store.renew_leases(job_ids)
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not renew job leases: {str(e)}")
+
+    def _run(self, job_id):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        last_write = [0.0]
+        lock = threading.Lock()
+
+        def progress(sentences_processed, sentences_total):
+            now = time.time()
+            with lock:
+                if now - last_write[0] < PROGRESS_INTERVAL:
+                    return
+                last_write[0] = now
+            self.store.update_progress(job_id, sentences_processed, sentences_total)
+
+        with self._active_lock:
+            self._active.add(job_id)
+        try:
+            text = self.store.load_input(job_id)
+            result, sentences_processed, sentences_total = self.run_job(text, job["options"], progress)
+            self.store.complete(job_id, result, sentences_processed, sentences_total)
+        except Exception as e:
+            print(f"❌ Job {job_id} failed: {str(e)}")
+            self.store.fail(job_id, str(e))
+        finally:
+            with self._active_lock:
+                self._active.discard(job_id)
+
+    def shutdown(self):
+        self._stopped.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,125 @@
+"""
+Load shedding for transform requests
+
+Under pressure new requests are downgraded instead of queueing until health
+checks fail: synonym replacement is switched off first, then passive voice,
+leaving contraction expansion and academic transitions. Past a last queue
+depth new requests are turned away with Overloaded.
+"""
+
+import time
+from collections import deque
+
+# Degradation levels
+FULL_FEATURES = 0
+NO_SYNONYMS = 1
+NO_SYNONYMS_OR_PASSIVE = 2
+REJECT = 3
+
+
+class Overloaded(Exception):
+    """Raised for a request that arrives when the queue is past its limit."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class LoadShedder:
+    """
+    Decides a degradation level from the transform queue depth and the p95
+    latency of recent transforms. A threshold of 0 disables that trigger.
+    """
+
+    def __init__(
+        self,
+        synonyms_queue_depth=16,
+        passive_queue_depth=32,
+        synonyms_p95_ms=0,
+        passive_p95_ms=0,
+        reject_queue_depth=0,
+        retry_after_seconds=5,
+        window_seconds=60,
+        max_samples=500
+    ):
+        """
+        Args:
+            synonyms_queue_depth: Queue depth at which synonyms are switched off
+            passive_queue_depth: Queue depth at which passive voice is also switched off
+            synonyms_p95_ms: p95 latency at which synonyms are switched off
+            passive_p95_ms: p95 latency at which passive voice is also switched off
+            reject_queue_depth: Queue depth at which new requests are rejected
+            retry_after_seconds: Retry-After given to rejected requests
+            window_seconds: Age limit for latency samples
+            max_samples: Maximum number of latency samples kept
+        """
+        self.synonyms_queue_depth = synonyms_queue_depth
+        self.passive_queue_depth = passive_queue_depth
+        self.synonyms_p95_ms = synonyms_p95_ms
+        self.passive_p95_ms = passive_p95_ms
+        self.reject_queue_depth = reject_queue_depth
+        self.retry_after_seconds = retry_after_seconds
+        self.window_seconds = window_seconds
+        self._samples = deque(maxlen=max_samples)
+        self.shed = {NO_SYNONYMS: 0, NO_SYNONYMS_OR_PASSIVE: 0, REJECT: 0}
+
+    def record(self, seconds):
+        """Record the latency of a completed transform."""
+        self._samples.append((time.monotonic(), seconds * 1000))
+
+    def p95_ms(self):
+        """p95 latency in milliseconds over the sample window, or None without samples."""
+        cutoff = time.monotonic() - self.window_seconds
+        latencies = sorted(ms for at, ms in self._samples if at >= cutoff)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def level(self, queue_depth):
+        """Current degradation level for the given queue depth."""
+        p95 = self.p95_ms()
+
+        def exceeded(depth_limit, p95_limit):
+            return ((depth_limit and queue_depth >= depth_limit)
+                    or (p95_limit and p95 is not None and p95 >= p95_limit))
+
+        if self.reject_queue_depth and queue_depth >= self.reject_queue_depth:
+            return REJECT
+        if exceeded(self.passive_queue_depth, self.passive_p95_ms):
+            return NO_SYNONYMS_OR_PASSIVE
+        if exceeded(self.synonyms_queue_depth, self.synonyms_p95_ms):
+            return NO_SYNONYMS
+        return FULL_FEATURES
+
+    def apply(self, use_passive, use_synonyms, queue_depth):
+        """
+        Returns (use_passive, use_synonyms, degraded) with the options this
+        request may actually use at the current load. Raises Overloaded when
+        the request should not run at all.
+        """
+        level = self.level(queue_depth)
+        if level == REJECT:
+            self.shed[REJECT] += 1
+            raise Overloaded(
+                f"Server is overloaded ({queue_depth} transforms in flight), please retry shortly",
+                self.retry_after_seconds
+            )
+        degraded = False
+        if level >= NO_SYNONYMS and use_synonyms:
+            use_synonyms = False
+            degraded = True
+        if level >= NO_SYNONYMS_OR_PASSIVE and use_passive:
+            use_passive = False
+            degraded = True
+        if degraded:
+            self.shed[level] += 1
+        return use_passive, use_synonyms, degraded
+
+    def stats(self):
+        return {
+            "p95_ms": self.p95_ms(),
+            "shed_synonyms": self.shed[NO_SYNONYMS],
+            "shed_synonyms_and_passive": self.shed[NO_SYNONYMS_OR_PASSIVE],
+            "rejected": self.shed[REJECT],
+        }
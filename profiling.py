@@ -0,0 +1,186 @@
+"""
+On-demand profiling for the API process
+
+Two modes, both writing to a local directory:
+
+  - RequestProfiler: profiles the next N transform requests with cProfile,
+    one .pstats file per request (open with snakeviz, or turn into a
+    flamegraph with flameprof / gprof2dot)
+  - SamplingProfiler: samples the stacks of every thread for a time window
+    and writes them in collapsed-stack format ("frame;frame;frame count"
+    per line), which flamegraph.pl, speedscope and inferno read directly
+
+Both cover what runs inside the process, including spaCy, NLTK and
+SentenceTransformer calls; chunks sent to the parallel document workers run
+in other processes and are not included.
+"""
+
+import os
+import sys
+import time
+import cProfile
+import functools
+import threading
+from collections import Counter
+
+
+def _timestamp():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+
+class RequestProfiler:
+    """
+    Profiles the next N calls wrapped with wrap() while armed.
+
+    Args:
+        directory: Directory for the .pstats files
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.remaining = 0
+        self.written = []
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def arm(self, count):
+        """Profile the next count requests (0 disarms)."""
+        with self._lock:
+            self.remaining = max(0, int(count))
+        return self.remaining
+
+    def take(self):
+        """
+        Sequence number for the current request if it should be profiled
+        (consuming one of the armed requests), otherwise 0.
+        """
+        if self.remaining <= 0:
+            return 0
+        with self._lock:
+            if self.remaining <= 0:
+                return 0
+            self.remaining -= 1
+            self._sequence += 1
+            return self._sequence
+
+    def wrap(self, func, label, sequence):
+        """
+        Returns func wrapped so that its call is profiled and dumped to
+        <directory>/<label>-<timestamp>-<sequence>.pstats. cProfile only sees
+        the calling thread, so wrap the function that runs in the worker thread.
+        """
+
+        @functools.wraps(func)
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._dump(profile, label, sequence)
+
+        return profiled
+
+    def _dump(self, profile, label, sequence):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{label}-{_timestamp()}-{sequence}.pstats")
+        profile.dump_stats(path)
+        with self._lock:
+            self.written.append(path)
+        print(f"📈 Request profile written to {path}")
+
+    def status(self):
+        with self._lock:
+            return {"remaining": self.remaining, "files": list(self.written[-20:])}
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every interval seconds and counts
+    identical stacks.
+
+    Args:
+        interval: Seconds between samples
+        include_idle: Also count threads that are waiting (threading,
+            selectors, queue and asyncio event-loop frames on top)
+    """
+
+    # Stacks whose innermost frame is in one of these modules are idle waits
+    IDLE_MODULES = (
+        "threading", "selectors", "queue", "logging.handlers", "concurrent.futures.thread", "asyncio.base_events",
+    )
+
+    def __init__(self, interval=0.005, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self, own_ident):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            if not self.include_idle and frame.f_globals.get("__name__") in self.IDLE_MODULES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(labels))] += 1
+        self.samples += 1
+
+    def _run(self, seconds):
+        own_ident = threading.get_ident()
+        end = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < end:
+            self._sample(own_ident)
+            self._stop.wait(self.interval)
+
+    def start(self, seconds):
+        """Samples in a background thread for at most seconds."""
+        self._thread = threading.Thread(target=self._run, args=(seconds,), name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self):
+        """Collapsed-stack text, heaviest stacks first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+
+def sample_window(seconds, path, interval=0.005, include_idle=False):
+    """
+    Runs a SamplingProfiler for seconds in a background thread and writes
+    its collapsed stacks to path when the window ends. Returns the thread.
+    """
+    profiler = SamplingProfiler(interval=interval, include_idle=include_idle)
+
+    def run():
+        profiler._run(seconds)
+        profiler.write(path)
+        print(f"📈 Sampling profile written to {path} ({profiler.samples} samples)")
+
+    thread = threading.Thread(target=run, name="sampling-profiler", daemon=True)
+    thread.start()
+    return thread
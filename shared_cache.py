@@ -0,0 +1,320 @@
+"""
+Cache tier shared by all API worker processes
+
+With several uvicorn workers, per-process caches each hold their own copy and
+hit rates fall as workers are added. The caches here are shared instead:
+
+  - SharedMemoryCache: a fixed-size slab in multiprocessing.shared_memory,
+    hash-indexed into sets of slots. Writers take a file lock; readers are
+    lock-free and use a per-slot sequence counter to detect torn reads. When
+    a set is full the oldest entry in it is overwritten, so memory use is
+    bounded by the slab size.
+  - RedisCache: client for a local Redis (or compatible) server.
+  - LocalCache: in-process stand-in with the same interface, for tests and
+    single-worker deployments.
+
+All of them map bytes/str keys to bytes values with get(key) and set(key, value).
+"""
+
+import os
+import struct
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from transformer.logging_utils import events
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads within one process are serialized
+    fcntl = None
+
+MAGIC = b"HSC1"
+
+# magic, buckets, ways, slot_size, write counter
+HEADER = struct.Struct("<4sIIIQ")
+HEADER_SIZE = 64
+
+# seq, payload length, write stamp, key digest
+SLOT_HEADER = struct.Struct("<IIQ16s")
+
+# Torn reads are retried this many times before reporting a miss
+READ_RETRIES = 3
+
+
+def _digest(key):
+    if isinstance(key, str):
+        key = key.encode("utf-8")
+    return hashlib.blake2b(key, digest_size=16).digest()
+
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name):
+        # Caches are shared by the request threads, and += is not atomic
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        with self._counter_lock:
+            hits, misses, writes = self.hits, self.misses, self.writes
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "writes": writes,
+            "hit_rate": hits / lookups if lookups else None,
+        }
+
+
+class SharedMemoryCache(_Counters):
+    """
+    Set-associative cache in a named shared memory segment.
+
+    Every process that constructs a SharedMemoryCache with the same name
+    attaches to the same segment; the first one creates it. The segment is
+    left in place when processes exit (call unlink() to remove it).
+
+    Args:
+        name: Shared memory segment name
+        size_bytes: Total slab size
+        slot_size: Bytes per slot, including a 32-byte slot header; larger
+            values are not cached
+        ways: Slots per set
+        lock_dir: Directory for the writer lock file
+    """
+
+    def __init__(self, name, size_bytes=64 * 1024 * 1024, slot_size=4096, ways=4, lock_dir=None):
+        from multiprocessing import shared_memory
+
+        super().__init__()
+        self.name = name
+        self.size_bytes = size_bytes
+        self.lock_dir = lock_dir or tempfile.gettempdir()
+        self._thread_lock = threading.Lock()
+        self._lock_file = open(os.path.join(self.lock_dir, f"{name}.lock"), "a+b")
+
+        with self._write_lock():
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size_bytes)
+                buckets = max(1, (size_bytes - HEADER_SIZE) // (slot_size * ways))
+                HEADER.pack_into(self._shm.buf, 0, MAGIC, buckets, ways, slot_size, 0)
+            except FileExistsError:
+                self._shm = shared_memory.SharedMemory(name=name)
+
+        # Attaching registers the segment with this process's resource tracker,
+        # which would unlink it for every other worker when this one exits
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        magic, self.buckets, self.ways, self.slot_size, _ = HEADER.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory segment '{name}' is not a cache slab")
+        self.max_value_size = self.slot_size - SLOT_HEADER.size
+
+    def __reduce__(self):
+        # Worker processes re-attach by name instead of copying the slab
+        return (self.__class__, (self.name, self.size_bytes, self.slot_size, self.ways, self.lock_dir))
+
+    @contextmanager
+    def _write_lock(self):
+        # flock serializes processes; threads of one process share the lock file
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _slot_offsets(self, digest):
+        bucket = int.from_bytes(digest[:8], "little") % self.buckets
+        first = HEADER_SIZE + bucket * self.ways * self.slot_size
+        return [first + way * self.slot_size for way in range(self.ways)]
+
+    def get(self, key):
+        digest = _digest(key)
+        buf = self._shm.buf
+        for offset in self._slot_offsets(digest):
+            for _ in range(READ_RETRIES):
+                seq, length, _, slot_digest = SLOT_HEADER.unpack_from(buf, offset)
+                if seq % 2:
+                    continue  # being written
+                if slot_digest != digest or length == 0:
+                    break
+                start = offset + SLOT_HEADER.size
+                value = bytes(buf[start:start + length])
+                if struct.unpack_from("<I", buf, offset)[0] == seq:
+                    self._count("hits")
+                    return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        if len(value) > self.max_value_size:
+            return False
+        digest = _digest(key)
+        buf = self._shm.buf
+        with self._write_lock():
+            offsets = self._slot_offsets(digest)
+            slots = [(offset, SLOT_HEADER.unpack_from(buf, offset)) for offset in offsets]
+
+            # Same key, else an empty slot, else the oldest write in the set
+            target = next((o for o, (_, _, _, d) in slots if d == digest), None)
+            if target is None:
+                target = min(slots, key=lambda slot: slot[1][2])[0]
+
+            *_, counter = HEADER.unpack_from(buf, 0)
+            counter += 1
+            struct.pack_into("<Q", buf, HEADER.size - 8, counter)
+
+            # Odd while writing, so readers skip the slot; "| 1" also recovers
+            # a slot left odd by a writer that died mid-write
+            writing = (SLOT_HEADER.unpack_from(buf, target)[0] | 1) & 0xFFFFFFFF
+            struct.pack_into("<I", buf, target, writing)
+            struct.pack_into("<IQ16s", buf, target + 4, len(value), counter, digest)
+            start = target + SLOT_HEADER.size
+            buf[start:start + len(value)] = value
+            struct.pack_into("<I", buf, target, (writing + 1) & 0xFFFFFFFF)
+        self._count("writes")
+        return True
+
+    def stats(self):
+        return {
+            "backend": "shared_memory",
+            "name": self.name,
+            "slots": self.buckets * self.ways,
+            "max_value_size": self.max_value_size,
+            **super().stats(),
+        }
+
+    def close(self):
+        self._shm.close()
+        self._lock_file.close()
+
+    def unlink(self):
+        """Remove the segment; other processes keep their mapping until they close it."""
+        try:
+            from multiprocessing import resource_tracker
+            # unlink() unregisters the segment, which was unregistered on attach
+            resource_tracker.register(self._shm._name, "shared_memory")
+        except Exception:
+            pass
+        self._shm.unlink()
+
+
+class LocalCache(_Counters):
+    """
+    In-process LRU with the shared cache interface (stand-in for tests and
+    single-worker deployments).
+    """
+
+    def __init__(self, max_entries=10000):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        # Each process gets its own (empty) copy
+        return (self.__class__, (self.max_entries,))
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._count("misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count("hits")
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._count("writes")
+        return True
+
+    def stats(self):
+        return {"backend": "local", "size": len(self._entries), **super().stats()}
+
+
+class RedisCache(_Counters):
+    """
+    Client for a local Redis-compatible server. Entries expire after
+    ttl_seconds; size is bounded by the server's maxmemory policy.
+    """
+
+    def __init__(self, url, prefix="humanizer:", ttl_seconds=86400):
+        import redis
+
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def __reduce__(self):
+        return (self.__class__, (self.url, self.prefix, self.ttl_seconds))
+
+    def _key(self, key):
+        return self.prefix.encode("utf-8") + _digest(key).hex().encode("ascii")
+
+    def get(self, key):
+        try:
+            value = self._client.get(self._key(key))
+        except Exception as e:
+            events.warning("shared_cache_read_failed", "⚠️ Shared cache read failed: %s", e)
+            value = None
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return value
+
+    def set(self, key, value):
+        try:
+            self._client.set(self._key(key), value, ex=self.ttl_seconds)
+        except Exception as e:
+            events.warning("shared_cache_write_failed", "⚠️ Shared cache write failed: %s", e)
+            return False
+        self._count("writes")
+        return True
+
+    def stats(self):
+        return {"backend": "redis", **super().stats()}
+
+
+def make_shared_cache(backend, name, size_bytes, slot_size):
+    """
+    Build a cache from a backend setting: "shm", "local", a redis:// URL, or
+    "" for none. Returns None if the backend is disabled or unavailable.
+    """
+    if not backend:
+        return None
+    try:
+        if backend == "shm":
+            return SharedMemoryCache(name, size_bytes=size_bytes, slot_size=slot_size)
+        if backend == "local":
+            return LocalCache(max_entries=max(1, size_bytes // slot_size))
+        if backend.startswith(("redis://", "rediss://", "unix://")):
+            return RedisCache(backend, prefix=f"{name}:")
+    except Exception as e:
+        print(f"⚠️ Shared cache '{name}' not available ({backend}): {str(e)}")
+        return None
+    print(f"⚠️ Unknown shared cache backend '{backend}'")
+    return None
@@ -0,0 +1,96 @@
+"""
+Single-flight coalescing for identical in-flight requests
+
+When several identical requests arrive while the first one is still running
+(double-clicks, client retries), only one execution runs and every caller
+awaits its result. If every caller goes away before the result is ready, the
+execution is told to stop through its cancel event.
+"""
+
+import asyncio
+import functools
+import threading
+
+
+class CallerDisconnected(Exception):
+    """Raised to a caller whose disconnect watcher fired before the result was ready."""
+
+
+class _Call:
+    def __init__(self, future, cancel_event):
+        self.future = future
+        self.cancel_event = cancel_event
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The wrapped function runs in the event loop's default thread pool so the
+    loop stays free to accept the duplicate requests that will join it. It is
+    called with a cancel_event keyword argument (a threading.Event) that is
+    set once no caller is waiting for the result any more.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key, func, *args, disconnected=None):
+        """
+        Run func(*args, cancel_event=...) unless a call with the same key is
+        already in flight, in which case await that call's result instead.
+
+        Args:
+            disconnected: Optional awaitable that completes when this caller
+                goes away; the caller then stops waiting and gets
+                CallerDisconnected
+        """
+        call = self._calls.get(key)
+        if call is None or call.cancel_event.is_set():
+            loop = asyncio.get_running_loop()
+            cancel_event = threading.Event()
+            future = loop.run_in_executor(None, functools.partial(func, *args, cancel_event=cancel_event))
+            call = _Call(future, cancel_event)
+            self._calls[key] = call
+            self.executions += 1
+            future.add_done_callback(lambda done, call=call: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # Shield so a disconnecting caller cannot cancel the shared future
+            if disconnected is None:
+                return await asyncio.shield(call.future)
+
+            watcher = asyncio.ensure_future(disconnected)
+            try:
+                await asyncio.wait({call.future, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                watcher.cancel()
+            if not call.future.done():
+                raise CallerDisconnected()
+            return call.future.result()
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.future.done():
+                # Nobody is left to receive the result
+                call.cancel_event.set()
+                self.cancelled += 1
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self):
+        """Return execution, coalescing and cancellation counters."""
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
@@ -0,0 +1,116 @@
+"""
+Slow-request log
+
+Transforms slower than a threshold are kept in a bounded in-memory ring
+buffer (served by /admin/slow-requests) and optionally appended to a JSONL
+file. Entries describe the request without its content: input size,
+sentence count, options, per-stage timings, cache hits and a SHA-256
+fingerprint of the text, so repeated slow inputs can be recognised.
+
+File appends happen on a background thread (a logging QueueListener), so a
+slow request never waits for the disk on the event loop.
+"""
+
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import deque
+from logging.handlers import QueueListener
+
+
+def fingerprint(text):
+    """SHA-256 hex digest of the UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SlowRequestLog:
+    """
+    Keeps the last max_entries requests that took at least threshold_ms.
+
+    Args:
+        threshold_ms: Requests at or above this duration are recorded (0 records all)
+        max_entries: Size of the ring buffer
+        path: Optional JSONL file every recorded entry is appended to
+    """
+
+    def __init__(self, threshold_ms=1000, max_entries=200, path=None):
+        self.threshold_ms = threshold_ms
+        self.path = path
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+        self._lines = None
+        self._writer = None
+        if path:
+            handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._lines = queue.SimpleQueue()
+            self._writer = QueueListener(self._lines, handler)
+            self._writer.start()
+
+    def is_slow(self, duration_ms):
+        return duration_ms >= self.threshold_ms
+
+    def record(self, endpoint, duration_ms, text, result, options, timings=None):
+        """
+        Records a request if it was slow. Returns the entry, or None.
+
+        Args:
+            endpoint: Request path
+            duration_ms: Total request time
+            text: Input text (only its length and hash are kept)
+            result: Transform result with word/sentence counts
+            options: Effective request options (engine, use_passive, ...)
+            timings: {"stages_ms": {...}, "counts": {...}} for the request
+        """
+        if not self.is_slow(duration_ms):
+            return None
+
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "endpoint": endpoint,
+            "duration_ms": round(duration_ms, 3),
+            "input": {
+                "chars": len(text),
+                "bytes": len(text.encode("utf-8")),
+                "words": result.get("original_word_count"),
+                "sentences": result.get("original_sentence_count"),
+                "sha256": fingerprint(text),
+            },
+            "options": options,
+            "partial": result.get("partial"),
+            "timings": timings or {},
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self.recorded += 1
+        lines = self._lines
+        if lines is not None:
+            lines.put_nowait(logging.makeLogRecord({"msg": json.dumps(entry, ensure_ascii=False)}))
+        return entry
+
+    def entries(self, limit=None):
+        """Recorded entries, newest first."""
+        with self._lock:
+            entries = list(reversed(self._entries))
+        return entries[:limit] if limit else entries
+
+    def close(self):
+        """Write out queued entries and stop the file writer."""
+        if self._writer is not None:
+            self._writer.stop()
+            for handler in self._writer.handlers:
+                handler.close()
+            self._writer = None
+            self._lines = None
+
+    def stats(self):
+        return {
+            "threshold_ms": self.threshold_ms,
+            "recorded": self.recorded,
+            "buffered": len(self._entries),
+        }
@@ -0,0 +1,115 @@
+"""
+Tests for the regex-only fast engine
+"""
+
+import random
+import threading
+
+import pytest
+
+from transformer import app_fast
+from transformer.app_fast import AcademicTextHumanizer, count_sentences, count_words, split_sentences
+from transformer.lexicon import ACADEMIC_TRANSITIONS, SIMPLE_SYNONYMS
+
+
+@pytest.fixture
+def humanizer():
+    return AcademicTextHumanizer()
+
+
+@pytest.mark.parametrize("original, expanded", [
+    ("I can't go.", "I cannot go."),
+    ("Can't stop.", "Cannot stop."),
+    ("They won't ask.", "They will not ask."),
+    ("Won't they?", "Will not they?"),
+    ("She doesn't know.", "She does not know."),
+    ("We'll see, they're here and I'm done.", "We will see, they are here and I am done."),
+    ("It’s fine.", "It is fine."),
+    ("You'd think we've won.", "You would think we have won."),
+    ("dont do it", "do not do it"),
+    ("Dont do it", "Do not do it"),
+    ("The cantilever is fine.", "The cantilever is fine."),
+])
+def test_expand_contractions(humanizer, original, expanded):
+    assert humanizer.expand_contractions(original) == expanded
+
+
+def test_synonyms_come_from_the_table_and_keep_case(humanizer):
+    rng = random.Random(1)
+    seen = set()
+    for _ in range(50):
+        capitalized, lower = humanizer.replace_with_synonyms("Big good", rng).split(" ", 1)
+        assert capitalized in ["Big"] + [synonym.capitalize() for synonym in SIMPLE_SYNONYMS["big"]]
+        assert lower in ["good"] + SIMPLE_SYNONYMS["good"]
+        seen.add(capitalized)
+    # Each word is replaced about half the time
+    assert "Big" in seen and len(seen) > 1
+
+
+def test_replace_with_synonyms_also_expands_contractions(humanizer):
+    assert humanizer.replace_with_synonyms("It isn't there.", random.Random(0)) == "It is not there."
+
+
+def test_split_sentences():
+    text = 'He said "Stop." Then left!  Why?\n\nNew paragraph. (See above.) Done'
+    assert split_sentences(text) == [
+        'He said "Stop."', "Then left!", "Why?", "New paragraph.", "(See above.)", "Done"
+    ]
+    assert split_sentences("   ") == []
+
+
+def test_counts():
+    assert count_words("I can't go, really.") == 6
+    assert count_sentences("One. Two!\n\nThree") == 3
+
+
+def test_passive_is_not_supported(humanizer):
+    assert app_fast.SUPPORTS_PASSIVE is False
+    assert humanizer.convert_to_passive("The board approved the budget.") == "The board approved the budget."
+    text = "The board approved the budget. The team wrote the report."
+    for seed in range(5):
+        with_passive = humanizer.humanize_text(text, use_passive=True, rng=random.Random(seed))
+        assert with_passive == humanizer.humanize_text(text, use_passive=False, rng=random.Random(seed))
+
+
+def test_seeded_result_is_deterministic(humanizer):
+    text = "I don't think it's a big problem. We can't ignore the good results. They're important."
+    first = humanizer.humanize_text(text, use_synonyms=True, rng=random.Random(7))
+    assert humanizer.humanize_text(text, use_synonyms=True, rng=random.Random(7)) == first
+    assert AcademicTextHumanizer().humanize_text(text, use_synonyms=True, rng=random.Random(7)) == first
+    assert "n't" not in first and "'s" not in first and "'re" not in first
+
+
+def test_transitions_are_prepended():
+    humanizer = AcademicTextHumanizer(p_academic_transition=1.0)
+    result = humanizer.humanize_text("It works. It is fast.", rng=random.Random(0))
+    sentences = split_sentences(result)
+    assert len(sentences) == 2
+    for sentence in sentences:
+        transition, rest = sentence.split(" ", 1)
+        assert transition in ACADEMIC_TRANSITIONS
+        assert rest in ("It works.", "It is fast.")
+
+
+def test_empty_text_is_returned_unchanged(humanizer):
+    result = humanizer.humanize_text_with_status("  ")
+    assert (result.text, result.completed) == ("  ", True)
+
+
+def test_cancel_keeps_unprocessed_sentences(humanizer):
+    cancel = threading.Event()
+    progress = []
+
+    def on_progress(done, total):
+        progress.append((done, total))
+        if done == 2:
+            cancel.set()
+
+    text = "It isn't one. It isn't two. It isn't three. It isn't four."
+    result = humanizer.humanize_text_with_status(
+        text, rng=random.Random(0), cancel_event=cancel, progress_callback=on_progress
+    )
+    assert result.completed is False
+    assert progress == [(1, 4), (2, 4)]
+    assert result.text.endswith("It isn't three. It isn't four.")
+    assert result.text.count("is not") == 2
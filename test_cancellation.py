@@ -0,0 +1,157 @@
+"""
+Tests for deadlines and cancellation of humanize_text
+"""
+
+import types
+import asyncio
+import importlib
+import threading
+
+import pytest
+
+from singleflight import CallerDisconnected, SingleFlight
+from transformer import cancellation
+from transformer.cancellation import StopCheck
+
+TEXT = "It isn't one. It isn't two. It isn't three. It isn't four."
+SENTENCES = ["It isn't one.", "It isn't two.", "It isn't three.", "It isn't four."]
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cancellation, "time", types.SimpleNamespace(time=fake.time))
+    return fake
+
+
+@pytest.fixture(params=["transformer.app", "transformer.app_no_models", "transformer.app_fast"])
+def humanizer(request, monkeypatch):
+    """
+    A humanizer of each engine. The spaCy model and sentence transformer are
+    stubbed with a blank pipeline that only splits sentences, which is all the
+    deadline handling needs; no sentence is tagged, so the NLTK tagger is not
+    loaded either.
+    """
+    import spacy
+
+    module = importlib.import_module(request.param)
+
+    def blank_pipeline():
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    monkeypatch.setattr(module, "load_spacy_model", blank_pipeline)
+    if request.param == "transformer.app":
+        monkeypatch.setattr(
+            module.AcademicTextHumanizer, "_load_sentence_transformer_with_fallback",
+            lambda self, model_name, quantize=False: None
+        )
+    if request.param == "transformer.app_fast":
+        return module.AcademicTextHumanizer(p_academic_transition=0.0)
+    return module.AcademicTextHumanizer(p_academic_transition=0.0, pos_tagger="spacy")
+
+
+def expected_text(humanizer, processed):
+    """TEXT with the first processed sentences rewritten (transitions are off, so only contractions change)"""
+    return " ".join([humanizer.expand_contractions(s) for s in SENTENCES[:processed]] + SENTENCES[processed:])
+
+
+def hook_sentences(humanizer, before):
+    """Calls before() as each sentence is rewritten, ahead of the engine's first stage"""
+    name = "_replace" if humanizer.__module__ == "transformer.app_fast" else "expand_contractions"
+    rewrite = getattr(humanizer, name)
+
+    def hooked(*args):
+        before()
+        return rewrite(*args)
+
+    setattr(humanizer, name, hooked)
+
+
+def test_stop_check():
+    event = threading.Event()
+    stop = StopCheck(cancel_event=event)
+    assert stop() is False
+    event.set()
+    assert stop() is True
+    # Stays triggered
+    event.clear()
+    assert stop() is True
+    assert StopCheck()() is False
+
+
+def test_stop_check_deadline(clock):
+    stop = StopCheck(deadline=1001.0)
+    assert stop() is False
+    clock.now = 1001.0
+    assert stop() is True
+
+
+def test_deadline_stops_between_sentences_and_keeps_the_finished_prefix(humanizer, clock):
+    expected = expected_text(humanizer, 2)
+
+    def tick():
+        # Each sentence takes one second of the fake clock
+        clock.now += 1.0
+
+    hook_sentences(humanizer, tick)
+    result = humanizer.humanize_text_with_status(TEXT, deadline=1001.5)
+
+    assert result.completed is False
+    assert (result.sentences_processed, result.sentences_total) == (2, 4)
+    assert result.text == expected
+    assert humanizer.humanize_text(TEXT, deadline=1000.0) == TEXT
+
+
+def test_without_deadline_every_sentence_is_processed(humanizer):
+    result = humanizer.humanize_text_with_status(TEXT)
+    assert result.completed is True
+    assert (result.sentences_processed, result.sentences_total) == (4, 4)
+    assert result.text == expected_text(humanizer, 4)
+
+
+def test_singleflight_disconnect_cancels_the_running_transform(humanizer):
+    started = threading.Event()
+    release = threading.Event()
+    expected = expected_text(humanizer, 1)
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    hook_sentences(humanizer, block)
+    results = []
+
+    def transform(text, cancel_event):
+        result = humanizer.humanize_text_with_status(text, cancel_event=cancel_event)
+        results.append(result)
+        return result
+
+    async def main():
+        flight = SingleFlight()
+        gone = asyncio.Event()
+        caller = asyncio.ensure_future(flight.do("key", transform, TEXT, disconnected=gone.wait()))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        gone.set()
+        with pytest.raises(CallerDisconnected):
+            await caller
+        assert flight.stats()["cancelled"] == 1
+        release.set()
+
+    # asyncio.run waits for the executor, so the transform has returned afterwards
+    asyncio.run(main())
+
+    assert len(results) == 1
+    assert results[0].completed is False
+    # The sentence in progress finishes; the rest are returned unchanged
+    assert results[0].sentences_processed == 1
+    assert results[0].text == expected
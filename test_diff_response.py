@@ -0,0 +1,69 @@
+"""
+Tests for the compact diff response format
+"""
+
+import random
+
+import pytest
+
+from diff_response import apply_edits, compute_edits
+
+CASES = [
+    ("", ""),
+    ("Unchanged text.", "Unchanged text."),
+    ("I don't think so.", "I do not think so."),
+    ("The results are clear. We can't ignore them.",
+     "Moreover, the results are clear. We cannot ignore them."),
+    ("The board approved the budget.", "The budget was approved by the board."),
+    ("It is a big result.", "It is a substantial result."),
+    # Sentence count changes, so sentences are aligned before diffing
+    ("First one. Second one. Third one.", "First one. Third one."),
+    ("One sentence. Two sentence.", "One sentence. A new one. Two sentence."),
+    ("Paragraph one.\n\nParagraph two.", "Paragraph one.\n\nHence, paragraph two."),
+    # Characters outside the BMP take two UTF-16 code units
+    ("Emoji 😀 first. It's 日本語 after.", "Emoji 😀 first. It is 日本語 after."),
+    ("Trailing space ", "Trailing  space"),
+]
+
+
+@pytest.mark.parametrize("original, transformed", CASES)
+def test_round_trip(original, transformed):
+    edits = compute_edits(original, transformed)
+    assert apply_edits(original, edits) == transformed
+
+
+def test_identical_texts_have_no_edits():
+    assert compute_edits("Same.", "Same.") == []
+
+
+def test_offsets_count_utf16_code_units():
+    edits = compute_edits("😀 can't", "😀 cannot")
+    assert edits == [[3, 5, "cannot", "contraction"]]
+
+
+def test_stages_are_classified():
+    stages = {edit[3] for edit in compute_edits(
+        "I don't agree. It is a big result.", "I do not agree. Moreover, it is a substantial result."
+    )}
+    assert {"contraction", "synonym"} <= stages
+
+
+def test_round_trip_random_word_edits():
+    rng = random.Random(7)
+    words = ["alpha", "beta", "can't", "gamma.", "delta", "it's", "épée", "😀", "end."]
+    for _ in range(200):
+        original = " ".join(rng.choice(words) for _ in range(rng.randint(0, 30)))
+        tokens = original.split(" ")
+        for _ in range(rng.randint(0, 5)):
+            if not tokens:
+                break
+            index = rng.randrange(len(tokens))
+            action = rng.choice(("replace", "insert", "delete"))
+            if action == "replace":
+                tokens[index] = rng.choice(words)
+            elif action == "insert":
+                tokens.insert(index, rng.choice(words))
+            else:
+                del tokens[index]
+        transformed = " ".join(tokens)
+        assert apply_edits(original, compute_edits(original, transformed)) == transformed
@@ -0,0 +1,91 @@
+"""
+Tests that engine optimizations leave the output unchanged
+
+These are the exact cases of benchmarks/engine_equivalence.py for the full
+engine. They need the spaCy model and are skipped where it is not installed.
+Parallel pool-size invariance is covered in test_parallel.py.
+"""
+
+import os
+import random
+import importlib.util
+
+import pytest
+
+REFERENCE_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "reference_app.py")
+
+TEXTS = [
+    "I don't think the committee has read the report yet. It's a good idea to wait. "
+    "The researchers collected the samples in the spring, and they're happy with the results.",
+    "The board approved the new budget after a long discussion. They won't change it this year. "
+    "We can't ignore the big problem, but the effect is important.",
+]
+SEEDS = [1, 2, 3]
+OPTION_COMBINATIONS = [(False, False), (True, False), (False, True), (True, True)]
+
+
+def outputs(humanizer, global_seed=False):
+    """Output for every text, seed and option combination, with the seed set the harness's way."""
+    results = []
+    for text in TEXTS:
+        for seed in SEEDS:
+            for use_passive, use_synonyms in OPTION_COMBINATIONS:
+                if global_seed:
+                    random.seed(seed)
+                    results.append(humanizer.humanize_text(text, use_passive, use_synonyms))
+                else:
+                    results.append(humanizer.humanize_text(
+                        text, use_passive, use_synonyms, rng=random.Random(seed)
+                    ))
+    return results
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Builds full engines, skipping the test when the models cannot be loaded here."""
+    from transformer.app import AcademicTextHumanizer, download_nltk_resources
+
+    download_nltk_resources()
+
+    def build(**kwargs):
+        try:
+            return AcademicTextHumanizer(**kwargs)
+        except Exception as e:
+            pytest.skip(f"full engine unavailable: {type(e).__name__}: {e}")
+    return build
+
+
+@pytest.fixture(scope="module")
+def default_outputs(engine):
+    return outputs(engine())
+
+
+def test_default_engine_matches_pinned_reference(engine, default_outputs):
+    spec = importlib.util.spec_from_file_location("reference_app", REFERENCE_ENGINE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    try:
+        reference = module.AcademicTextHumanizer()
+    except Exception as e:
+        pytest.skip(f"reference engine unavailable: {type(e).__name__}: {e}")
+    assert default_outputs == outputs(reference, global_seed=True)
+
+
+def test_per_sentence_scoring_matches_batched(engine, default_outputs):
+    assert outputs(engine(batch_synonym_scoring=False)) == default_outputs
+
+
+def test_parse_cache_does_not_change_output(engine, default_outputs):
+    humanizer = engine(parse_cache_size=64)
+    assert outputs(humanizer) == default_outputs
+    # Second pass is served from the cache
+    assert outputs(humanizer) == default_outputs
+    assert humanizer.parse_cache.stats()["memory_hits"] > 0
+
+
+def test_warm_sentence_memo_matches_cold_run(engine):
+    humanizer = engine(sentence_memo_size=1024)
+    cold = outputs(humanizer)
+    warm = outputs(humanizer)
+    assert warm == cold
+    assert humanizer.sentence_memo.stats()["hits"] > 0
@@ -0,0 +1,107 @@
+"""
+Tests for per-request engine routing
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from engine_router import Engine, EngineRouter
+
+
+def router_with(*names, **kwargs):
+    router = EngineRouter(**kwargs)
+    router.engines = {name: SimpleNamespace(name=name) for name in names}
+    return router
+
+
+def routed(router, *args, **kwargs):
+    engine, reason = router.route(*args, **kwargs)
+    return engine.name, reason
+
+
+def test_routing_order():
+    router = router_with("full", "model_free", "fast", fast_budget_ms=500, load_threshold=2)
+
+    assert routed(router) == ("full", "default")
+    # An explicit engine beats every other rule
+    router.in_flight = 5
+    assert routed(router, "model_free", 100, "guest") == ("model_free", "requested")
+    # A latency budget beats the tier and the load
+    assert routed(router, None, 100, "pro") == ("fast", "latency_budget")
+    assert routed(router, None, 501, "guest") == ("fast", "tier")
+    # Tiers are matched case-insensitively; unknown and missing tiers are not cheap
+    assert routed(router, None, None, "FREE") == ("fast", "tier")
+    router.in_flight = 0
+    assert routed(router, None, None, "bogus") == ("full", "default")
+    assert routed(router, None, None, None) == ("full", "default")
+    router.in_flight = 2
+    assert routed(router, None, None, "pro") == ("fast", "load")
+    assert router.routed == {"full": 3, "model_free": 1, "fast": 4}
+
+
+def test_unknown_or_unloaded_engine_raises():
+    router = router_with("fast")
+    with pytest.raises(KeyError):
+        router.route("full")
+    with pytest.raises(KeyError):
+        router.route("nonexistent")
+
+
+def test_falls_back_to_cheapest_loaded_engine():
+    router = router_with("model_free", "full", default_engine="missing")
+    assert routed(router) == ("model_free", "default")
+    assert routed(router, tier="guest") == ("model_free", "tier")
+
+
+def test_no_engines_loaded():
+    assert EngineRouter().route() == (None, "unavailable")
+    assert EngineRouter().default() is None
+
+
+def test_seed_zero_is_a_seed():
+    engine = Engine("fast")
+    text = "I don't think it's a big problem. We can't ignore the good results. It's important."
+    expected = engine.humanizer.humanize_text(text, use_synonyms=True, rng=random.Random(0))
+    for _ in range(3):
+        random.seed()  # An unseeded run would follow the global sequence
+        result = engine.transform_with_stats(text, False, True, 0)
+        assert result["transformed_text"] == expected
+        assert result["partial"] is False
+
+
+def test_transform_with_stats_counts():
+    engine = Engine("fast")
+    result = engine.transform_with_stats("It's here. It's there.", False, False, 1)
+    assert (result["original_word_count"], result["original_sentence_count"]) == (6, 2)
+    assert result["transformed_sentence_count"] == 2
+    assert "stages_ms" in result["timings"]
+
+
+def test_in_flight_is_counted_during_the_transform(api, monkeypatch):
+    import api_main
+
+    seen = []
+    transform = api_main._transform_with_stats
+
+    def counting_transform(*args, **kwargs):
+        seen.append(api_main.engine_router.in_flight)
+        return transform(*args, **kwargs)
+
+    monkeypatch.setattr(api_main, "_transform_with_stats", counting_transform)
+    assert api.post("/api/transform", json={"text": "It's a test."}).status_code == 200
+    assert seen == [1]
+    assert api_main.engine_router.in_flight == 0
+
+
+def test_in_flight_is_released_when_the_transform_fails(api, monkeypatch):
+    import api_main
+
+    def failing_transform(*args, **kwargs):
+        raise RuntimeError("engine crashed")
+
+    monkeypatch.setattr(api_main, "_transform_with_stats", failing_transform)
+    response = api.post("/api/transform", json={"text": "It's a test."})
+    assert response.status_code == 500
+    assert api_main.engine_router.in_flight == 0
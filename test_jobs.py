@@ -0,0 +1,203 @@
+"""
+Tests for the asynchronous job store and runner
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+import pytest
+
+from jobs import COMPLETED, FAILED, QUEUED, RUNNING, JobRunner, JobStore
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def set_fields(store, job_id, **fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with sqlite3.connect(store.db_path) as db:
+        db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path), ttl_seconds=3600, lease_seconds=30)
+
+
+def echo_job(text, options, progress_callback):
+    progress_callback(1, 2)
+    return {"text": text.upper(), **options}, 2, 2
+
+
+def test_submit_progress_result(store):
+    release = threading.Event()
+
+    def run_job(text, options, progress_callback):
+        progress_callback(3, 10)
+        release.wait(5)
+        return {"transformed_text": text[::-1]}, 10, 10
+
+    runner = JobRunner(store, run_job)
+    job_id = store.create("abc", {"engine": "fast"})
+    assert store.get(job_id)["status"] == QUEUED
+
+    runner.submit(job_id)
+    assert wait_for(lambda: store.get(job_id)["sentences_processed"] == 3)
+    job = store.get(job_id)
+    assert (job["status"], job["sentences_total"]) == (RUNNING, 10)
+    assert job["lease_expires_at"] > time.time()
+
+    release.set()
+    assert wait_for(lambda: store.get(job_id)["status"] == COMPLETED)
+    job = store.get(job_id)
+    assert (job["sentences_processed"], job["sentences_total"]) == (10, 10)
+    assert job["finished_at"] is not None
+    assert store.load_result(job_id) == b'{"transformed_text": "cba"}'
+    runner.shutdown()
+
+
+def test_failed_job_records_error(store):
+    def run_job(text, options, progress_callback):
+        raise RuntimeError("engine missing")
+
+    runner = JobRunner(store, run_job)
+    job_id = store.create("abc", {})
+    runner.submit(job_id)
+    assert wait_for(lambda: store.get(job_id)["status"] == FAILED)
+    assert store.get(job_id)["error"] == "engine missing"
+    runner.shutdown()
+
+
+def test_claim_is_atomic(store):
+    job_id = store.create("abc", {})
+    assert store.claim(job_id) is True
+    assert store.claim(job_id) is False
+    assert store.get(job_id)["status"] == RUNNING
+
+
+def test_resume_runs_queued_jobs(store):
+    job_ids = [store.create(f"text {i}", {"i": i}) for i in range(3)]
+    runner = JobRunner(store, echo_job)
+    assert runner.resume() == 3
+    assert wait_for(lambda: all(store.get(job_id)["status"] == COMPLETED for job_id in job_ids))
+    runner.shutdown()
+
+
+def test_resume_from_several_workers_runs_each_job_once(store):
+    runs = []
+    runs_lock = threading.Lock()
+
+    def run_job(text, options, progress_callback):
+        with runs_lock:
+            runs.append(text)
+        time.sleep(0.01)
+        return {}, 1, 1
+
+    job_ids = [store.create(f"text {i}", {}) for i in range(10)]
+    runners = [JobRunner(store, run_job, workers=2) for _ in range(4)]
+    for runner in runners:
+        runner.resume()
+
+    assert wait_for(lambda: all(store.get(job_id)["status"] == COMPLETED for job_id in job_ids))
+    assert sorted(runs) == sorted(f"text {i}" for i in range(10))
+    for runner in runners:
+        runner.shutdown()
+
+
+def test_resume_skips_running_job_with_live_lease(store):
+    job_id = store.create("abc", {})
+    store.claim(job_id)  # Running in another worker that is still alive
+
+    runner = JobRunner(store, echo_job)
+    assert runner.resume() == 0
+    assert store.get(job_id)["status"] == RUNNING
+    runner.shutdown()
+
+
+def test_resume_requeues_running_job_with_expired_lease(store):
+    job_id = store.create("abc", {})
+    store.claim(job_id)
+    # Its worker died and stopped renewing the lease
+    set_fields(store, job_id, lease_expires_at=time.time() - 1)
+
+    runner = JobRunner(store, echo_job)
+    assert runner.resume() == 1
+    assert wait_for(lambda: store.get(job_id)["status"] == COMPLETED)
+    runner.shutdown()
+
+
+def test_heartbeat_renews_lease_of_long_job(tmp_path):
+    store = JobStore(str(tmp_path), lease_seconds=0.3)
+    release = threading.Event()
+
+    def run_job(text, options, progress_callback):
+        release.wait(5)
+        return {}, 1, 1
+
+    runner = JobRunner(store, run_job)
+    job_id = store.create("abc", {})
+    runner.submit(job_id)
+    assert wait_for(lambda: store.get(job_id)["status"] == RUNNING)
+    time.sleep(0.8)
+    # Past the original lease, but renewed by the heartbeat
+    assert store.get(job_id)["lease_expires_at"] > time.time()
+    assert store.requeue_expired() == 0
+
+    release.set()
+    assert wait_for(lambda: store.get(job_id)["status"] == COMPLETED)
+    runner.shutdown()
+
+
+def test_cleanup_removes_only_finished_jobs_past_ttl(store):
+    old = time.time() - 7200
+    running = store.create("running", {})
+    store.claim(running)
+    set_fields(store, running, created_at=old)
+
+    queued = store.create("queued", {})
+    set_fields(store, queued, created_at=old)
+
+    expired = store.create("expired", {})
+    store.complete(expired, {"ok": True}, 1, 1)
+    set_fields(store, expired, created_at=old, finished_at=old)
+
+    failed = store.create("failed", {})
+    store.fail(failed, "boom")
+    set_fields(store, failed, created_at=old, finished_at=old)
+
+    # Created long ago but finished just now, so its TTL has only started
+    recent = store.create("recent", {})
+    set_fields(store, recent, created_at=old)
+    store.complete(recent, {"ok": True}, 1, 1)
+
+    assert store.cleanup() == 2
+    assert store.get(expired) is None
+    assert store.get(failed) is None
+    assert not os.path.exists(store._path(expired, "input.txt"))
+    assert not os.path.exists(store._path(expired, "result.json"))
+    for job_id in (running, queued, recent):
+        assert store.get(job_id) is not None
+    assert store.load_input(running) == "running"
+
+
+def test_store_upgrades_database_without_new_columns(tmp_path):
+    with sqlite3.connect(os.path.join(tmp_path, "jobs.sqlite3")) as db:
+        db.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, options TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "sentences_processed INTEGER NOT NULL DEFAULT 0, sentences_total INTEGER, error TEXT)"
+        )
+        db.execute("INSERT INTO jobs VALUES ('old', 'completed', '{}', 1, 2, 1, 1, NULL)")
+
+    store = JobStore(str(tmp_path), ttl_seconds=3600)
+
+    assert store.get("old")["finished_at"] == 2
+    assert store.cleanup() == 1
@@ -0,0 +1,84 @@
+"""
+Tests for load shedding of transform requests
+"""
+
+import pytest
+
+from load_shedding import (
+    FULL_FEATURES, NO_SYNONYMS, NO_SYNONYMS_OR_PASSIVE, REJECT, LoadShedder, Overloaded
+)
+
+
+def test_levels_follow_queue_depth():
+    shedder = LoadShedder(synonyms_queue_depth=2, passive_queue_depth=4, reject_queue_depth=6)
+    assert [shedder.level(depth) for depth in (0, 2, 4, 6)] == [
+        FULL_FEATURES, NO_SYNONYMS, NO_SYNONYMS_OR_PASSIVE, REJECT
+    ]
+
+
+def test_apply_drops_synonyms_then_passive():
+    shedder = LoadShedder(synonyms_queue_depth=2, passive_queue_depth=4)
+    assert shedder.apply(True, True, 0) == (True, True, False)
+    assert shedder.apply(True, True, 2) == (True, False, True)
+    assert shedder.apply(True, True, 4) == (False, False, True)
+    # Nothing to drop, so the request is not counted as degraded
+    assert shedder.apply(False, False, 4) == (False, False, False)
+
+
+def test_p95_trigger():
+    shedder = LoadShedder(synonyms_queue_depth=0, passive_queue_depth=0, synonyms_p95_ms=100)
+    for _ in range(20):
+        shedder.record(0.01)
+    assert shedder.level(0) == FULL_FEATURES
+    for _ in range(5):
+        shedder.record(0.5)
+    assert shedder.level(0) == NO_SYNONYMS
+
+
+def test_apply_raises_past_reject_depth():
+    shedder = LoadShedder(reject_queue_depth=3, retry_after_seconds=7)
+    with pytest.raises(Overloaded) as excinfo:
+        shedder.apply(False, False, 3)
+    assert excinfo.value.retry_after == 7
+    assert shedder.stats()["rejected"] == 1
+
+
+def test_reject_depth_zero_never_rejects():
+    shedder = LoadShedder(synonyms_queue_depth=0, passive_queue_depth=0, reject_queue_depth=0)
+    assert shedder.apply(True, True, 10000) == (True, True, False)
+
+
+def test_transform_returns_503_with_retry_after_when_overloaded(api, monkeypatch):
+    import api_main
+
+    monkeypatch.setattr(api_main, "load_shedder", LoadShedder(reject_queue_depth=2, retry_after_seconds=7))
+    api_main.engine_router.in_flight = 2
+
+    response = api.post("/api/transform", json={"text": "It's a test."})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_transform_file_returns_503_when_overloaded(api, monkeypatch):
+    import api_main
+
+    monkeypatch.setattr(api_main, "load_shedder", LoadShedder(reject_queue_depth=2))
+    api_main.engine_router.in_flight = 5
+
+    response = api.post("/api/transform-file", files={"file": ("doc.txt", b"It's a test.", "text/plain")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_transform_reports_degraded_below_reject_depth(api, monkeypatch):
+    import api_main
+
+    monkeypatch.setattr(api_main, "load_shedder", LoadShedder(synonyms_queue_depth=1, reject_queue_depth=4))
+    api_main.engine_router.in_flight = 1
+
+    response = api.post("/api/transform", json={"text": "It's a test.", "use_synonyms": True})
+
+    assert response.status_code == 200
+    assert response.json()["degraded"] is True
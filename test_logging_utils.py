@@ -0,0 +1,112 @@
+"""
+Tests for rate-limited event logging
+"""
+
+import json
+import logging
+
+import pytest
+
+from transformer.logging_utils import EventLog, JSONFormatter
+
+LOGGER = "humanizer-test-events"
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FixedDraws:
+    """Stands in for random.Random, returning the given draws in order."""
+
+    def __init__(self, *draws):
+        self.draws = list(draws)
+
+    def random(self):
+        return self.draws.pop(0)
+
+
+@pytest.fixture
+def log_capture(caplog):
+    caplog.set_level(logging.DEBUG, logger=LOGGER)
+    return caplog
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def messages(caplog):
+    return [record.getMessage() for record in caplog.records]
+
+
+def test_rate_limit_reports_suppressed_count(log_capture, clock):
+    log = EventLog(LOGGER, interval=10.0, burst=2, clock=clock)
+
+    logged = [log.warning("parse", "Parse failed for sentence %d", i) for i in range(5)]
+    assert logged == [True, True, False, False, False]
+    clock.now += 9.9
+    assert log.warning("parse", "Parse failed for sentence %d", 5) is False
+    # Other keys have their own window
+    assert log.warning("tag", "Tagging failed") is True
+
+    clock.now += 0.1
+    assert log.warning("parse", "Parse failed for sentence %d", 6) is True
+    assert messages(log_capture) == [
+        "Parse failed for sentence 0",
+        "Parse failed for sentence 1",
+        "Tagging failed",
+        "Parse failed for sentence 6 (4 similar messages suppressed)",
+    ]
+    summary = log_capture.records[-1]
+    assert (summary.event, summary.count, summary.suppressed) == ("parse", 7, 4)
+    assert not hasattr(log_capture.records[0], "suppressed")
+    assert log.stats() == {"parse": 7, "tag": 1}
+
+    # A window without suppressed events adds no summary
+    clock.now += 10.0
+    log.warning("parse", "Parse failed again")
+    assert log_capture.records[-1].getMessage() == "Parse failed again"
+
+
+def test_sampling_applies_below_warning_only(log_capture, clock):
+    log = EventLog(LOGGER, burst=10, sample_rate=0.5, clock=clock, rng=FixedDraws(0.7, 0.2, 0.5))
+
+    assert log.info("cache", "Cache miss %d", 1) is False
+    assert log.info("cache", "Cache miss %d", 2) is True
+    assert log.debug("cache", "Cache miss %d", 3) is False
+    # Warnings and errors are never sampled, so they take no draws
+    assert log.warning("cache", "Cache full") is True
+    assert log.error("cache", "Cache broken") is True
+
+    assert messages(log_capture) == ["Cache miss 2", "Cache full", "Cache broken"]
+    # Sampled-out events are counted, but not reported as suppressed
+    assert log.stats() == {"cache": 5}
+    assert [record.count for record in log_capture.records] == [2, 4, 5]
+    assert not any(hasattr(record, "suppressed") for record in log_capture.records)
+
+
+def test_disabled_levels_are_counted_but_not_logged(caplog, clock):
+    caplog.set_level(logging.WARNING, logger=LOGGER)
+    log = EventLog(LOGGER, clock=clock, rng=FixedDraws())
+    assert log.debug("noise", "Not shown") is False
+    assert log.stats() == {"noise": 1}
+    assert caplog.records == []
+
+
+def test_json_formatter_includes_event_fields(log_capture, clock):
+    log = EventLog(LOGGER, burst=1, clock=clock)
+    log.error("engine", "Engine %s failed", "full")
+    log.error("engine", "Engine %s failed", "full")
+    clock.now += 60.0
+    log.error("engine", "Engine %s failed", "full")
+
+    entry = json.loads(JSONFormatter().format(log_capture.records[-1]))
+    assert entry["message"] == "Engine full failed (1 similar messages suppressed)"
+    assert (entry["level"], entry["logger"]) == ("ERROR", LOGGER)
+    assert (entry["event"], entry["count"], entry["suppressed"]) == ("engine", 3, 1)
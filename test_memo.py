@@ -0,0 +1,106 @@
+"""
+Tests for sentence-level transform memoization
+"""
+
+import random
+import importlib
+import threading
+
+import pytest
+
+from transformer.memo import SentenceMemo, normalize_sentence, sentence_seed
+
+
+def key(sentence, seed=1):
+    return (normalize_sentence(sentence), True, True, seed)
+
+
+def test_hit_and_miss_counters():
+    memo = SentenceMemo(max_size=10)
+    assert memo.get(key("It is here.")) is None
+    memo.put(key("It is here."), "It is present.")
+    assert memo.get(key("It   is\nhere.")) == "It is present."
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_key_includes_options_and_seed():
+    memo = SentenceMemo()
+    memo.put(("Same sentence.", True, True, 1), "first")
+    assert memo.get(("Same sentence.", True, True, 2)) is None
+    assert memo.get(("Same sentence.", False, True, 1)) is None
+
+
+def test_lru_eviction():
+    memo = SentenceMemo(max_size=2)
+    memo.put("a", "A")
+    memo.put("b", "B")
+    assert memo.get("a") == "A"  # "b" is now least recently used
+    memo.put("c", "C")
+    assert memo.get("b") is None
+    assert memo.get("a") == "A"
+    assert memo.get("c") == "C"
+    assert memo.stats()["size"] == 2
+
+
+def test_put_existing_key_refreshes_it():
+    memo = SentenceMemo(max_size=2)
+    memo.put("a", "A")
+    memo.put("b", "B")
+    memo.put("a", "A2")
+    memo.put("c", "C")
+    assert memo.get("a") == "A2"
+    assert memo.get("b") is None
+
+
+def test_sentence_seed_is_stable_and_distinct():
+    assert sentence_seed(42, "A sentence.") == sentence_seed(42, "A sentence.")
+    assert sentence_seed(42, "A sentence.") != sentence_seed(43, "A sentence.")
+    assert sentence_seed(42, "A sentence.") != sentence_seed(42, "Another sentence.")
+    assert 0 <= sentence_seed(42, "A sentence.") < 2 ** 64
+
+
+def test_concurrent_get_and_put():
+    memo = SentenceMemo(max_size=50)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(2000):
+                name = f"s{(i + offset) % 100}"
+                value = memo.get(name)
+                if value is None:
+                    memo.put(name, name.upper())
+                elif value != name.upper():
+                    errors.append((name, value))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = memo.stats()
+    assert errors == []
+    assert stats["size"] <= 50
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+
+
+@pytest.mark.parametrize("module_name", ["transformer.app", "transformer.app_no_models"])
+@pytest.mark.parametrize("sentence_memo_size", [0, 16])
+def test_seeded_humanizer_leaves_global_sequence_alone(module_name, sentence_memo_size):
+    """AcademicTextHumanizer(seed=...) must leave the global RNG where random.seed put it"""
+    module = importlib.import_module(module_name)
+    random.seed(42)
+    expected = [random.random() for _ in range(5)]
+    try:
+        humanizer = module.AcademicTextHumanizer(seed=42, sentence_memo_size=sentence_memo_size)
+    except Exception as e:
+        pytest.skip(f"{module_name} unavailable: {type(e).__name__}: {e}")
+    assert [random.random() for _ in range(5)] == expected
+    if sentence_memo_size:
+        assert humanizer.memo_seed == module.AcademicTextHumanizer(seed=42, sentence_memo_size=16).memo_seed
+    else:
+        assert humanizer.memo_seed is None
@@ -0,0 +1,58 @@
+"""
+Tests for intra-document parallelism
+"""
+
+import pytest
+
+from transformer.parallel import ParallelHumanizer, derive_seed, split_into_chunks
+
+PARAGRAPH = (
+    "I don't think the committee has read the report yet. The team can't finish the study "
+    "before the spring. It's clear that we won't know the full impact until later."
+)
+DOCUMENT = "\n\n".join(f"{PARAGRAPH} Paragraph {i} ends here." for i in range(12))
+
+
+def test_derive_seed_is_stable_and_distinct():
+    assert derive_seed(42, 0) == derive_seed(42, 0)
+    assert len({derive_seed(42, i) for i in range(100)}) == 100
+    assert derive_seed(42, 1) != derive_seed(43, 1)
+    assert 0 <= derive_seed(42, 0) < 2 ** 32
+
+
+@pytest.mark.parametrize("max_chars", [50, 200, 600, 100000])
+def test_split_keeps_every_word_in_order(max_chars):
+    chunks = split_into_chunks(DOCUMENT, max_chars)
+    assert " ".join(chunks).split() == DOCUMENT.split()
+
+
+def test_split_respects_max_chars_except_for_long_sentences():
+    for chunk in split_into_chunks(DOCUMENT, 200):
+        assert len(chunk) <= 200
+    long_sentence = "word " * 100 + "end."
+    assert split_into_chunks(long_sentence, 50) == [long_sentence.strip()]
+
+
+def test_split_prefers_paragraph_breaks():
+    text = "First paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+    assert split_into_chunks(text, 40) == ["First paragraph.\n\nSecond paragraph.", "Third paragraph."]
+
+
+def _transform(workers, seed, use_synonyms=True):
+    humanizer = ParallelHumanizer(workers, module_name="transformer.app_fast", chunk_chars=300)
+    try:
+        return humanizer.transform_with_stats(DOCUMENT, use_synonyms=use_synonyms, seed=seed)
+    finally:
+        humanizer.executor.shutdown(wait=True)
+
+
+def test_output_is_independent_of_pool_size():
+    results = [_transform(workers, seed=1234) for workers in (1, 2, 4)]
+    texts = {result["transformed_text"] for result in results}
+    assert len(texts) == 1
+    assert results[0]["transformed_text"] != DOCUMENT
+    assert results[0]["timings"]["counts"]["parallel_chunks"] == len(split_into_chunks(DOCUMENT, 300))
+    for key in ("original_word_count", "transformed_word_count",
+                "original_sentence_count", "transformed_sentence_count"):
+        assert len({result[key] for result in results}) == 1
+    assert not results[0]["partial"]
@@ -0,0 +1,117 @@
+"""
+Tests for the spaCy parse cache
+"""
+
+import os
+import threading
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from transformer import parse_cache  # noqa: E402
+from transformer.parse_cache import ParseCache  # noqa: E402
+
+
+class CountingPipeline:
+    """Blank English pipeline that counts how often it parses"""
+
+    def __init__(self):
+        self.nlp = spacy.blank("en")
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls += 1
+        return self.nlp(text)
+
+    def __getattr__(self, name):
+        return getattr(self.nlp, name)
+
+
+@pytest.fixture
+def pipeline():
+    return CountingPipeline()
+
+
+def test_memory_hit(pipeline):
+    cache = ParseCache(pipeline, max_size=4)
+    assert cache.lookup("The results are clear.")[1] == "miss"
+    doc, source = cache.lookup("The results are clear.")
+    assert source == "memory"
+    assert doc.text == "The results are clear."
+    assert pipeline.calls == 1
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_lru_eviction(pipeline):
+    cache = ParseCache(pipeline, max_size=2)
+    cache.parse("a")
+    cache.parse("b")
+    cache.parse("a")  # "b" is now least recently used
+    cache.parse("c")
+    assert cache.lookup("a")[1] == "memory"
+    assert cache.lookup("b")[1] == "miss"
+    assert cache.stats()["size"] == 2
+
+
+def test_disk_hit_survives_a_new_cache(pipeline, tmp_path):
+    ParseCache(pipeline, directory=str(tmp_path)).parse("Stored on disk.")
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".spacy")]) == 1
+
+    fresh = ParseCache(pipeline, directory=str(tmp_path))
+    doc, source = fresh.lookup("Stored on disk.")
+    assert source == "disk"
+    assert [token.text for token in doc] == ["Stored", "on", "disk", "."]
+    assert pipeline.calls == 1
+    assert fresh.lookup("Stored on disk.")[1] == "memory"
+
+
+def test_key_depends_on_pipeline(pipeline):
+    other = CountingPipeline()
+    other.nlp.add_pipe("sentencizer")
+    assert ParseCache(pipeline).key("text") != ParseCache(other).key("text")
+
+
+def test_unreadable_disk_entry_is_reparsed(pipeline, tmp_path):
+    cache = ParseCache(pipeline, directory=str(tmp_path))
+    with open(cache._path(cache.key("Broken.")), "wb") as f:
+        f.write(b"not a docbin")
+    assert cache.lookup("Broken.")[1] == "miss"
+
+
+def test_disk_entries_are_pruned(pipeline, tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, "PRUNE_EVERY", 5)
+    cache = ParseCache(pipeline, directory=str(tmp_path), max_disk_entries=3)
+    for i in range(10):
+        cache.parse(f"Sentence number {i}.")
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".spacy")]) <= 3
+
+
+def test_concurrent_lookups(pipeline, tmp_path):
+    cache = ParseCache(pipeline, max_size=8, directory=str(tmp_path))
+    texts = [f"Text {i} is here." for i in range(20)]
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                text = texts[(i + offset) % len(texts)]
+                if cache.parse(text).text != text:
+                    errors.append(text)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 3,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert errors == []
+    assert stats["size"] <= 8
+    assert stats["memory_hits"] + stats["disk_hits"] + stats["misses"] == 8 * 200
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,76 @@
+"""
+Tests for on-demand request profiling
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from profiling import RequestProfiler
+from singleflight import SingleFlight
+
+
+def test_take_consumes_armed_requests(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    assert profiler.take() == 0
+    assert profiler.arm(2) == 2
+    assert [profiler.take(), profiler.take(), profiler.take()] == [1, 2, 0]
+    assert profiler.status()["remaining"] == 0
+
+
+def test_wrap_writes_one_profile_per_call(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    profiled = profiler.wrap(lambda x: x * 2, "double", 7)
+    assert profiled(21) == 42
+    [path] = profiler.status()["files"]
+    assert path.startswith(str(tmp_path / "double-")) and path.endswith("-7.pstats")
+
+
+@pytest.fixture
+def coalescing(monkeypatch, tmp_path):
+    """api_main with a fresh profiler and single-flight, and a transform that waits for release"""
+    import api_main
+
+    monkeypatch.setattr(api_main, "request_profiler", RequestProfiler(str(tmp_path)))
+    monkeypatch.setattr(api_main, "transform_flight", SingleFlight())
+    monkeypatch.setattr(api_main, "result_cache", None)
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_transform(engine, text, *args, **kwargs):
+        started.set()
+        release.wait(5)
+        return {"transformed_text": text.upper(), "partial": False}
+
+    monkeypatch.setattr(api_main, "_transform_with_stats", blocking_transform)
+    return SimpleNamespace(api_main=api_main, started=started, release=release)
+
+
+def test_joining_callers_do_not_take_a_profile(coalescing):
+    api_main = coalescing.api_main
+    api_main.request_profiler.arm(2)
+    engine = SimpleNamespace(name="fast")
+
+    async def main():
+        first = asyncio.ensure_future(api_main._coalesced_transform(engine, "same text", False, False, 1))
+        await asyncio.get_running_loop().run_in_executor(None, coalescing.started.wait, 5)
+        joined = [
+            asyncio.ensure_future(api_main._coalesced_transform(engine, "same text", False, False, 1))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        coalescing.release.set()
+        return await asyncio.gather(first, *joined)
+
+    results = asyncio.run(main())
+
+    assert [result["transformed_text"] for result in results] == ["SAME TEXT"] * 4
+    assert api_main.transform_flight.stats()["coalesced"] == 3
+    # One execution, one profile; the joining requests leave the other armed slot
+    status = api_main.request_profiler.status()
+    assert status["remaining"] == 1
+    assert len(status["files"]) == 1
+    assert "transform-fast-" in status["files"][0]
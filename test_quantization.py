@@ -0,0 +1,110 @@
+"""
+Tests for the int8 quantization check of the full engine
+"""
+
+import numpy as np
+import pytest
+
+from transformer import app
+from transformer.app import QUANTIZATION_CHECK_WORDS, QUANTIZATION_MIN_AGREEMENT
+
+
+class StubEncoder:
+    """Encodes words from a fixed table of vectors."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, strings, normalize_embeddings=False, show_progress_bar=False):
+        rows = np.array([self.vectors[text] for text in strings], dtype=np.float32)
+        if normalize_embeddings:
+            rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows
+
+
+@pytest.fixture
+def humanizer(monkeypatch):
+    """A full engine with a blank spaCy pipeline and no sentence transformer."""
+    import spacy
+
+    def blank_pipeline():
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    monkeypatch.setattr(app, "load_spacy_model", blank_pipeline)
+    monkeypatch.setattr(
+        app.AcademicTextHumanizer, "_load_sentence_transformer_with_fallback",
+        lambda self, model_name, quantize=False: None
+    )
+    return app.AcademicTextHumanizer(pos_tagger="spacy")
+
+
+@pytest.fixture
+def linear_model():
+    torch = pytest.importorskip("torch")
+    return torch.nn.Sequential(torch.nn.Linear(4, 4))
+
+
+def is_quantized(model):
+    return any(".quantized." in type(module).__module__ for module in model.modules())
+
+
+@pytest.mark.parametrize("agreement, keeps_quantized", [
+    (1.0, True),
+    (QUANTIZATION_MIN_AGREEMENT, True),
+    (QUANTIZATION_MIN_AGREEMENT - 0.05, False),
+    # Nothing to compare on: the quantized model is kept unchecked
+    (None, True),
+])
+def test_quantized_model_is_kept_only_with_enough_agreement(humanizer, linear_model, agreement, keeps_quantized):
+    humanizer._synonym_agreement = lambda reference, candidate: agreement
+    model = humanizer._quantize_model(linear_model)
+
+    assert humanizer.quantization_agreement == agreement
+    assert is_quantized(model) is keeps_quantized
+    if not keeps_quantized:
+        assert model is linear_model
+    assert not is_quantized(linear_model)
+
+
+def test_failed_quantization_keeps_the_float_model(humanizer):
+    model = object()
+    assert humanizer._quantize_model(model) is model
+    assert humanizer.quantization_agreement is None
+
+
+def test_synonym_agreement_counts_identical_choices(humanizer):
+    synonyms = {"good": ["fine", "beneficial"], "large": ["big", "heavy"], "quick": ["fast", "speedy"]}
+    humanizer._get_synonyms = lambda word, pos: synonyms.get(word, [])
+    reference = StubEncoder({
+        "good": [1, 0], "beneficial": [1, 0.1], "fine": [0.2, 1],
+        "large": [0, 1], "big": [0.1, 1], "heavy": [1, 0.2],
+        "quick": [1, 1], "fast": [1, 0.9], "speedy": [0.5, 1],
+    })
+    # Flips the choice for "quick" only
+    candidate = StubEncoder({**reference.vectors, "speedy": [1, 1]})
+
+    assert humanizer._synonym_agreement(reference, reference) == 1.0
+    assert humanizer._synonym_agreement(reference, candidate) == pytest.approx(2 / 3)
+
+
+def test_synonym_agreement_without_synonyms(humanizer):
+    humanizer._get_synonyms = lambda word, pos: []
+    assert humanizer._synonym_agreement(None, None) is None
+
+
+def test_default_model_quantizes_with_enough_agreement(humanizer, monkeypatch):
+    """Needs the cached default model and the WordNet corpus; skipped otherwise."""
+    monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+    try:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer("paraphrase-MiniLM-L6-v2", device="cpu")
+    except Exception as e:
+        pytest.skip(f"sentence transformer unavailable: {type(e).__name__}: {e}")
+    if not any(humanizer._get_synonyms(word, pos) for word, pos in QUANTIZATION_CHECK_WORDS):
+        pytest.skip("WordNet corpus unavailable")
+
+    quantized = humanizer._quantize_model(model)
+    assert humanizer.quantization_agreement >= QUANTIZATION_MIN_AGREEMENT
+    assert quantized is not model
@@ -0,0 +1,184 @@
+"""
+Tests for the caches shared between API workers
+"""
+
+import uuid
+import threading
+import multiprocessing
+
+import pytest
+
+from shared_cache import HEADER_SIZE, SLOT_HEADER, LocalCache, SharedMemoryCache
+
+SLOT_SIZE = 256
+WAYS = 2
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(buckets=1, name=None):
+        cache = SharedMemoryCache(
+            name or f"hsc-test-{uuid.uuid4().hex[:12]}",
+            size_bytes=HEADER_SIZE + buckets * WAYS * SLOT_SIZE,
+            slot_size=SLOT_SIZE,
+            ways=WAYS,
+            lock_dir=str(tmp_path)
+        )
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        try:
+            cache.unlink()
+        except FileNotFoundError:
+            pass
+        cache.close()
+
+
+def test_get_set_and_counters(make_cache):
+    cache = make_cache(buckets=8)
+    assert cache.get("missing") is None
+    assert cache.set("key", b"value")
+    assert cache.get("key") == b"value"
+    assert cache.set("key", b"replaced")
+    assert cache.get("key") == b"replaced"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (2, 1, 2)
+
+
+def test_full_set_evicts_oldest_write(make_cache):
+    cache = make_cache(buckets=1)  # Every key lands in the same 2-way set
+    cache.set("first", b"1")
+    cache.set("second", b"2")
+    cache.set("first", b"1 again")  # Rewriting a key refreshes it in place
+    cache.set("third", b"3")
+    assert cache.get("second") is None
+    assert cache.get("first") == b"1 again"
+    assert cache.get("third") == b"3"
+
+
+def test_values_larger_than_a_slot_are_not_cached(make_cache):
+    cache = make_cache()
+    assert cache.max_value_size == SLOT_SIZE - SLOT_HEADER.size
+    assert cache.set("big", b"x" * (cache.max_value_size + 1)) is False
+    assert cache.get("big") is None
+    assert cache.set("fits", b"x" * cache.max_value_size)
+
+
+def test_second_instance_attaches_to_the_same_segment(make_cache):
+    name = f"hsc-test-{uuid.uuid4().hex[:12]}"
+    writer = make_cache(buckets=4, name=name)
+    reader = make_cache(buckets=4, name=name)
+    writer.set("shared", b"yes")
+    assert reader.get("shared") == b"yes"
+
+
+def test_concurrent_get_and_set(make_cache):
+    cache = make_cache(buckets=4)
+    keys = [f"key-{i}" for i in range(32)]
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(500):
+                key = keys[(i + offset) % len(keys)]
+                value = cache.get(key)
+                # A torn read would return bytes that belong to no key
+                if value is not None and value != (key * 4).encode("utf-8"):
+                    errors.append((key, value))
+                cache.set(key, (key * 4).encode("utf-8"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 5,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert errors == []
+    assert stats["hits"] + stats["misses"] == 8 * 500
+    assert stats["writes"] == 8 * 500
+
+
+def _write_from_process(cache, prefix, count):
+    for i in range(count):
+        cache.set(f"{prefix}-{i}", f"{prefix}-{i}".encode("utf-8"))
+
+
+def test_writes_from_other_processes_are_visible(make_cache):
+    cache = make_cache(buckets=64)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_write_from_process, args=(cache, f"p{n}", 20)) for n in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+
+    found = [cache.get(f"p{n}-{i}") for n in range(3) for i in range(20)]
+    assert all(value is None or value.decode("utf-8").startswith("p") for value in found)
+    # 128 slots for 60 keys: most survive hash collisions in their set
+    assert sum(value is not None for value in found) >= 40
+
+
+def test_local_cache_lru_and_concurrency():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", b"A")
+    cache.set("b", b"B")
+    cache.get("a")
+    cache.set("c", b"C")
+    assert cache.get("b") is None
+
+    def worker():
+        for i in range(1000):
+            cache.set(str(i % 5), b"v")
+            cache.get(str(i % 7))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 2 + 4000
+    assert stats["writes"] == 3 + 4000
+
+
+class RecordingCache(LocalCache):
+    """LocalCache that records which threads its methods ran on"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def set(self, key, value):
+        self.threads.append(threading.current_thread())
+        return super().set(key, value)
+
+
+def test_result_cache_is_used_off_the_event_loop(api, monkeypatch):
+    import api_main
+
+    cache = RecordingCache()
+    monkeypatch.setattr(api_main, "result_cache", cache)
+    body = {"text": "I don't think it's ready.", "seed": 7}
+
+    first = api.post("/api/transform", json=body)
+    second = api.post("/api/transform", json=body)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["transformed_text"] == second.json()["transformed_text"]
+    assert (cache.stats()["hits"], cache.stats()["writes"]) == (1, 1)
+    # Two gets and one set, each on a thread pool worker rather than the event loop
+    assert [thread.name for thread in cache.threads] == ["AnyIO worker thread"] * 3
@@ -0,0 +1,100 @@
+"""
+Tests for single-flight coalescing of identical in-flight requests
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from singleflight import CallerDisconnected, SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    """Callers with the same key await one call and get its result"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work(value, cancel_event):
+        calls.append(value)
+        release.wait(5)
+        return value * 2
+
+    async def main():
+        tasks = [asyncio.ensure_future(flight.do("key", work, 21)) for _ in range(5)]
+        # Let every caller join before the shared call finishes
+        while flight.stats()["coalesced"] < 4:
+            await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(main())
+
+    assert results == [42] * 5
+    assert calls == [21]
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 4, "cancelled": 0}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("a", lambda value, cancel_event: value, 1),
+            flight.do("b", lambda value, cancel_event: value, 2),
+        )
+
+    assert asyncio.run(main()) == [1, 2]
+    assert flight.stats()["executions"] == 2
+
+
+def test_exception_reaches_every_waiter():
+    """A failing call raises the same error in every coalesced caller"""
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def work(cancel_event):
+        release.wait(5)
+        raise ValueError("transform failed")
+
+    async def main():
+        tasks = [asyncio.ensure_future(flight.do("key", work)) for _ in range(3)]
+        while flight.stats()["coalesced"] < 2:
+            await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["executions"] == 1
+    # The failed call is forgotten, so the next caller runs it again
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_last_disconnect_sets_cancel_event():
+    flight = SingleFlight()
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    def work(cancel_event):
+        started.set()
+        if cancel_event.wait(5):
+            cancelled.set()
+        return "late"
+
+    async def main():
+        gone = asyncio.Event()
+        task = asyncio.ensure_future(flight.do("key", work, disconnected=gone.wait()))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        gone.set()
+        with pytest.raises(CallerDisconnected):
+            await task
+
+    asyncio.run(main())
+
+    assert cancelled.wait(5)
+    assert flight.stats()["cancelled"] == 1
@@ -0,0 +1,72 @@
+"""
+Tests for the slow-request log
+"""
+
+import json
+import logging
+import threading
+
+from slow_requests import SlowRequestLog, fingerprint
+
+TEXT = "A confidential document about the budget."
+RESULT = {"original_word_count": 6, "original_sentence_count": 1, "partial": False}
+
+
+def record(log, duration_ms, endpoint="/api/transform"):
+    return log.record(endpoint, duration_ms, TEXT, RESULT, {"engine": "full"},
+                      {"stages_ms": {"parse": 1.5}, "counts": {"memo_hits": 2}})
+
+
+def test_only_slow_requests_are_recorded():
+    log = SlowRequestLog(threshold_ms=100)
+    assert record(log, 99) is None
+    entry = record(log, 100)
+    assert entry["duration_ms"] == 100
+    assert log.stats() == {"threshold_ms": 100, "recorded": 1, "buffered": 1}
+
+
+def test_entries_describe_input_without_its_text():
+    entry = record(SlowRequestLog(threshold_ms=0), 5)
+    assert entry["input"] == {
+        "chars": len(TEXT), "bytes": len(TEXT.encode("utf-8")), "words": 6, "sentences": 1,
+        "sha256": fingerprint(TEXT),
+    }
+    assert entry["timings"]["stages_ms"] == {"parse": 1.5}
+    assert "confidential" not in json.dumps(entry)
+
+
+def test_ring_buffer_keeps_newest_first():
+    log = SlowRequestLog(threshold_ms=0, max_entries=3)
+    for duration in range(5):
+        record(log, duration)
+    assert [entry["duration_ms"] for entry in log.entries()] == [4, 3, 2]
+    assert [entry["duration_ms"] for entry in log.entries(limit=1)] == [4]
+    assert log.stats()["recorded"] == 5
+
+
+def test_file_is_written_off_the_calling_thread(tmp_path, monkeypatch):
+    writers = []
+    emit = logging.FileHandler.emit
+
+    def recording_emit(handler, log_record):
+        writers.append(threading.current_thread())
+        emit(handler, log_record)
+
+    monkeypatch.setattr(logging.FileHandler, "emit", recording_emit)
+    path = tmp_path / "slow.jsonl"
+    log = SlowRequestLog(threshold_ms=0, path=str(path))
+    for duration in (10, 20):
+        record(log, duration)
+    log.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [line["duration_ms"] for line in lines] == [10, 20]
+    assert lines[0]["input"]["sha256"] == fingerprint(TEXT)
+    assert writers and threading.current_thread() not in writers
+
+
+def test_record_after_close_keeps_memory_entry(tmp_path):
+    log = SlowRequestLog(threshold_ms=0, path=str(tmp_path / "slow.jsonl"))
+    log.close()
+    assert record(log, 1) is not None
+    assert log.stats()["buffered"] == 1
@@ -0,0 +1,173 @@
+"""
+Tests for humanizer snapshot archives
+"""
+
+import json
+import zipfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from transformer import snapshot
+from transformer.snapshot import (
+    META_MEMBER, SETTINGS, SNAPSHOT_VERSION, STATIC_PREFIX_MEMBER, WORDNET_MEMBER,
+    load_snapshot, read_meta, save_snapshot
+)
+from transformer.static_vectors import StaticWordVectors
+from transformer.wordnet_subset import WordNetSubset, write_wordnet_subset
+
+VOCAB = ["big", "large", "good", "excellent"]
+
+
+@pytest.fixture
+def humanizer(tmp_path):
+    """
+    A stand-in with the attributes save_snapshot reads: a blank spaCy
+    pipeline, a small static vector table and a synthetic WordNet subset.
+    """
+    import spacy
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    vectors = np.eye(len(VOCAB), 8, dtype=np.float16)
+    subset_path = write_wordnet_subset(
+        str(tmp_path / "subset.bin"),
+        {("a", "big"): ["big", "large"], ("a", "good"): ["good", "excellent"]},
+        {"a": {"better": ["good"]}}
+    )
+    return SimpleNamespace(
+        nlp=nlp,
+        model=StaticWordVectors.from_arrays(vectors, "\n".join(VOCAB), {"dimension": 8}),
+        quantization_agreement=0.97,
+        model_name="static:table",
+        quantize=False,
+        p_passive=0.1,
+        p_synonym_replacement=0.4,
+        p_academic_transition=0.5,
+        batch_synonym_scoring=False,
+        pos_tagger="spacy",
+        contraction_map={"n't": " not"},
+        academic_transitions=["Moreover,"],
+        wordnet_subset=WordNetSubset(subset_path),
+    )
+
+
+def test_round_trip(humanizer, tmp_path):
+    path = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+    loaded = load_snapshot(path)
+
+    assert loaded.settings == {name: getattr(humanizer, name) for name in SETTINGS}
+    assert loaded.meta["version"] == SNAPSHOT_VERSION
+    assert loaded.meta["model_kind"] == "static"
+    assert loaded.meta["quantization_agreement"] == 0.97
+    assert read_meta(path) == loaded.meta
+    assert loaded.tables == {"contraction_map": {"n't": " not"}, "academic_transitions": ["Moreover,"]}
+
+    assert loaded.nlp.pipe_names == ["sentencizer"]
+    assert [s.text for s in loaded.nlp("One here. Two there.").sents] == ["One here.", "Two there."]
+
+    assert loaded.model.vocab == humanizer.model.vocab
+    assert loaded.model.meta == {"dimension": 8}
+    np.testing.assert_array_equal(loaded.model.vectors, humanizer.model.vectors)
+    # The humanizer points the table at the subset's morphy for unknown words
+    loaded.model.morphy = loaded.wordnet_subset.morphy
+    expected = np.zeros((3, 8))
+    expected[0, 1] = expected[1, 2] = 1  # "better" is reduced to "good"
+    np.testing.assert_array_equal(loaded.model.encode(["Large", "better", "unknown"]), expected)
+
+    assert loaded.wordnet_subset.lemma_names("better", "a") == ["good", "excellent"]
+    assert loaded.wordnet_subset.to_bytes() == humanizer.wordnet_subset.to_bytes()
+
+
+def test_members_are_stored_and_mapped_in_place(humanizer, tmp_path):
+    path = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+
+    with zipfile.ZipFile(path) as archive:
+        assert {info.compress_type for info in archive.infolist()} == {zipfile.ZIP_STORED}
+        # The offset mmap uses points at the member's bytes in the file
+        with open(path, "rb") as f:
+            data = f.read()
+        for info in archive.infolist():
+            offset = snapshot._member_data_offset(path, info)
+            assert data[offset:offset + info.file_size] == archive.read(info.filename)
+
+        vectors = snapshot.map_npy_member(path, archive, STATIC_PREFIX_MEMBER + "vectors.npy")
+    assert isinstance(vectors, np.memmap)
+    assert vectors.dtype == np.float16
+    np.testing.assert_array_equal(vectors, humanizer.model.vectors)
+
+    loaded = load_snapshot(path)
+    assert loaded.wordnet_subset.path == path
+    assert loaded.wordnet_subset.offset == snapshot._member_data_offset(
+        path, zipfile.ZipFile(path).getinfo(WORDNET_MEMBER)
+    )
+
+
+def test_compressed_vectors_are_read_into_memory(humanizer, tmp_path):
+    path = str(tmp_path / "compressed.zip")
+    source = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+    name = STATIC_PREFIX_MEMBER + "vectors.npy"
+    with zipfile.ZipFile(source) as archive, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as out:
+        out.writestr(name, archive.read(name))
+    with zipfile.ZipFile(path) as archive:
+        vectors = snapshot.map_npy_member(path, archive, name)
+    assert not isinstance(vectors, np.memmap)
+    np.testing.assert_array_equal(vectors, humanizer.model.vectors)
+
+
+def test_snapshot_without_model_or_subset(humanizer, tmp_path):
+    humanizer.model = None
+    humanizer.wordnet_subset = None
+    loaded = load_snapshot(save_snapshot(humanizer, str(tmp_path / "h.snapshot")))
+    assert loaded.model is None
+    assert loaded.wordnet_subset is None
+    assert loaded.meta["model_kind"] is None
+
+
+def rewrite(source, path, replace=None, drop=()):
+    """Copies a snapshot, replacing or dropping members."""
+    replace = replace or {}
+    with zipfile.ZipFile(source) as archive, zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as out:
+        for info in archive.infolist():
+            if info.filename not in drop:
+                out.writestr(info.filename, replace.get(info.filename, archive.read(info.filename)))
+    return path
+
+
+def test_rejects_unsupported_version(humanizer, tmp_path):
+    source = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+    meta = read_meta(source)
+    meta["version"] = SNAPSHOT_VERSION + 1
+    path = rewrite(source, str(tmp_path / "future.snapshot"), replace={META_MEMBER: json.dumps(meta)})
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        load_snapshot(path)
+
+
+def test_rejects_missing_member(humanizer, tmp_path):
+    source = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+    path = rewrite(source, str(tmp_path / "partial.snapshot"), drop=[STATIC_PREFIX_MEMBER + "vocab.txt"])
+    with pytest.raises(ValueError, match="not a valid humanizer snapshot"):
+        load_snapshot(path)
+
+
+@pytest.mark.parametrize("corrupt", ["garbage", "truncated", "flipped"])
+def test_rejects_corrupt_archive(humanizer, tmp_path, corrupt):
+    path = save_snapshot(humanizer, str(tmp_path / "h.snapshot"))
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    if corrupt == "garbage":
+        data = b"not a zip archive" * 10
+    elif corrupt == "truncated":
+        data = data[:len(data) // 2]
+    else:
+        # A byte inside meta.json fails its CRC check
+        with zipfile.ZipFile(path) as archive:
+            data[snapshot._member_data_offset(path, archive.getinfo(META_MEMBER)) + 5] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+
+    with pytest.raises(ValueError, match="not a valid humanizer snapshot"):
+        load_snapshot(path)
+    with pytest.raises(ValueError, match="not a valid humanizer snapshot"):
+        read_meta(path)
@@ -0,0 +1,77 @@
+"""
+Tests for the static word-vector backend
+"""
+
+import numpy as np
+import pytest
+
+from transformer.static_vectors import StaticWordVectors, write_static_vectors
+
+VOCAB = ["big", "large", "Paris", "ice cream", "void"]
+# Unnormalised rows; "void" has no direction at all
+VECTORS = np.array([
+    [3.0, 4.0, 0.0, 0.0],
+    [4.0, 3.0, 0.0, 0.0],
+    [0.0, 0.0, 2.0, 0.0],
+    [0.0, 0.0, 0.0, -0.5],
+    [0.0, 0.0, 0.0, 0.0],
+])
+UNIT = VECTORS / np.maximum(np.linalg.norm(VECTORS, axis=1, keepdims=True), 1e-12)
+
+
+@pytest.fixture
+def table(tmp_path):
+    path = write_static_vectors(str(tmp_path / "table"), VOCAB, VECTORS, "synthetic")
+    table = StaticWordVectors(path)
+    # Stands in for WordNet's morphy, which the humanizer sets from its subset
+    table.morphy = {"bigger": "big", "ice creams": "ice_cream"}.get
+    return table
+
+
+def test_table_is_float16_and_memory_mapped(table):
+    assert isinstance(table.vectors, np.memmap)
+    assert table.vectors.dtype == np.float16
+    assert table.get_sentence_embedding_dimension() == 4
+    assert table.meta == {"model_name": "synthetic", "dimension": 4, "size": len(VOCAB)}
+    assert table.vocab == {word: i for i, word in enumerate(VOCAB)}
+
+
+def test_rows_are_stored_normalised(table):
+    np.testing.assert_allclose(table.vectors.astype(np.float32), UNIT, atol=1e-3)
+    np.testing.assert_array_equal(table.vectors[VOCAB.index("void")], np.zeros(4))
+
+
+@pytest.mark.parametrize("normalize_embeddings", [False, True])
+def test_encode_looks_words_up(table, normalize_embeddings):
+    words = ["big", "Large", "Paris", "bigger", "ice creams", "unknown"]
+    embeddings = table.encode(words, normalize_embeddings=normalize_embeddings)
+
+    assert embeddings.dtype == np.float32
+    expected = np.stack([UNIT[0], UNIT[1], UNIT[2], UNIT[0], UNIT[3], np.zeros(4)])
+    np.testing.assert_allclose(embeddings, expected, atol=1e-3)
+    # Exact float16 rows, widened
+    np.testing.assert_array_equal(embeddings[0], table.vectors[0].astype(np.float32))
+    # Dot products of unit rows are cosine similarities; unknown words score 0
+    scores = embeddings @ embeddings[0]
+    assert scores[0] == pytest.approx(1.0, abs=1e-3)
+    assert scores[1] == pytest.approx(0.96, abs=1e-3)
+    assert scores[-1] == 0.0
+
+
+def test_exact_case_wins_over_lowercase(tmp_path):
+    table = StaticWordVectors(write_static_vectors(str(tmp_path / "cased"), ["Apple", "apple"], np.eye(2)))
+    table.morphy = lambda word: None
+    np.testing.assert_array_equal(table.encode(["Apple", "apple", "APPLE"]), [[1, 0], [0, 1], [0, 1]])
+
+
+def test_single_string_returns_one_row(table):
+    embedding = table.encode("large")
+    assert embedding.shape == (4,)
+    np.testing.assert_allclose(embedding, UNIT[1], atol=1e-3)
+
+
+def test_from_arrays_matches_loaded_table(table):
+    copy = StaticWordVectors.from_arrays(np.asarray(table.vectors), "\n".join(VOCAB), table.meta)
+    copy.morphy = table.morphy
+    words = ["big", "bigger", "Paris", "unknown"]
+    np.testing.assert_array_equal(copy.encode(words), table.encode(words))
@@ -0,0 +1,109 @@
+"""
+Tests for batched synonym scoring in the full engine, with a stub encoder
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from transformer import app
+
+SQRT3_2 = 0.75 ** 0.5
+
+# Unit vectors, so a row-wise dot product is the cosine similarity
+VECTORS = {
+    "big": [1.0, 0.0, 0.0],
+    "large": [0.5, SQRT3_2, 0.0],           # cos 0.5 with "big"
+    "huge": [0.49, (1 - 0.49 ** 2) ** 0.5, 0.0],
+    "great": [0.8, 0.6, 0.0],
+    "grand": [0.8, 0.0, 0.6],              # ties with "great"
+    "good": [0.0, 0.0, 1.0],
+    "fine": [0.0, 1.0, 0.0],
+    "nice": [0.0, 0.6, 0.8],
+}
+
+
+class StubEncoder:
+    """Returns the fixed unit vectors and records each encode call."""
+
+    def __init__(self, vectors=VECTORS):
+        self.vectors = vectors
+        self.calls = []
+
+    def encode(self, strings, normalize_embeddings=False, show_progress_bar=True):
+        assert normalize_embeddings is True
+        self.calls.append(list(strings))
+        return np.array([self.vectors[text] for text in strings], dtype=np.float64)
+
+
+class FailingEncoder:
+    def encode(self, strings, **kwargs):
+        raise RuntimeError("encoder crashed")
+
+
+@pytest.fixture
+def humanizer(monkeypatch):
+    """A full engine with a blank spaCy pipeline and the stub encoder."""
+    import spacy
+
+    def blank_pipeline():
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+        return nlp
+
+    monkeypatch.setattr(app, "load_spacy_model", blank_pipeline)
+    monkeypatch.setattr(
+        app.AcademicTextHumanizer, "_load_sentence_transformer_with_fallback",
+        lambda self, model_name, quantize=False: StubEncoder()
+    )
+    return app.AcademicTextHumanizer(pos_tagger="spacy")
+
+
+def test_threshold_is_inclusive(humanizer):
+    assert humanizer._select_closest_synonyms([("big", ["large"])]) == ["large"]
+    assert humanizer._select_closest_synonyms([("big", ["huge"])]) == [None]
+    assert humanizer._select_closest_synonyms([("big", ["huge", "large"])]) == ["large"]
+
+
+def test_best_candidate_wins_and_ties_pick_the_first(humanizer):
+    assert humanizer._select_closest_synonyms([("big", ["large", "great"])]) == ["great"]
+    assert humanizer._select_closest_synonyms([("big", ["great", "grand"])]) == ["great"]
+    assert humanizer._select_closest_synonyms([("big", ["grand", "great"])]) == ["grand"]
+
+
+def test_groups_are_scored_in_one_encode_call(humanizer):
+    groups = [
+        ("big", ["large", "great", "huge"]),
+        ("good", ["fine", "nice"]),
+        ("big", ["huge"]),
+        ("good", ["fine"]),
+    ]
+    assert humanizer._select_closest_synonyms(groups) == ["great", "nice", None, None]
+    # Every string is embedded once, in first-seen order
+    assert humanizer.model.calls == [["big", "large", "great", "huge", "good", "fine", "nice"]]
+    # Each group gets the same answer as scoring it alone
+    assert [humanizer._select_closest_synonym(word, synonyms) for word, synonyms in groups] == [
+        "great", "nice", None, None
+    ]
+
+
+def test_another_model_can_be_given(humanizer):
+    other = StubEncoder({**VECTORS, "grand": [1.0, 0.0, 0.0]})
+    assert humanizer._select_closest_synonyms([("big", ["great", "grand"])], model=other) == ["grand"]
+    assert humanizer.model.calls == []
+    assert humanizer._select_closest_synonyms([]) == []
+
+
+def test_encoder_failure_falls_back_to_random_choice(humanizer):
+    groups = [("big", ["large", "great", "grand"]), ("good", ["fine", "nice"]), ("odd", [])]
+    expected_rng = random.Random(3)
+    expected = [expected_rng.choice(["large", "great", "grand"]), expected_rng.choice(["fine", "nice"]), None]
+    assert humanizer._select_closest_synonyms(groups, model=FailingEncoder(), rng=random.Random(3)) == expected
+
+
+def test_without_a_model_synonyms_are_chosen_at_random(humanizer):
+    humanizer.model = None
+    expected = random.Random(5).choice(["large", "huge"])
+    assert humanizer._select_closest_synonym("big", ["large", "huge"], random.Random(5)) == expected
+    assert humanizer._select_closest_synonym("big", [], random.Random(5)) is None
@@ -0,0 +1,57 @@
+"""
+Tests for aligning spaCy tags onto rewritten sentences
+"""
+
+from transformer.tagging import align_tags
+
+REFERENCE = [("The", "DT"), ("team", "NN"), ("did", "VBD"), ("n't", "RB"),
+             ("finish", "VB"), ("the", "DT"), ("report", "NN"), (".", ".")]
+
+
+def test_identical_tokens_take_reference_tags():
+    tokens = [text for text, _ in REFERENCE]
+    assert align_tags(tokens, REFERENCE) == REFERENCE
+
+
+def test_matching_ignores_case():
+    tagged = align_tags(["the", "TEAM"], [("The", "DT"), ("team", "NN")])
+    assert tagged == [("the", "DT"), ("TEAM", "NN")]
+
+
+def test_inserted_tokens_use_known_tags():
+    """Transitions and contraction expansions are not in the reference parse"""
+    tokens = ["Moreover", ",", "the", "team", "did", "not", "finish", "the", "report", "."]
+    tagged = align_tags(tokens, REFERENCE)
+    assert tagged[:2] == [("Moreover", "RB"), (",", ",")]
+    assert tagged[5] == ("not", "RB")
+    assert tagged[2:5] == [("the", "DT"), ("team", "NN"), ("did", "VBD")]
+    assert tagged[6:] == [("finish", "VB"), ("the", "DT"), ("report", "NN"), (".", ".")]
+
+
+def test_unknown_inserted_token_has_empty_tag():
+    tagged = align_tags(["The", "whole", "team"], [("The", "DT"), ("team", "NN")])
+    assert tagged == [("The", "DT"), ("whole", ""), ("team", "NN")]
+
+
+def test_deleted_tokens_are_skipped():
+    tokens = ["The", "team", "finish", "the", "report", "."]
+    tagged = align_tags(tokens, REFERENCE)
+    assert tagged == [("The", "DT"), ("team", "NN"), ("finish", "VB"),
+                      ("the", "DT"), ("report", "NN"), (".", ".")]
+
+
+def test_replaced_token_does_not_take_neighbour_tag():
+    tokens = ["The", "team", "did", "n't", "complete", "the", "report", "."]
+    tagged = align_tags(tokens, REFERENCE)
+    assert tagged[4] == ("complete", "")
+    assert [tag for _, tag in tagged[:4]] == ["DT", "NN", "VBD", "RB"]
+    assert [tag for _, tag in tagged[5:]] == ["DT", "NN", "."]
+
+
+def test_reordered_words_outside_the_matched_run_are_untagged():
+    """A passive rewrite moves words; only the longest in-order run keeps its tags"""
+    reference = [("The", "DT"), ("board", "NN"), ("approved", "VBD"), ("the", "DT"), ("budget", "NN")]
+    tokens = ["The", "budget", "was", "approved", "by", "the", "board"]
+    tagged = align_tags(tokens, reference)
+    assert tagged == [("The", "DT"), ("budget", "NN"), ("was", "VBD"), ("approved", ""),
+                      ("by", "IN"), ("the", ""), ("board", "")]
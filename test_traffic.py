@@ -0,0 +1,106 @@
+"""
+Tests for the anonymized traffic capture
+"""
+
+import json
+import threading
+
+from traffic import TrafficRecorder, read_capture
+
+
+def test_capture_line_format(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path))
+    assert recorder.record("/api/transform", "It's a  secret text.", True, False, seed=7,
+                           tier="free", latency_budget_ms=300, ts=1767000000.1234567)
+    recorder.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0]) == {
+        "ts": 1767000000.123457, "endpoint": "/api/transform", "chars": 20, "words": 4,
+        "use_passive": True, "use_synonyms": False, "seeded": True, "engine": None,
+        "tier": "free", "latency_budget_ms": 300, "response_format": "full",
+    }
+    assert "secret" not in path.read_text(encoding="utf-8")
+    assert recorder.stats() == {"recorded": 1, "sample_rate": 1.0}
+
+
+def test_sampling(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl"), sample_rate=0.0)
+    assert recorder.record("/api/transform", "text", False, False) is False
+    recorder.close()
+    assert recorder.stats()["recorded"] == 0
+
+
+def test_record_is_written_off_the_calling_thread(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path))
+    writers = []
+    handler = recorder._writer.handlers[0]
+    emit = handler.emit
+    handler.emit = lambda record: (writers.append(threading.current_thread()), emit(record))
+
+    recorder.record("/api/transform", "text", False, False)
+    recorder.close()
+
+    assert writers and threading.current_thread() not in writers
+    assert len(read_capture(str(path))) == 1
+
+
+def test_record_after_close_is_dropped(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl"))
+    recorder.close()
+    assert recorder.record("/api/transform", "text", False, False) is False
+    recorder.close()
+
+
+def test_read_capture_sorts_by_arrival_and_skips_blank_lines(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    # Two workers appending to one file interleave their lines
+    path.write_text(
+        json.dumps({"ts": 3.0, "endpoint": "/api/transform"}) + "\n\n"
+        + json.dumps({"ts": 1.0, "endpoint": "/api/transform-file"}) + "\n"
+        + json.dumps({"ts": 2.0, "endpoint": "/api/transform"}) + "\n   \n",
+        encoding="utf-8"
+    )
+    assert [entry["ts"] for entry in read_capture(str(path))] == [1.0, 2.0, 3.0]
+
+
+def test_capture_round_trip_across_recorders(tmp_path):
+    path = str(tmp_path / "traffic.jsonl")
+    first, second = TrafficRecorder(path), TrafficRecorder(path)
+    for ts in (5.0, 1.0, 3.0):
+        first.record("/api/transform", "a b", False, False, ts=ts)
+    second.record("/api/transform-file", "c", False, True, ts=2.0)
+    first.close()
+    second.close()
+
+    entries = read_capture(path)
+    assert [(entry["ts"], entry["endpoint"]) for entry in entries] == [
+        (1.0, "/api/transform"), (2.0, "/api/transform-file"), (3.0, "/api/transform"), (5.0, "/api/transform")
+    ]
+
+
+def test_api_captures_only_valid_requests(api, monkeypatch, tmp_path):
+    import api_main
+
+    path = str(tmp_path / "traffic.jsonl")
+    recorder = TrafficRecorder(path)
+    monkeypatch.setattr(api_main, "traffic_recorder", recorder)
+
+    assert api.post("/api/transform", json={"text": "It's a test.", "tier": "pro"}).status_code == 200
+    assert api.post("/api/transform", json={"text": "   "}).status_code == 400
+    assert api.post("/api/transform", json={"text": "x", "engine": "missing"}).status_code == 400
+    assert api.post("/api/transform", json={"text": "x", "response_format": "bogus"}).status_code == 400
+    assert api.post("/api/transform", json={"text": "word " * 30000}).status_code == 413
+    files = {"file": ("doc.txt", b"It's a file.", "text/plain")}
+    assert api.post("/api/transform-file", files=files).status_code == 200
+    assert api.post("/api/transform-file", files={"file": ("doc.txt", b"  ", "text/plain")}).status_code == 400
+    recorder.close()
+
+    entries = read_capture(path)
+    assert [(entry["endpoint"], entry["chars"]) for entry in entries] == [
+        ("/api/transform", 12), ("/api/transform-file", 12)
+    ]
+    assert entries[0]["tier"] == "pro"
@@ -0,0 +1,219 @@
+"""
+Tests for bounded upload ingestion and per-tier limits
+"""
+
+import io
+import copy
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from upload_limits import (
+    TIER_LIMITS, BodySizeLimitMiddleware, UploadLimit, UploadTooLarge,
+    limits_for, read_upload_text, resolve_tier
+)
+
+
+class FakeUpload:
+    """Minimal UploadFile stand-in reading from bytes"""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    async def read(self, size=-1):
+        return self._stream.read(size)
+
+
+def read(data, limits, chunk_size):
+    return asyncio.run(read_upload_text(FakeUpload(data), limits, chunk_size=chunk_size))
+
+
+# Tiers
+
+@pytest.mark.parametrize("tier", [None, "", "platinum", "admin"])
+def test_missing_or_unknown_tier_gets_guest_limits(tier):
+    assert resolve_tier(tier) == "guest"
+    assert limits_for(tier) == TIER_LIMITS["guest"]
+
+
+def test_known_tier_is_case_insensitive():
+    assert resolve_tier("Pro") == "pro"
+    assert limits_for("PRO_PLUS") == TIER_LIMITS["pro_plus"]
+
+
+# read_upload_text
+
+def test_reads_whole_text_under_limits():
+    text = "The results were clear. " * 50
+    assert read(text.encode("utf-8"), UploadLimit(10_000, 1000), chunk_size=7) == text
+
+
+def test_byte_cap():
+    limits = UploadLimit(max_bytes=100, max_words=10_000)
+    assert read(b"a" * 100, limits, chunk_size=16) == "a" * 100
+    with pytest.raises(UploadTooLarge, match="100B size limit"):
+        read(b"a" * 101, limits, chunk_size=16)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64])
+def test_words_split_across_chunks_are_counted_once(chunk_size):
+    data = b"alpha beta  gamma\ndelta epsilon"
+    limits = UploadLimit(max_bytes=1000, max_words=5)
+    assert read(data, limits, chunk_size) == data.decode("utf-8")
+    with pytest.raises(UploadTooLarge, match="4 word limit"):
+        read(data, UploadLimit(max_bytes=1000, max_words=4), chunk_size)
+
+
+def test_word_count_with_whitespace_at_chunk_edges():
+    # Chunks of 4: "one ", "two ", "thre", "e fo", "ur"
+    data = b"one two three four"
+    assert read(data, UploadLimit(1000, 4), chunk_size=4) == "one two three four"
+    with pytest.raises(UploadTooLarge):
+        read(data, UploadLimit(1000, 3), chunk_size=4)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_multibyte_characters_split_across_chunks(chunk_size):
+    text = "café naïve 日本語"
+    assert read(text.encode("utf-8"), UploadLimit(1000, 100), chunk_size) == text
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4])
+def test_invalid_utf8_split_across_chunks_is_dropped(chunk_size):
+    # A truncated 3-byte sequence followed by a stray continuation byte
+    data = b"ab\xe6\x97 cd\x80ef"
+    assert read(data, UploadLimit(1000, 100), chunk_size) == "ab cdef"
+
+
+# BodySizeLimitMiddleware
+
+async def _echo_app(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(len(body)).encode("ascii")})
+
+
+def _call(middleware, path, chunks, headers=()):
+    """Run one request through the middleware; returns (status, body, chunks read)."""
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+    received = []
+    sent = []
+
+    async def receive():
+        if messages:
+            received.append(messages[0])
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, body, len(received)
+
+
+def _middleware():
+    return BodySizeLimitMiddleware(_echo_app, max_bytes=100, paths=["/api/transform"], overhead_bytes=0)
+
+
+def test_middleware_rejects_on_content_length_without_reading():
+    status, body, read_chunks = _call(
+        _middleware(), "/api/transform", [b"x" * 101], headers=[(b"content-length", b"101")]
+    )
+    assert status == 413
+    assert b"100B limit" in body
+    assert read_chunks == 0
+
+
+def test_middleware_rejects_streamed_body_without_content_length():
+    status, _, read_chunks = _call(_middleware(), "/api/transform", [b"x" * 40] * 10)
+    assert status == 413
+    # Stops reading at the chunk that passes the limit
+    assert read_chunks == 3
+
+
+def test_middleware_passes_bodies_within_limit():
+    status, body, _ = _call(_middleware(), "/api/transform", [b"x" * 50, b"x" * 50])
+    assert (status, body) == (200, b"100")
+
+
+def test_middleware_ignores_other_paths():
+    status, body, _ = _call(_middleware(), "/health", [b"x" * 500], headers=[(b"content-length", b"500")])
+    assert (status, body) == (200, b"500")
+
+
+# API
+
+LONG_TEXT = "word " * 30000
+
+
+def test_transform_without_tier_gets_guest_word_limit(api):
+    assert api.post("/api/transform", json={"text": LONG_TEXT}).status_code == 413
+    assert api.post("/api/transform", json={"text": LONG_TEXT, "tier": "guest"}).status_code == 413
+    assert api.post("/api/transform", json={"text": LONG_TEXT, "tier": "bogus"}).status_code == 413
+    assert api.post("/api/transform", json={"text": LONG_TEXT, "tier": "pro"}).status_code == 200
+
+
+def test_transform_file_without_tier_gets_guest_word_limit(api):
+    files = {"file": ("doc.txt", LONG_TEXT.encode("ascii"), "text/plain")}
+    assert api.post("/api/transform-file", files=files).status_code == 413
+    assert api.post("/api/transform-file", files=files, data={"tier": "pro"}).status_code == 200
+
+
+def test_guest_upload_is_checked_after_spooling_up_to_the_body_cap(api):
+    """Within MAX_UPLOAD_BYTES the form is parsed and spooled; the tier limit applies when reading it"""
+    from upload_limits import MAX_UPLOAD_BYTES, MULTIPART_OVERHEAD_BYTES
+
+    over_guest = b"x" * (TIER_LIMITS["guest"].max_bytes + 1)
+    response = api.post("/api/transform-file", files={"file": ("doc.txt", over_guest, "text/plain")})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request exceeds the 256KB size limit for this tier"
+
+    over_cap = b"x" * (MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES + 1)
+    response = api.post("/api/transform-file", files={"file": ("doc.txt", over_cap, "text/plain")})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request body exceeds the 10MB limit"
+
+
+def test_only_explicit_cheap_tiers_route_to_the_cheapest_engine(monkeypatch):
+    import api_main
+    from engine_router import EngineRouter
+
+    router = EngineRouter(default_engine="full")
+    router.engines = {name: SimpleNamespace(name=name) for name in ("full", "fast")}
+    monkeypatch.setattr(api_main, "engine_router", router)
+
+    assert api_main._route(tier=None).name == "full"
+    assert api_main._route(tier="bogus").name == "full"
+    assert api_main._route(tier="guest").name == "fast"
+    assert api_main._route(tier="pro").name == "full"
+
+
+def test_transform_without_tier_is_served_by_default_engine(api):
+    import api_main
+
+    router = api_main.engine_router
+    # The fast humanizer stands in for the full engine, which needs models
+    default = copy.copy(router.engines["fast"])
+    default.name = "full"
+    router.engines["full"] = default
+    router.default_engine = "full"
+
+    response = api.post("/api/transform", json={"text": "It's a test.", "use_passive": True})
+    assert response.status_code == 200
+    assert response.json()["engine"] == "full"
+    assert api.post("/api/transform", json={"text": "It's a test.", "tier": "guest"}).json()["engine"] == "fast"
@@ -0,0 +1,125 @@
+"""
+Tests for the memory-mapped WordNet subset
+"""
+
+import pickle
+
+import pytest
+
+from transformer.wordnet_subset import MAGIC, WordNetSubset, write_wordnet_subset
+
+TABLE = {
+    ("n", "church"): ["church", "church building"],
+    ("n", "box"): ["box"],
+    ("n", "glass"): ["glass", "drinking glass"],
+    ("n", "goose"): ["goose"],
+    ("n", "axe"): ["axe", "ax"],
+    ("n", "axis"): ["axis", "axis of rotation"],
+    ("n", "run"): ["run", "tally"],
+    ("v", "run"): ["run", "go", "operate"],
+    ("v", "make"): ["make", "create"],
+    ("a", "fast"): ["fast", "quick"],
+    ("a", "good"): ["good", "beneficial"],
+    ("a", "well"): ["well"],
+    ("a", "café"): ["café"],
+}
+EXCEPTIONS = {
+    "n": {"geese": ["goose"], "axes": ["ax", "axis"]},
+    "v": {"ran": ["run"]},
+    "a": {"better": ["good", "well"]},
+    "r": {},
+}
+
+
+@pytest.fixture
+def subset_path(tmp_path):
+    return write_wordnet_subset(str(tmp_path / "subset.bin"), TABLE, EXCEPTIONS, wordnet_version="3.0")
+
+
+@pytest.fixture
+def subset(subset_path):
+    subset = WordNetSubset(subset_path)
+    yield subset
+    subset.close()
+
+
+def test_lemma_names_of_base_forms(subset):
+    for (pos, form), names in TABLE.items():
+        assert subset.lemma_names(form, pos) == names
+        assert subset.has_synsets(form, pos)
+    assert subset.lemma_names("Café", "a") == ["café"]
+    # Without a part of speech every one is searched, in nltk's POS_LIST order
+    assert subset.lemma_names("run") == ["run", "tally", "run", "go", "operate"]
+    assert subset.lemma_names("unknown") == []
+    assert not subset.has_synsets("unknown")
+    assert not subset.has_synsets("run", "r")
+
+
+@pytest.mark.parametrize("form, pos, base", [
+    ("churches", "n", "church"),
+    ("boxes", "n", "box"),
+    ("Making", "v", "make"),
+    ("runs", "v", "run"),
+    ("faster", "a", "fast"),
+    # The form itself is tried first, so a base form ending in a suffix stays
+    ("glass", "n", "glass"),
+    ("geese", "n", "goose"),
+    ("ran", "v", "run"),
+    ("better", "a", "good"),
+    ("runs", None, "run"),
+])
+def test_morphy(subset, form, pos, base):
+    assert subset.morphy(form, pos) == base
+
+
+def test_exception_list_replaces_the_suffix_rules(subset):
+    # Every listed base form is looked up, in order
+    assert subset.lemma_names("better", "a") == ["good", "beneficial", "well"]
+    # "axes" would be "axe" under the rules, but its exception entry wins
+    assert subset.lemma_names("axes", "n") == ["axis", "axis of rotation"]
+
+
+def test_suffix_rules_are_applied_once(subset):
+    # Two passes would reach "church"; nltk 3.9 stops after one
+    assert subset.morphy("churcheses", "n") is None
+    assert not subset.has_synsets("churcheses")
+
+
+def test_to_bytes_round_trip_and_offset(subset, tmp_path):
+    data = subset.to_bytes()
+    assert data.startswith(MAGIC)
+
+    copy_path = tmp_path / "copy.bin"
+    copy_path.write_bytes(data)
+    # The same index stored after other data, as inside a snapshot archive
+    embedded_path = tmp_path / "embedded.bin"
+    embedded_path.write_bytes(b"\0" * 24 + data + b"trailing")
+
+    for reopened in (WordNetSubset(str(copy_path)), WordNetSubset(str(embedded_path), offset=24)):
+        assert reopened.to_bytes() == data
+        assert reopened.lemma_names("geese", "n") == ["goose"]
+        assert reopened.lemma_names("churches") == ["church", "church building"]
+        reopened.close()
+
+
+def test_pickle_maps_the_file_again(subset):
+    clone = pickle.loads(pickle.dumps(subset))
+    assert (clone.path, clone.offset) == (subset.path, subset.offset)
+    assert clone.lemma_names("Making", "v") == ["make", "create"]
+    clone.close()
+
+
+def test_stats(subset, subset_path):
+    assert subset.stats() == {
+        "path": subset_path,
+        "keys": len(TABLE),
+        "strings": len({name for names in TABLE.values() for name in names}),
+        "wordnet_version": "3.0",
+    }
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOPE" + b"\0" * 64)
+    with pytest.raises(ValueError, match="not a version 1 WordNet subset"):
+        WordNetSubset(str(path))
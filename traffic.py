@@ -0,0 +1,104 @@
+"""
+Anonymized traffic capture
+
+Appends the shape of each transform request to a JSONL file, one object
+per line: arrival time, endpoint, input size and options. The text itself is
+never written. benchmarks/loadtest.py replays a capture against a local
+server with synthetic text of the same sizes.
+
+Line format:
+
+    {"ts": 1767000000.123, "endpoint": "/api/transform", "chars": 5120,
+     "words": 870, "use_passive": true, "use_synonyms": false, "seeded": false,
+     "engine": null, "tier": "free", "latency_budget_ms": null,
+     "response_format": "full"}
+
+Several worker processes can append to the same file; lines are sorted by
+"ts" when replayed. Lines are written on a background thread (a logging
+QueueListener), so recording never waits for the disk on the event loop.
+"""
+
+import json
+import time
+import queue
+import random
+import logging
+import threading
+from logging.handlers import QueueListener
+
+
+class TrafficRecorder:
+    """
+    Appends request shapes to a JSONL file.
+
+    Args:
+        path: Capture file (appended to)
+        sample_rate: Share of requests recorded
+    """
+
+    def __init__(self, path, sample_rate=1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+        handler = logging.FileHandler(path, encoding="utf-8", delay=True)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._lines = queue.SimpleQueue()
+        self._writer = QueueListener(self._lines, handler)
+        self._writer.start()
+
+    def record(self, endpoint, text, use_passive, use_synonyms, seed=None, engine=None, tier=None,
+               latency_budget_ms=None, response_format="full", ts=None):
+        """
+        Queues one request's shape for appending. Returns True if it was recorded.
+        ts is the arrival time (defaults to now).
+        """
+        if self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+            return False
+
+        line = json.dumps({
+            "ts": round(time.time() if ts is None else ts, 6),
+            "endpoint": endpoint,
+            "chars": len(text),
+            "words": len(text.split()),
+            "use_passive": bool(use_passive),
+            "use_synonyms": bool(use_synonyms),
+            "seeded": seed is not None,
+            "engine": engine,
+            "tier": tier,
+            "latency_budget_ms": latency_budget_ms,
+            "response_format": response_format,
+        })
+        lines = self._lines
+        if lines is None:
+            return False
+        lines.put_nowait(logging.makeLogRecord({"msg": line}))
+        with self._lock:
+            self.recorded += 1
+        return True
+
+    def close(self):
+        """Write out queued lines and stop the file writer."""
+        with self._lock:
+            writer, self._writer, self._lines = self._writer, None, None
+        if writer is not None:
+            writer.stop()
+            for handler in writer.handlers:
+                handler.close()
+
+    def stats(self):
+        return {"recorded": self.recorded, "sample_rate": self.sample_rate}
+
+
+def read_capture(path):
+    """Captured request shapes from path, sorted by arrival time."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                entries.append(json.loads(line))
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
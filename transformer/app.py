@@ -1,19 +1,43 @@
 import ssl
+import time
 import random
 import warnings
+import threading
 from typing import Optional
 
-import nltk
-import spacy
-from nltk.tokenize import word_tokenize
-from nltk.corpus import wordnet
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+
+from transformer.static_vectors import STATIC_PREFIX, StaticWordVectors
+from transformer.cancellation import HumanizeResult, StopCheck
+from transformer.parse_cache import ParseCache
+from transformer.memo import SentenceMemo, normalize_sentence, sentence_seed
+from transformer.lexicon import ACADEMIC_TRANSITIONS, CONTRACTION_MAP
+from transformer.tagging import align_tags, get_pos_tagger, pos_tag
+from transformer.logging_utils import events
+from transformer.timing import NULL_TIMER
+from transformer.wordnet_subset import PENN_TO_WORDNET, WordNetSubset
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # Global spaCy model - loaded once and reused
 NLP_GLOBAL = None
 
+# spaCy, NLTK and sentence-transformers are imported when first used, so
+# importing this module stays cheap and the API can answer before they load
+
+# Fixed word list used to check that a quantized model still picks the same
+# synonyms as the float model
+QUANTIZATION_CHECK_WORDS = [
+    ("important", "JJ"), ("good", "JJ"), ("difficult", "JJ"), ("large", "JJ"),
+    ("quick", "JJ"), ("happy", "JJ"), ("result", "NN"), ("method", "NN"),
+    ("problem", "NN"), ("idea", "NN"), ("study", "NN"), ("evidence", "NN"),
+    ("show", "VB"), ("use", "VB"), ("improve", "VB"), ("explain", "VB"),
+    ("increase", "VB"), ("suggest", "VB"), ("quickly", "RB"), ("often", "RB"),
+]
+
+# Minimum share of identical synonym choices required to keep a quantized model
+QUANTIZATION_MIN_AGREEMENT = 0.9
+
 def load_spacy_model():
     """
     Lazy loading of spaCy model with error handling.
@@ -21,6 +45,7 @@ def load_spacy_model():
     global NLP_GLOBAL
     if NLP_GLOBAL is None:
         try:
+            import spacy
             NLP_GLOBAL = spacy.load("en_core_web_sm")
         except Exception as e:
             print(f"Error loading spaCy model: {str(e)}")
@@ -32,6 +57,8 @@ def download_nltk_resources():
     """
     Download required NLTK resources if not already installed.
     """
+    import nltk
+
     try:
         _create_unverified_https_context = ssl._create_unverified_context
     except AttributeError:
@@ -47,6 +74,28 @@ def download_nltk_resources():
             print(f"Error downloading {resource}: {str(e)}")
 
 
+def word_tokenize(text):
+    """NLTK word tokenization, importing NLTK on first use."""
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    return nltk_word_tokenize(text)
+
+# NLTK's LazyCorpusLoader is not thread-safe, so the first WordNet load
+# (possibly from a warm-up thread) happens once under a lock
+_WORDNET_LOCK = threading.Lock()
+_WORDNET_LOADED = False
+
+def _wordnet():
+    """NLTK's WordNet corpus reader, importing NLTK and loading the corpus on first use."""
+    global _WORDNET_LOADED
+    from nltk.corpus import wordnet
+    if not _WORDNET_LOADED:
+        with _WORDNET_LOCK:
+            if not _WORDNET_LOADED:
+                wordnet.ensure_loaded()
+                _WORDNET_LOADED = True
+    return wordnet
+
+
 # This class  contains methods to humanize academic text, such as improving readability or
 # simplifying complex language.
 class AcademicTextHumanizer:
@@ -64,45 +113,169 @@ class AcademicTextHumanizer:
         p_passive=0.2,
         p_synonym_replacement=0.3,
         p_academic_transition=0.3,
-        seed=None
+        seed=None,
+        batch_synonym_scoring=True,
+        quantize=False,
+        pos_tagger="nltk",
+        sentence_memo_size=0,
+        parse_cache_size=0,
+        parse_cache_dir=None,
+        embedding_cache=None,
+        snapshot=None,
+        wordnet_subset=None,
+        preload_wordnet=False
     ):
         """
         Initialize the AcademicTextHumanizer with models and parameters.
         
         Args:
-            model_name: Name of the sentence transformer model
+            model_name: Name of the sentence transformer model, or
+                "static:<path>" for a precomputed static word-vector table
             p_passive: Probability of passive voice conversion
             p_synonym_replacement: Probability of synonym replacement
             p_academic_transition: Probability of adding academic transitions
             seed: Random seed for reproducibility
+            batch_synonym_scoring: Score synonym candidates for the whole document
+                in one batched encode call instead of once per word
+            quantize: Apply dynamic int8 quantization to the sentence transformer's
+                linear layers for CPU inference
+            pos_tagger: "nltk" for the shared perceptron tagger, or "spacy" to
+                reuse the tags spaCy computed in humanize_text for synonym
+                replacement. spaCy tags the original sentence and its tags are
+                aligned onto the rewritten one, so they can differ from NLTK's
+                and change which words get synonyms for the same seed
+            sentence_memo_size: Number of transformed sentences to memoize
+                (0 disables the memo). With the memo, each sentence draws from
+                its own RNG derived from the request seed and the sentence, so
+                a repeated sentence is transformed once and then looked up;
+                unseeded requests use a per-instance seed instead.
+            parse_cache_size: Number of spaCy parses of input texts kept in
+                memory (0 disables the parse cache)
+            parse_cache_dir: Directory where parses are also stored as DocBin
+                files, so they survive restarts and are shared between workers
+            embedding_cache: Optional cache with get(key)/set(key, bytes), such
+                as a shared_cache.SharedMemoryCache, for synonym embeddings
+                shared between processes
+            snapshot: Path of a snapshot archive (see transformer.snapshot) to
+                take the spaCy pipeline, embedding model and word tables from
+                instead of loading them; model_name and quantize are then
+                taken from the snapshot
+            wordnet_subset: Path of a WordNet synonym subset (see
+                transformer.wordnet_subset) to look synonyms up in instead of
+                the NLTK WordNet corpus; a snapshot's subset is used by default
+            preload_wordnet: Load the NLTK WordNet corpus in a background
+                thread now rather than on the first synonym request
         """
+        global NLP_GLOBAL
+
         if seed is not None:
             random.seed(seed)
 
+        tables = {}
+        snapshot_subset = None
         try:
-            self.nlp = load_spacy_model()
-            self.model = self._load_sentence_transformer_with_fallback(model_name)
+            if snapshot is not None:
+                from transformer.snapshot import load_snapshot
+                loaded = load_snapshot(snapshot)
+                self.nlp = loaded.nlp
+                if NLP_GLOBAL is None:
+                    NLP_GLOBAL = loaded.nlp
+                self.quantization_agreement = loaded.meta.get("quantization_agreement")
+                self.model = loaded.model
+                model_name = loaded.settings.get("model_name", model_name)
+                quantize = loaded.settings.get("quantize", quantize)
+                tables = loaded.tables
+                snapshot_subset = loaded.wordnet_subset
+            else:
+                self.nlp = load_spacy_model()
+                self.quantization_agreement = None
+                self.model = self._load_sentence_transformer_with_fallback(model_name, quantize=quantize)
         except Exception as e:
             print(f"Error loading models: {str(e)}")
             raise
+        self.model_name = model_name
+        self.quantize = quantize
 
         # Transformation probabilities
         self.p_passive = p_passive
         self.p_synonym_replacement = p_synonym_replacement
         self.p_academic_transition = p_academic_transition
+        self.batch_synonym_scoring = batch_synonym_scoring
+
+        # Shared NLTK tagger is created up front only when it is the configured path
+        self.pos_tagger = pos_tagger
+        if pos_tagger == "nltk":
+            get_pos_tagger()
+
+        # Memo of transformed sentences, keyed on (normalized sentence, stages, seed)
+        self.sentence_memo = SentenceMemo(sentence_memo_size) if sentence_memo_size > 0 else None
+        # Base seed for memoized runs without an rng, from a private generator so
+        # the global random sequence after random.seed(seed) is left untouched
+        self.memo_seed = random.Random(seed).getrandbits(32) if self.sentence_memo is not None else None
+
+        # Parses of recently submitted texts, reused when a text comes back
+        self.parse_cache = None
+        if parse_cache_size > 0:
+            self.parse_cache = ParseCache(self.nlp, max_size=parse_cache_size, directory=parse_cache_dir)
+
+        # Unit embeddings of synonym candidates, keyed by model and string
+        self.embedding_cache = embedding_cache
+        self.embedding_cache_prefix = f"emb:{model_name}:{'int8' if quantize else 'fp32'}:"
+
+        # Synonyms come from the memory-mapped subset when there is one, else NLTK's WordNet
+        self.wordnet_subset = WordNetSubset(wordnet_subset) if wordnet_subset else snapshot_subset
+        if self.wordnet_subset is not None and isinstance(self.model, StaticWordVectors):
+            self.model.morphy = self.wordnet_subset.morphy
+        if preload_wordnet:
+            threading.Thread(target=self.warm_wordnet, name="wordnet-warmup", daemon=True).start()
+
+        # Common academic transitions and contraction expansions
+        self.academic_transitions = list(tables.get("academic_transitions", ACADEMIC_TRANSITIONS))
+        self.contraction_map = dict(tables.get("contraction_map", CONTRACTION_MAP))
+
+    @classmethod
+    def from_snapshot(cls, path, **kwargs):
+        """
+        Creates a humanizer from a snapshot archive written by
+        transformer.snapshot.save_snapshot. Settings recorded in the snapshot
+        are used unless overridden by kwargs.
+        """
+        from transformer.snapshot import read_meta
+        settings = read_meta(path).get("settings", {})
+        return cls(**{**settings, **kwargs, "snapshot": path})
 
-        # Common academic transitions
-        self.academic_transitions = [
-            "Moreover,", "Additionally,", "Furthermore,", "Hence,", 
-            "Therefore,", "Consequently,", "Nonetheless,", "Nevertheless,"
-        ]
+    def warm_wordnet(self):
+        """
+        Loads the NLTK WordNet corpus now instead of on the first synonym
+        request. Nothing to do when a WordNet subset is configured.
+        """
+        if self.wordnet_subset is not None:
+            return
+        try:
+            started = time.time()
+            _wordnet().synsets("warm")
+            print(f"✅ WordNet loaded in {time.time() - started:.2f}s")
+        except Exception as e:
+            print(f"⚠️ WordNet warm-up failed: {str(e)}")
 
-    def _load_sentence_transformer_with_fallback(self, model_name):
+    def _load_sentence_transformer_with_fallback(self, model_name, quantize=False):
         """
         Load sentence transformer with fallback mechanisms for Hugging Face timeout issues.
         """
-        import time
-        import requests
+
+        # Static word-vector tables are memory-mapped and need neither torch nor the hub
+        if model_name and model_name.startswith(STATIC_PREFIX):
+            path = model_name[len(STATIC_PREFIX):]
+            try:
+                model_instance = StaticWordVectors(path)
+                print(f"✅ Loaded static word vectors: {path}")
+                return model_instance
+            except Exception as e:
+                print(f"❌ Failed to load static word vectors {path}: {str(e)}")
+                print(f"🔄 Falling back to sentence transformer models...")
+                model_name = 'paraphrase-MiniLM-L6-v2'
+
+        from sentence_transformers import SentenceTransformer
         
         # List of fallback models (smaller, faster models)
         fallback_models = [
@@ -123,8 +296,14 @@ class AcademicTextHumanizer:
                 os.environ['HF_HUB_DOWNLOAD_TIMEOUT'] = '30'  # 30 second timeout
                 
                 # Try to load the model
-                model_instance = SentenceTransformer(model)
+                if quantize:
+                    # Dynamically quantized models only run on CPU
+                    model_instance = SentenceTransformer(model, device='cpu')
+                else:
+                    model_instance = SentenceTransformer(model)
                 print(f"✅ Successfully loaded model: {model}")
+                if quantize:
+                    model_instance = self._quantize_model(model_instance)
                 return model_instance
                 
             except Exception as e:
@@ -138,7 +317,56 @@ class AcademicTextHumanizer:
         
         return None
 
-    def humanize_text(self, text, use_passive=False, use_synonyms=False):
+    def _quantize_model(self, model):
+        """
+        Applies dynamic int8 quantization to the model's linear layers.
+
+        The quantized model is kept only if it picks the same synonyms as the
+        float model on QUANTIZATION_CHECK_WORDS; otherwise the float model is used.
+        """
+        try:
+            import copy
+            import torch
+
+            quantized = torch.ao.quantization.quantize_dynamic(
+                copy.deepcopy(model), {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+            agreement = self._synonym_agreement(model, quantized)
+            self.quantization_agreement = agreement
+            if agreement is None:
+                print("⚠️ No synonyms available to verify quantized model, keeping it unchecked")
+                return quantized
+            if agreement < QUANTIZATION_MIN_AGREEMENT:
+                print(f"⚠️ Quantized model agreed on {agreement:.0%} of synonym choices, using float model")
+                return model
+
+            print(f"✅ Using int8 quantized model ({agreement:.0%} synonym agreement)")
+            return quantized
+        except Exception as e:
+            print(f"❌ Failed to quantize model: {str(e)}")
+            return model
+
+    def _synonym_agreement(self, reference_model, candidate_model):
+        """
+        Returns the share of QUANTIZATION_CHECK_WORDS for which both models
+        select the same synonym, or None if no check word has synonyms.
+        """
+        groups = []
+        for word, pos in QUANTIZATION_CHECK_WORDS:
+            synonyms = self._get_synonyms(word, pos)
+            if synonyms:
+                groups.append((word, sorted(synonyms)))
+        if not groups:
+            return None
+
+        reference = self._select_closest_synonyms(groups, model=reference_model)
+        candidate = self._select_closest_synonyms(groups, model=candidate_model)
+        matches = sum(1 for a, b in zip(reference, candidate) if a == b)
+        return matches / len(groups)
+
+    def humanize_text(self, text, use_passive=False, use_synonyms=False, rng=None,
+                      deadline=None, cancel_event=None):
         """
         Transform text to a more formal academic style.
         
@@ -146,65 +374,158 @@ class AcademicTextHumanizer:
             text: Input text to transform
             use_passive: Whether to apply passive voice conversion
             use_synonyms: Whether to apply synonym replacement
+            rng: Random number generator to draw from (defaults to the global
+                random module, so random.seed() keeps working)
+            deadline: time.time() timestamp after which processing stops early
+            cancel_event: threading.Event that stops processing early when set
             
         Returns:
-            Transformed text string
+            Transformed text string. If processing stopped early, sentences not
+            yet processed are appended unchanged (see humanize_text_with_status).
+        """
+        return self.humanize_text_with_status(
+            text, use_passive, use_synonyms, rng, deadline, cancel_event
+        ).text
+
+    def humanize_text_with_status(self, text, use_passive=False, use_synonyms=False, rng=None,
+                                  deadline=None, cancel_event=None, progress_callback=None, timer=None):
+        """
+        Same as humanize_text, but returns a HumanizeResult reporting whether
+        every sentence was processed before the deadline or cancellation.
+        progress_callback, if given, is called as (sentences_processed,
+        sentences_total) after each sentence. timer, a timing.StageTimer,
+        receives the time spent in each stage and the cache hits.
         """
         if not text or not text.strip():
-            return text
+            return HumanizeResult(text, True, 0, 0)
+
+        # With a memo, each sentence draws from an RNG derived from this base
+        memo_base = None
+        if self.sentence_memo is not None:
+            memo_base = rng.getrandbits(32) if rng is not None else self.memo_seed
+
+        if rng is None:
+            rng = random
+
+        stop = StopCheck(deadline, cancel_event)
+        if timer is None:
+            timer = NULL_TIMER
             
         try:
-            doc = self.nlp(text)
+            with timer.stage("parse"):
+                doc = self.parse(text, timer)
+            sentences = [sent for sent in doc.sents if sent.text.strip()]
             transformed_sentences = []
 
-            for sent in doc.sents:
+            # Synonym candidates are collected across the whole document and
+            # scored in one batch once every sentence has been planned
+            defer_scoring = use_synonyms and self.batch_synonym_scoring and self.model is not None
+            pending_synonyms = []
+            pending_memo = []
+
+            for sent in sentences:
+                # Deadline/cancellation is checked between sentences and stages
+                if stop():
+                    break
+
                 sentence_str = sent.text.strip()
-                
-                if not sentence_str:
-                    continue
+
+                # Repeated sentences are looked up; the others get their own RNG
+                sentence_rng = rng
+                memo_key = None
+                if memo_base is not None:
+                    normalized = normalize_sentence(sentence_str)
+                    memo_key = (normalized, use_passive, use_synonyms, sentence_seed(memo_base, normalized))
+                    cached = self.sentence_memo.get(memo_key)
+                    if cached is not None:
+                        timer.count("memo_hits")
+                        transformed_sentences.append(cached)
+                        if progress_callback is not None:
+                            progress_callback(len(transformed_sentences), len(sentences))
+                        continue
+                    timer.count("memo_misses")
+                    sentence_rng = random.Random(memo_key[3])
 
                 # 1. Expand contractions
-                sentence_str = self.expand_contractions(sentence_str)
+                with timer.stage("contractions"):
+                    sentence_str = self.expand_contractions(sentence_str)
 
                 # 2. Possibly add academic transitions
-                if random.random() < self.p_academic_transition:
-                    sentence_str = self.add_academic_transitions(sentence_str)
+                if not stop() and sentence_rng.random() < self.p_academic_transition:
+                    with timer.stage("transitions"):
+                        sentence_str = self.add_academic_transitions(sentence_str, sentence_rng)
 
                 # 3. Optionally convert to passive
-                if use_passive and random.random() < self.p_passive:
-                    sentence_str = self.convert_to_passive(sentence_str)
+                if use_passive and not stop() and sentence_rng.random() < self.p_passive:
+                    with timer.stage("passive"):
+                        sentence_str = self.convert_to_passive(sentence_str)
 
                 # 4. Optionally replace words with synonyms
-                if use_synonyms and random.random() < self.p_synonym_replacement:
-                    sentence_str = self.replace_with_synonyms(sentence_str)
+                if use_synonyms and not stop() and sentence_rng.random() < self.p_synonym_replacement:
+                    with timer.stage("synonyms"):
+                        reference_tags = self._reference_tags(sent)
+                        if defer_scoring:
+                            tokens, slots = self._plan_synonym_replacements(sentence_str, sentence_rng, reference_tags)
+                            pending_synonyms.append((len(transformed_sentences), tokens, slots))
+                        else:
+                            sentence_str = self.replace_with_synonyms(sentence_str, sentence_rng, reference_tags)
 
                 transformed_sentences.append(sentence_str)
-
-            return ' '.join(transformed_sentences)
+                if memo_key is not None and not stop.triggered:
+                    # Sentences waiting for batch scoring are memoized once they are final
+                    if pending_synonyms and pending_synonyms[-1][0] == len(transformed_sentences) - 1:
+                        pending_memo.append((len(transformed_sentences) - 1, memo_key))
+                    else:
+                        self.sentence_memo.put(memo_key, sentence_str)
+                if progress_callback is not None:
+                    progress_callback(len(transformed_sentences), len(sentences))
+
+            if pending_synonyms:
+                if stop():
+                    # Stopped early: keep the planned sentences without replacements
+                    for position, tokens, _ in pending_synonyms:
+                        transformed_sentences[position] = self._join_tokens(tokens)
+                else:
+                    with timer.stage("synonym_scoring"):
+                        self._apply_synonym_plans(transformed_sentences, pending_synonyms, rng)
+                    for position, memo_key in pending_memo:
+                        self.sentence_memo.put(memo_key, transformed_sentences[position])
+
+            processed = len(transformed_sentences)
+            remainder = [sent.text.strip() for sent in sentences[processed:]]
+            return HumanizeResult(
+                ' '.join(transformed_sentences + remainder),
+                not stop.triggered,
+                processed,
+                len(sentences)
+            )
         except Exception as e:
-            print(f"Error in humanize_text: {str(e)}")
-            return text
+            events.error("humanize_text_failed", "Error in humanize_text: %s", e)
+            return HumanizeResult(text, False, 0, 0)
+
+    def parse(self, text, timer=None):
+        """
+        Parses text with spaCy, through the parse cache when it is enabled
+        (counting the cache's answer in timer, if given).
+        """
+        if self.parse_cache is not None:
+            doc, source = self.parse_cache.lookup(text)
+            if timer is not None:
+                timer.count(f"parse_cache_{source}")
+            return doc
+        return self.nlp(text)
 
     def expand_contractions(self, sentence):
         """
         Expands common contractions while preserving punctuation and spacing.
         """
-        contraction_map = {
-            "n't": " not", "'re": " are", "'s": " is", "'ll": " will",
-            "'ve": " have", "'d": " would", "'m": " am",
-            # Handle contractions without apostrophes
-            "dont": "do not", "wont": "will not", "cant": "cannot",
-            "shouldnt": "should not", "wouldnt": "would not", "couldnt": "could not",
-            "havent": "have not", "hasnt": "has not", "hadnt": "had not",
-            "isnt": "is not", "arent": "are not", "wasnt": "was not", "werent": "were not"
-        }
         try:
             tokens = word_tokenize(sentence)
             expanded_tokens = []
             for token in tokens:
                 lower_token = token.lower()
                 replaced = False
-                for contraction, expansion in contraction_map.items():
+                for contraction, expansion in self.contraction_map.items():
                     if contraction in lower_token and lower_token.endswith(contraction):
                         new_token = lower_token.replace(contraction, expansion)
                         if token[0].isupper():
@@ -223,25 +544,13 @@ class AcademicTextHumanizer:
                 if not replaced:
                     expanded_tokens.append(token)
 
-            # Improved spacing: don't add space before punctuation
-            result = []
-            for i, token in enumerate(expanded_tokens):
-                if i == 0:
-                    result.append(token)
-                elif token in ".,!?;:')]}":
-                    result.append(token)
-                elif expanded_tokens[i-1] in "([{":
-                    result.append(token)
-                else:
-                    result.append(' ' + token)
-            
-            return ''.join(result)
+            return self._join_tokens(expanded_tokens)
         except Exception as e:
-            print(f"Error in expand_contractions: {str(e)}")
+            events.error("expand_contractions_failed", "Error in expand_contractions: %s", e)
             return sentence
 
-    def add_academic_transitions(self, sentence):
-        transition = random.choice(self.academic_transitions)
+    def add_academic_transitions(self, sentence, rng=None):
+        transition = (rng or random).choice(self.academic_transitions)
         return f"{transition} {sentence}"
 
     def convert_to_passive(self, sentence):
@@ -294,100 +603,238 @@ class AcademicTextHumanizer:
             
             return sentence
         except Exception as e:
-            print(f"Error in convert_to_passive: {str(e)}")
+            events.error("convert_to_passive_failed", "Error in convert_to_passive: %s", e)
             return sentence
 
-    def replace_with_synonyms(self, sentence):
+    def replace_with_synonyms(self, sentence, rng=None, reference_tags=None):
         """
         Replaces words with semantically similar synonyms while preserving punctuation.
+        reference_tags are (text, tag) pairs from an existing parse of the sentence.
         """
         try:
-            tokens = word_tokenize(sentence)
-            pos_tags = nltk.pos_tag(tokens)
-
-            new_tokens = []
-            for (word, pos) in pos_tags:
-                if pos.startswith(('J', 'N', 'V', 'R')) and wordnet.synsets(word):
-                    if random.random() < 0.5:
-                        synonyms = self._get_synonyms(word, pos)
-                        if synonyms:
-                            best_synonym = self._select_closest_synonym(word, synonyms)
-                            new_tokens.append(best_synonym if best_synonym else word)
-                        else:
-                            new_tokens.append(word)
+            tokens, slots = self._plan_synonym_replacements(sentence, rng, reference_tags)
+            if slots:
+                choices = self._select_closest_synonyms(
+                    [(word, synonyms) for _, word, synonyms in slots], rng=rng
+                )
+                for (index, word, _), choice in zip(slots, choices):
+                    tokens[index] = choice if choice else word
+            return self._join_tokens(tokens)
+        except Exception as e:
+            events.error("replace_with_synonyms_failed", "Error in replace_with_synonyms: %s", e)
+            return sentence
+
+    def _plan_synonym_replacements(self, sentence, rng=None, reference_tags=None):
+        """
+        Tokenizes a sentence and decides which words to replace, without scoring.
+
+        Returns the token list and the slots still awaiting a synonym choice as
+        (token index, original word, candidate synonyms). Without a sentence
+        transformer the random fallback is applied immediately, so no slots
+        are returned and the random sequence matches per-word selection.
+        """
+        if rng is None:
+            rng = random
+
+        tokens = word_tokenize(sentence)
+        pos_tags = self._pos_tag(tokens, reference_tags)
+
+        new_tokens = []
+        slots = []
+        for (word, pos) in pos_tags:
+            if pos.startswith(('J', 'N', 'V', 'R')) and self._has_synsets(word):
+                if rng.random() < 0.5:
+                    synonyms = self._get_synonyms(word, pos)
+                    if synonyms and self.model is not None:
+                        slots.append((len(new_tokens), word, synonyms))
+                        new_tokens.append(word)
+                    elif synonyms:
+                        best_synonym = self._select_closest_synonym(word, synonyms, rng)
+                        new_tokens.append(best_synonym if best_synonym else word)
                     else:
                         new_tokens.append(word)
                 else:
                     new_tokens.append(word)
+            else:
+                new_tokens.append(word)
 
-            # Improved spacing: don't add space before punctuation
-            result = []
-            for i, token in enumerate(new_tokens):
-                if i == 0:
-                    result.append(token)
-                elif token in ".,!?;:')]}":
-                    result.append(token)
-                elif new_tokens[i-1] in "([{":
-                    result.append(token)
-                else:
-                    result.append(' ' + token)
-            
-            return ''.join(result)
-        except Exception as e:
-            print(f"Error in replace_with_synonyms: {str(e)}")
-            return sentence
+        return new_tokens, slots
+
+    def _reference_tags(self, sent):
+        """
+        Returns (text, tag) pairs from a parsed spaCy sentence for tag reuse,
+        or None when NLTK tagging is configured or the pipeline has no tagger.
+        """
+        if self.pos_tagger != "spacy" or not any(token.tag_ for token in sent):
+            return None
+        return [(token.text, token.tag_) for token in sent]
+
+    def _pos_tag(self, tokens, reference_tags=None):
+        """
+        Tags tokens from reference tags when available, otherwise with the
+        shared NLTK tagger.
+        """
+        if reference_tags is not None:
+            return align_tags(tokens, reference_tags)
+        return pos_tag(tokens)
+
+    def _apply_synonym_plans(self, sentences, plans, rng=None):
+        """
+        Scores every planned synonym slot in the document at once and writes the
+        finished sentences back into place.
+        """
+        groups = [(word, synonyms) for _, _, slots in plans for _, word, synonyms in slots]
+        choices = iter(self._select_closest_synonyms(groups, rng=rng))
+        for position, tokens, slots in plans:
+            for index, word, _ in slots:
+                choice = next(choices)
+                tokens[index] = choice if choice else word
+            sentences[position] = self._join_tokens(tokens)
+
+    @staticmethod
+    def _join_tokens(tokens):
+        """
+        Joins tokens back into a sentence without adding a space before punctuation.
+        """
+        result = []
+        for i, token in enumerate(tokens):
+            if i == 0:
+                result.append(token)
+            elif token in ".,!?;:')]}":
+                result.append(token)
+            elif tokens[i-1] in "([{":
+                result.append(token)
+            else:
+                result.append(' ' + token)
+
+        return ''.join(result)
+
+    def _has_synsets(self, word):
+        """
+        True if WordNet has any synset for word.
+        """
+        if self.wordnet_subset is not None:
+            return self.wordnet_subset.has_synsets(word)
+        return bool(_wordnet().synsets(word))
 
     def _get_synonyms(self, word, pos):
         """
         Retrieves synonyms from WordNet based on POS tag.
         """
         try:
-            wn_pos = None
-            if pos.startswith('J'):
-                wn_pos = wordnet.ADJ
-            elif pos.startswith('N'):
-                wn_pos = wordnet.NOUN
-            elif pos.startswith('R'):
-                wn_pos = wordnet.ADV
-            elif pos.startswith('V'):
-                wn_pos = wordnet.VERB
+            wn_pos = PENN_TO_WORDNET.get(pos[:1])
+
+            if self.wordnet_subset is not None:
+                lemma_names = self.wordnet_subset.lemma_names(word, wn_pos)
+            else:
+                lemma_names = [
+                    lemma.name().replace('_', ' ')
+                    for syn in _wordnet().synsets(word, pos=wn_pos)
+                    for lemma in syn.lemmas()
+                ]
 
             synonyms = set()
-            for syn in wordnet.synsets(word, pos=wn_pos):
-                for lemma in syn.lemmas():
-                    lemma_name = lemma.name().replace('_', ' ')
-                    if lemma_name.lower() != word.lower():
-                        synonyms.add(lemma_name)
+            for lemma_name in lemma_names:
+                if lemma_name.lower() != word.lower():
+                    synonyms.add(lemma_name)
             return list(synonyms)
         except Exception as e:
-            print(f"Error in _get_synonyms: {str(e)}")
+            events.error("get_synonyms_failed", "Error in _get_synonyms: %s", e)
             return []
 
-    def _select_closest_synonym(self, original_word, synonyms):
+    def _select_closest_synonym(self, original_word, synonyms, rng=None):
         """
         Selects the semantically closest synonym using sentence transformers.
         Falls back to random selection if model is not available.
         """
-        try:
-            if not synonyms:
-                return None
-            
-            # If model is not available, use simple random selection
-            if self.model is None:
-                print("⚠️ Sentence transformer model not available, using random synonym selection")
-                return random.choice(synonyms)
-            
-            original_emb = self.model.encode(original_word, convert_to_tensor=True)
-            synonym_embs = self.model.encode(synonyms, convert_to_tensor=True)
-            cos_scores = util.cos_sim(original_emb, synonym_embs)[0]
-            max_score_index = cos_scores.argmax().item()
-            max_score = cos_scores[max_score_index].item()
-            if max_score >= 0.5:
-                return synonyms[max_score_index]
+        if not synonyms:
             return None
+
+        # If model is not available, use simple random selection
+        if self.model is None:
+            events.warning(
+                "synonym_model_missing",
+                "⚠️ Sentence transformer model not available, using random synonym selection"
+            )
+            return (rng or random).choice(synonyms)
+
+        return self._select_closest_synonyms([(original_word, synonyms)], rng=rng)[0]
+
+    def _encode_unit_vectors(self, model, strings):
+        """
+        Normalized float32 embeddings of strings. For self.model, vectors are
+        read from the embedding cache and only the misses are encoded.
+        """
+        if self.embedding_cache is None or model is not self.model:
+            return np.asarray(
+                model.encode(strings, normalize_embeddings=True, show_progress_bar=False),
+                dtype=np.float32
+            )
+
+        rows = [None] * len(strings)
+        for i, text in enumerate(strings):
+            data = self.embedding_cache.get(self.embedding_cache_prefix + text)
+            if data is not None:
+                rows[i] = np.frombuffer(data, dtype=np.float32)
+
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            encoded = np.asarray(
+                model.encode([strings[i] for i in missing], normalize_embeddings=True, show_progress_bar=False),
+                dtype=np.float32
+            )
+            for i, vector in zip(missing, encoded):
+                rows[i] = vector
+                self.embedding_cache.set(self.embedding_cache_prefix + strings[i], vector.tobytes())
+
+        # Vectors cached by a different model would not line up; encode everything
+        if len({row.shape for row in rows}) > 1:
+            return np.asarray(
+                model.encode(strings, normalize_embeddings=True, show_progress_bar=False),
+                dtype=np.float32
+            )
+        return np.vstack(rows)
+
+    def _select_closest_synonyms(self, groups, model=None, rng=None):
+        """
+        Picks the closest synonym for each (original word, candidates) group.
+
+        All unique strings are embedded in a single encode call and the cosine
+        similarities for every group are computed as one vectorised operation.
+        A group gets None when its best candidate scores below 0.5.
+        Scores with self.model unless another model is given.
+        """
+        try:
+            if not groups:
+                return []
+
+            if model is None:
+                model = self.model
+
+            unique = list(dict.fromkeys(
+                text for word, synonyms in groups for text in [word, *synonyms]
+            ))
+            index = {text: i for i, text in enumerate(unique)}
+            vectors = self._encode_unit_vectors(model, unique)
+
+            lengths = [len(synonyms) for _, synonyms in groups]
+            original_rows = np.repeat([index[word] for word, _ in groups], lengths)
+            candidate_rows = np.array(
+                [index[text] for _, synonyms in groups for text in synonyms], dtype=np.intp
+            )
+            # Row-wise dot products of unit vectors are the cosine similarities
+            cos_scores = np.einsum('ij,ij->i', vectors[original_rows], vectors[candidate_rows])
+
+            choices = []
+            start = 0
+            for (_, synonyms), length in zip(groups, lengths):
+                scores = cos_scores[start:start + length]
+                start += length
+                best = int(scores.argmax())
+                choices.append(synonyms[best] if scores[best] >= 0.5 else None)
+            return choices
         except Exception as e:
-            print(f"Error in _select_closest_synonym: {str(e)}")
+            events.error("select_closest_synonyms_failed", "Error in _select_closest_synonyms: %s", e)
             # Fallback to random selection
-            if synonyms:
-                return random.choice(synonyms)
-            return None
\ No newline at end of file
+            rng = rng or random
+            return [rng.choice(synonyms) if synonyms else None for _, synonyms in groups]
@@ -0,0 +1,244 @@
+"""
+Fast, zero-NLP engine for the model-free tier.
+
+Same interface as transformer.app and transformer.app_no_models, but built
+only on precompiled regular expressions: a regex sentence splitter and a
+single-pass dictionary replacer over the contraction map and the simple
+synonym dictionary. Neither spaCy nor NLTK is imported, so the engine starts
+instantly and processes text at regex speed.
+
+Differences from the NLP engines:
+  - Passive voice conversion needs a dependency parse and is not supported;
+    use_passive is ignored (see SUPPORTS_PASSIVE).
+  - Synonym candidates are matched by word form without POS filtering.
+"""
+
+import re
+import random
+
+from transformer.cancellation import HumanizeResult, StopCheck
+from transformer.timing import NULL_TIMER
+from transformer.lexicon import ACADEMIC_TRANSITIONS, CONTRACTION_MAP, SIMPLE_SYNONYMS
+
+SUPPORTS_PASSIVE = False
+
+# Sentence boundaries: whitespace after terminal punctuation (optionally
+# followed by a closing quote or bracket, which stays with its sentence), or
+# a blank line
+SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+|\n\s*\n')
+
+# Word and punctuation tokens, approximating NLTK's word_tokenize counts
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)?|[^\w\s]")
+
+# Contractions whose stem changes when expanded
+IRREGULAR_CONTRACTIONS = {
+    "can't": "cannot", "won't": "will not", "shan't": "shall not", "ain't": "is not",
+}
+
+_SUFFIXES = [key for key in CONTRACTION_MAP if key.startswith(("'", "n'"))]
+_BARE_CONTRACTIONS = {key: value for key, value in CONTRACTION_MAP.items() if key not in _SUFFIXES}
+
+# One pass over a sentence finds apostrophe contractions (stem + suffix) and
+# whole dictionary words (apostrophe-less contractions and synonym keys)
+_REPLACER = re.compile(
+    r"\b(?:(?P<stem>[A-Za-z]+?)(?P<suffix>"
+    + "|".join(re.escape(s).replace("'", "['’]") for s in sorted(_SUFFIXES, key=len, reverse=True))
+    + r")|(?P<word>"
+    + "|".join(sorted(set(_BARE_CONTRACTIONS) | set(SIMPLE_SYNONYMS), key=len, reverse=True))
+    + r"))\b",
+    re.IGNORECASE
+)
+
+
+def load_spacy_model():
+    """
+    Not used by this engine; kept for interface compatibility.
+    """
+    return None
+
+
+def download_nltk_resources():
+    """
+    No NLTK resources are needed by this engine.
+    """
+    return None
+
+
+def split_sentences(text):
+    """
+    Splits text into stripped, non-empty sentences.
+    """
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def count_words(text):
+    """
+    Counts word and punctuation tokens.
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def count_sentences(text):
+    """
+    Counts sentences using the regex splitter.
+    """
+    return len(split_sentences(text))
+
+
+def _match_case(replacement, original):
+    return replacement.capitalize() if original[:1].isupper() else replacement
+
+
+class AcademicTextHumanizer:
+    """
+    Transforms text into a more formal (academic) style:
+      - Expands contractions
+      - Adds academic transitions
+      - Optionally replaces words with dictionary synonyms
+    """
+
+    def __init__(
+        self,
+        model_name=None,  # Not used in this version
+        p_passive=0.2,
+        p_synonym_replacement=0.3,
+        p_academic_transition=0.3,
+        seed=None,
+        **kwargs
+    ):
+        """
+        Initialize the fast humanizer. Accepts and ignores the model options
+        of the other engines so it can be constructed with the same arguments.
+
+        Args:
+            model_name: Not used in this engine
+            p_passive: Kept for interface compatibility; passive voice is unsupported
+            p_synonym_replacement: Probability of synonym replacement
+            p_academic_transition: Probability of adding academic transitions
+            seed: Random seed for reproducibility
+        """
+        if seed is not None:
+            random.seed(seed)
+
+        self.nlp = None
+        self.model = None
+
+        # Transformation probabilities
+        self.p_passive = p_passive
+        self.p_synonym_replacement = p_synonym_replacement
+        self.p_academic_transition = p_academic_transition
+
+        self.academic_transitions = list(ACADEMIC_TRANSITIONS)
+        self.simple_synonyms = dict(SIMPLE_SYNONYMS)
+
+    def humanize_text(self, text, use_passive=False, use_synonyms=False, rng=None,
+                      deadline=None, cancel_event=None):
+        """
+        Transform text to a more formal academic style.
+
+        Args:
+            text: Input text to transform
+            use_passive: Ignored; passive voice needs a dependency parse
+            use_synonyms: Whether to apply synonym replacement
+            rng: Random number generator to draw from (defaults to the global
+                random module)
+            deadline: time.time() timestamp after which processing stops early
+            cancel_event: threading.Event that stops processing early when set
+
+        Returns:
+            Transformed text string. If processing stopped early, sentences not
+            yet processed are appended unchanged (see humanize_text_with_status).
+        """
+        return self.humanize_text_with_status(
+            text, use_passive, use_synonyms, rng, deadline, cancel_event
+        ).text
+
+    def humanize_text_with_status(self, text, use_passive=False, use_synonyms=False, rng=None,
+                                  deadline=None, cancel_event=None, progress_callback=None, timer=None):
+        """
+        Same as humanize_text, but returns a HumanizeResult reporting whether
+        every sentence was processed before the deadline or cancellation.
+        progress_callback, if given, is called as (sentences_processed,
+        sentences_total) after each sentence. timer, a timing.StageTimer,
+        receives the time spent in each stage.
+        """
+        if not text or not text.strip():
+            return HumanizeResult(text, True, 0, 0)
+
+        if rng is None:
+            rng = random
+
+        stop = StopCheck(deadline, cancel_event)
+        if timer is None:
+            timer = NULL_TIMER
+
+        with timer.stage("split"):
+            sentences = split_sentences(text)
+        transformed_sentences = []
+        for sentence_str in sentences:
+            if stop():
+                break
+
+            # Decide the random stages first so one replacer pass handles
+            # contractions and synonyms together
+            add_transition = rng.random() < self.p_academic_transition
+            replace_synonyms = use_synonyms and rng.random() < self.p_synonym_replacement
+
+            with timer.stage("replace"):
+                sentence_str = self._replace(sentence_str, replace_synonyms, rng)
+            if add_transition:
+                with timer.stage("transitions"):
+                    sentence_str = self.add_academic_transitions(sentence_str, rng)
+
+            transformed_sentences.append(sentence_str)
+            if progress_callback is not None:
+                progress_callback(len(transformed_sentences), len(sentences))
+
+        processed = len(transformed_sentences)
+        return HumanizeResult(
+            ' '.join(transformed_sentences + sentences[processed:]),
+            not stop.triggered,
+            processed,
+            len(sentences)
+        )
+
+    def expand_contractions(self, sentence):
+        """
+        Expands contractions in a single regex pass.
+        """
+        return self._replace(sentence, False, random)
+
+    def add_academic_transitions(self, sentence, rng=None):
+        transition = (rng or random).choice(self.academic_transitions)
+        return f"{transition} {sentence}"
+
+    def convert_to_passive(self, sentence):
+        """
+        Passive voice needs a dependency parse; sentences are returned unchanged.
+        """
+        return sentence
+
+    def replace_with_synonyms(self, sentence, rng=None):
+        """
+        Expands contractions and replaces dictionary words with synonyms in a single pass.
+        """
+        return self._replace(sentence, True, rng or random)
+
+    def _replace(self, sentence, use_synonyms, rng):
+        def substitute(match):
+            token = match.group(0)
+            if match.group('stem'):
+                lower = token.lower().replace('’', "'")
+                if lower in IRREGULAR_CONTRACTIONS:
+                    return _match_case(IRREGULAR_CONTRACTIONS[lower], token)
+                suffix = match.group('suffix').lower().replace('’', "'")
+                return match.group('stem') + CONTRACTION_MAP[suffix]
+
+            lower = token.lower()
+            if lower in _BARE_CONTRACTIONS:
+                return _match_case(_BARE_CONTRACTIONS[lower], token)
+            if use_synonyms and rng.random() < 0.5:  # 50% chance to replace
+                return _match_case(rng.choice(self.simple_synonyms[lower]), token)
+            return token
+
+        return _REPLACER.sub(substitute, sentence)
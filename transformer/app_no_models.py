@@ -3,16 +3,21 @@ import random
 import warnings
 from typing import Optional
 
-import nltk
-import spacy
-from nltk.tokenize import word_tokenize
-from nltk.corpus import wordnet
+from transformer.cancellation import HumanizeResult, StopCheck
+from transformer.parse_cache import ParseCache
+from transformer.memo import SentenceMemo, normalize_sentence, sentence_seed
+from transformer.lexicon import ACADEMIC_TRANSITIONS, CONTRACTION_MAP, SIMPLE_SYNONYMS
+from transformer.tagging import align_tags, get_pos_tagger, pos_tag
+from transformer.logging_utils import events
+from transformer.timing import NULL_TIMER
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 # Global spaCy model - loaded once and reused
 NLP_GLOBAL = None
 
+# spaCy and NLTK are imported when first used, so importing this module stays cheap
+
 def load_spacy_model():
     """
     Lazy loading of spaCy model with error handling.
@@ -20,6 +25,7 @@ def load_spacy_model():
     global NLP_GLOBAL
     if NLP_GLOBAL is None:
         try:
+            import spacy
             NLP_GLOBAL = spacy.load("en_core_web_sm")
         except Exception as e:
             print(f"Error loading spaCy model: {str(e)}")
@@ -31,6 +37,8 @@ def download_nltk_resources():
     """
     Download required NLTK resources if not already installed.
     """
+    import nltk
+
     try:
         _create_unverified_https_context = ssl._create_unverified_context
     except AttributeError:
@@ -46,6 +54,12 @@ def download_nltk_resources():
             print(f"Error downloading {resource}: {str(e)}")
 
 
+def word_tokenize(text):
+    """NLTK word tokenization, importing NLTK on first use."""
+    from nltk.tokenize import word_tokenize as nltk_word_tokenize
+    return nltk_word_tokenize(text)
+
+
 # This class contains methods to humanize academic text, such as improving readability or
 # simplifying complex language.
 class AcademicTextHumanizer:
@@ -63,7 +77,11 @@ class AcademicTextHumanizer:
         p_passive=0.2,
         p_synonym_replacement=0.3,
         p_academic_transition=0.3,
-        seed=None
+        seed=None,
+        pos_tagger="nltk",
+        sentence_memo_size=0,
+        parse_cache_size=0,
+        parse_cache_dir=None
     ):
         """
         Initialize the AcademicTextHumanizer with models and parameters.
@@ -74,6 +92,20 @@ class AcademicTextHumanizer:
             p_synonym_replacement: Probability of synonym replacement
             p_academic_transition: Probability of adding academic transitions
             seed: Random seed for reproducibility
+            pos_tagger: "nltk" for the shared perceptron tagger, or "spacy" to
+                reuse the tags spaCy computed in humanize_text for synonym
+                replacement. spaCy tags the original sentence and its tags are
+                aligned onto the rewritten one, so they can differ from NLTK's
+                and change which words get synonyms for the same seed
+            sentence_memo_size: Number of transformed sentences to memoize
+                (0 disables the memo). With the memo, each sentence draws from
+                its own RNG derived from the request seed and the sentence, so
+                a repeated sentence is transformed once and then looked up;
+                unseeded requests use a per-instance seed instead.
+            parse_cache_size: Number of spaCy parses of input texts kept in
+                memory (0 disables the parse cache)
+            parse_cache_dir: Directory where parses are also stored as DocBin
+                files, so they survive restarts and are shared between workers
         """
         if seed is not None:
             random.seed(seed)
@@ -92,37 +124,30 @@ class AcademicTextHumanizer:
         self.p_synonym_replacement = p_synonym_replacement
         self.p_academic_transition = p_academic_transition
 
+        # Shared NLTK tagger is created up front only when it is the configured path
+        self.pos_tagger = pos_tagger
+        if pos_tagger == "nltk":
+            get_pos_tagger()
+
+        # Memo of transformed sentences, keyed on (normalized sentence, stages, seed)
+        self.sentence_memo = SentenceMemo(sentence_memo_size) if sentence_memo_size > 0 else None
+        # Base seed for memoized runs without an rng, from a private generator so
+        # the global random sequence after random.seed(seed) is left untouched
+        self.memo_seed = random.Random(seed).getrandbits(32) if self.sentence_memo is not None else None
+
+        # Parses of recently submitted texts, reused when a text comes back
+        self.parse_cache = None
+        if parse_cache_size > 0:
+            self.parse_cache = ParseCache(self.nlp, max_size=parse_cache_size, directory=parse_cache_dir)
+
         # Common academic transitions
-        self.academic_transitions = [
-            "Moreover,", "Additionally,", "Furthermore,", "Hence,", 
-            "Therefore,", "Consequently,", "Nonetheless,", "Nevertheless,"
-        ]
+        self.academic_transitions = list(ACADEMIC_TRANSITIONS)
 
         # Simple synonym dictionary for common words (no external model needed)
-        self.simple_synonyms = {
-            'good': ['excellent', 'outstanding', 'superior', 'remarkable'],
-            'bad': ['poor', 'inadequate', 'substandard', 'deficient'],
-            'big': ['large', 'substantial', 'considerable', 'significant'],
-            'small': ['minor', 'minimal', 'limited', 'modest'],
-            'important': ['crucial', 'essential', 'vital', 'paramount'],
-            'easy': ['simple', 'straightforward', 'effortless', 'uncomplicated'],
-            'hard': ['difficult', 'challenging', 'complex', 'demanding'],
-            'fast': ['rapid', 'quick', 'swift', 'speedy'],
-            'slow': ['gradual', 'leisurely', 'deliberate', 'methodical'],
-            'new': ['recent', 'novel', 'innovative', 'contemporary'],
-            'old': ['ancient', 'traditional', 'conventional', 'established'],
-            'many': ['numerous', 'multiple', 'various', 'diverse'],
-            'few': ['limited', 'scarce', 'minimal', 'sparse'],
-            'great': ['excellent', 'outstanding', 'exceptional', 'remarkable'],
-            'nice': ['pleasant', 'agreeable', 'delightful', 'charming'],
-            'cool': ['impressive', 'remarkable', 'notable', 'distinguished'],
-            'awesome': ['remarkable', 'extraordinary', 'exceptional', 'outstanding'],
-            'amazing': ['remarkable', 'extraordinary', 'incredible', 'astonishing'],
-            'wonderful': ['excellent', 'outstanding', 'remarkable', 'exceptional'],
-            'terrible': ['dreadful', 'awful', 'appalling', 'deplorable']
-        }
-
-    def humanize_text(self, text, use_passive=False, use_synonyms=False):
+        self.simple_synonyms = dict(SIMPLE_SYNONYMS)
+
+    def humanize_text(self, text, use_passive=False, use_synonyms=False, rng=None,
+                      deadline=None, cancel_event=None):
         """
         Transform text to a more formal academic style.
         
@@ -130,65 +155,134 @@ class AcademicTextHumanizer:
             text: Input text to transform
             use_passive: Whether to apply passive voice conversion
             use_synonyms: Whether to apply synonym replacement
+            rng: Random number generator to draw from (defaults to the global
+                random module, so random.seed() keeps working)
+            deadline: time.time() timestamp after which processing stops early
+            cancel_event: threading.Event that stops processing early when set
             
         Returns:
-            Transformed text string
+            Transformed text string. If processing stopped early, sentences not
+            yet processed are appended unchanged (see humanize_text_with_status).
+        """
+        return self.humanize_text_with_status(
+            text, use_passive, use_synonyms, rng, deadline, cancel_event
+        ).text
+
+    def humanize_text_with_status(self, text, use_passive=False, use_synonyms=False, rng=None,
+                                  deadline=None, cancel_event=None, progress_callback=None, timer=None):
+        """
+        Same as humanize_text, but returns a HumanizeResult reporting whether
+        every sentence was processed before the deadline or cancellation.
+        progress_callback, if given, is called as (sentences_processed,
+        sentences_total) after each sentence. timer, a timing.StageTimer,
+        receives the time spent in each stage and the cache hits.
         """
         if not text or not text.strip():
-            return text
+            return HumanizeResult(text, True, 0, 0)
+
+        # With a memo, each sentence draws from an RNG derived from this base
+        memo_base = None
+        if self.sentence_memo is not None:
+            memo_base = rng.getrandbits(32) if rng is not None else self.memo_seed
+
+        if rng is None:
+            rng = random
+
+        stop = StopCheck(deadline, cancel_event)
+        if timer is None:
+            timer = NULL_TIMER
             
         try:
-            doc = self.nlp(text)
+            with timer.stage("parse"):
+                doc = self.parse(text, timer)
+            sentences = [sent for sent in doc.sents if sent.text.strip()]
             transformed_sentences = []
 
-            for sent in doc.sents:
+            for sent in sentences:
+                # Deadline/cancellation is checked between sentences and stages
+                if stop():
+                    break
+
                 sentence_str = sent.text.strip()
-                
-                if not sentence_str:
-                    continue
+
+                # Repeated sentences are looked up; the others get their own RNG
+                sentence_rng = rng
+                memo_key = None
+                if memo_base is not None:
+                    normalized = normalize_sentence(sentence_str)
+                    memo_key = (normalized, use_passive, use_synonyms, sentence_seed(memo_base, normalized))
+                    cached = self.sentence_memo.get(memo_key)
+                    if cached is not None:
+                        timer.count("memo_hits")
+                        transformed_sentences.append(cached)
+                        if progress_callback is not None:
+                            progress_callback(len(transformed_sentences), len(sentences))
+                        continue
+                    timer.count("memo_misses")
+                    sentence_rng = random.Random(memo_key[3])
 
                 # 1. Expand contractions
-                sentence_str = self.expand_contractions(sentence_str)
+                with timer.stage("contractions"):
+                    sentence_str = self.expand_contractions(sentence_str)
 
                 # 2. Possibly add academic transitions
-                if random.random() < self.p_academic_transition:
-                    sentence_str = self.add_academic_transitions(sentence_str)
+                if not stop() and sentence_rng.random() < self.p_academic_transition:
+                    with timer.stage("transitions"):
+                        sentence_str = self.add_academic_transitions(sentence_str, sentence_rng)
 
                 # 3. Optionally convert to passive
-                if use_passive and random.random() < self.p_passive:
-                    sentence_str = self.convert_to_passive(sentence_str)
+                if use_passive and not stop() and sentence_rng.random() < self.p_passive:
+                    with timer.stage("passive"):
+                        sentence_str = self.convert_to_passive(sentence_str)
 
                 # 4. Optionally replace words with synonyms
-                if use_synonyms and random.random() < self.p_synonym_replacement:
-                    sentence_str = self.replace_with_synonyms(sentence_str)
+                if use_synonyms and not stop() and sentence_rng.random() < self.p_synonym_replacement:
+                    with timer.stage("synonyms"):
+                        sentence_str = self.replace_with_synonyms(
+                            sentence_str, sentence_rng, self._reference_tags(sent)
+                        )
 
                 transformed_sentences.append(sentence_str)
+                if memo_key is not None and not stop.triggered:
+                    self.sentence_memo.put(memo_key, sentence_str)
+                if progress_callback is not None:
+                    progress_callback(len(transformed_sentences), len(sentences))
 
-            return ' '.join(transformed_sentences)
+            processed = len(transformed_sentences)
+            remainder = [sent.text.strip() for sent in sentences[processed:]]
+            return HumanizeResult(
+                ' '.join(transformed_sentences + remainder),
+                not stop.triggered,
+                processed,
+                len(sentences)
+            )
         except Exception as e:
-            print(f"Error in humanize_text: {str(e)}")
-            return text
+            events.error("humanize_text_failed", "Error in humanize_text: %s", e)
+            return HumanizeResult(text, False, 0, 0)
+
+    def parse(self, text, timer=None):
+        """
+        Parses text with spaCy, through the parse cache when it is enabled
+        (counting the cache's answer in timer, if given).
+        """
+        if self.parse_cache is not None:
+            doc, source = self.parse_cache.lookup(text)
+            if timer is not None:
+                timer.count(f"parse_cache_{source}")
+            return doc
+        return self.nlp(text)
 
     def expand_contractions(self, sentence):
         """
         Expands common contractions while preserving punctuation and spacing.
         """
-        contraction_map = {
-            "n't": " not", "'re": " are", "'s": " is", "'ll": " will",
-            "'ve": " have", "'d": " would", "'m": " am",
-            # Handle contractions without apostrophes
-            "dont": "do not", "wont": "will not", "cant": "cannot",
-            "shouldnt": "should not", "wouldnt": "would not", "couldnt": "could not",
-            "havent": "have not", "hasnt": "has not", "hadnt": "had not",
-            "isnt": "is not", "arent": "are not", "wasnt": "was not", "werent": "were not"
-        }
         try:
             tokens = word_tokenize(sentence)
             expanded_tokens = []
             for token in tokens:
                 lower_token = token.lower()
                 replaced = False
-                for contraction, expansion in contraction_map.items():
+                for contraction, expansion in CONTRACTION_MAP.items():
                     if contraction in lower_token and lower_token.endswith(contraction):
                         new_token = lower_token.replace(contraction, expansion)
                         if token[0].isupper():
@@ -221,11 +315,11 @@ class AcademicTextHumanizer:
             
             return ''.join(result)
         except Exception as e:
-            print(f"Error in expand_contractions: {str(e)}")
+            events.error("expand_contractions_failed", "Error in expand_contractions: %s", e)
             return sentence
 
-    def add_academic_transitions(self, sentence):
-        transition = random.choice(self.academic_transitions)
+    def add_academic_transitions(self, sentence, rng=None):
+        transition = (rng or random).choice(self.academic_transitions)
         return f"{transition} {sentence}"
 
     def convert_to_passive(self, sentence):
@@ -278,23 +372,27 @@ class AcademicTextHumanizer:
             
             return sentence
         except Exception as e:
-            print(f"Error in convert_to_passive: {str(e)}")
+            events.error("convert_to_passive_failed", "Error in convert_to_passive: %s", e)
             return sentence
 
-    def replace_with_synonyms(self, sentence):
+    def replace_with_synonyms(self, sentence, rng=None, reference_tags=None):
         """
         Replaces words with simple dictionary-based synonyms (no external model needed).
+        reference_tags are (text, tag) pairs from an existing parse of the sentence.
         """
+        if rng is None:
+            rng = random
+
         try:
             tokens = word_tokenize(sentence)
-            pos_tags = nltk.pos_tag(tokens)
+            pos_tags = self._pos_tag(tokens, reference_tags)
 
             new_tokens = []
             for (word, pos) in pos_tags:
                 if pos.startswith(('J', 'N', 'V', 'R')) and word.lower() in self.simple_synonyms:
-                    if random.random() < 0.5:  # 50% chance to replace
+                    if rng.random() < 0.5:  # 50% chance to replace
                         synonyms = self.simple_synonyms[word.lower()]
-                        synonym = random.choice(synonyms)
+                        synonym = rng.choice(synonyms)
                         # Preserve capitalization
                         if word[0].isupper():
                             synonym = synonym.capitalize()
@@ -318,5 +416,23 @@ class AcademicTextHumanizer:
             
             return ''.join(result)
         except Exception as e:
-            print(f"Error in replace_with_synonyms: {str(e)}")
+            events.error("replace_with_synonyms_failed", "Error in replace_with_synonyms: %s", e)
             return sentence
+
+    def _reference_tags(self, sent):
+        """
+        Returns (text, tag) pairs from a parsed spaCy sentence for tag reuse,
+        or None when NLTK tagging is configured or the pipeline has no tagger.
+        """
+        if self.pos_tagger != "spacy" or not any(token.tag_ for token in sent):
+            return None
+        return [(token.text, token.tag_) for token in sent]
+
+    def _pos_tag(self, tokens, reference_tags=None):
+        """
+        Tags tokens from reference tags when available, otherwise with the
+        shared NLTK tagger.
+        """
+        if reference_tags is not None:
+            return align_tags(tokens, reference_tags)
+        return pos_tag(tokens)
@@ -0,0 +1,40 @@
+"""
+Deadlines and cooperative cancellation for humanize_text.
+
+Engines check a StopCheck between sentences and between stages; once it
+fires they stop transforming and return what they have, with the remaining
+sentences appended unchanged.
+"""
+
+import time
+from typing import NamedTuple
+
+
+class HumanizeResult(NamedTuple):
+    text: str
+    completed: bool
+    sentences_processed: int
+    sentences_total: int
+
+
+class StopCheck:
+    """
+    Callable that reports whether processing should stop.
+
+    Args:
+        deadline: time.time() timestamp after which processing stops
+        cancel_event: threading.Event that stops processing when set
+    """
+
+    def __init__(self, deadline=None, cancel_event=None):
+        self.deadline = deadline
+        self.cancel_event = cancel_event
+        self.triggered = False
+
+    def __call__(self):
+        if not self.triggered:
+            if self.deadline is not None and time.time() >= self.deadline:
+                self.triggered = True
+            elif self.cancel_event is not None and self.cancel_event.is_set():
+                self.triggered = True
+        return self.triggered
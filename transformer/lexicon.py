@@ -0,0 +1,47 @@
+"""
+Word tables shared by the transformer engines.
+
+Kept free of NLP imports so the fast engine can use them without loading
+spaCy or NLTK.
+"""
+
+# Contraction suffixes and apostrophe-less contractions, in match order
+CONTRACTION_MAP = {
+    "n't": " not", "'re": " are", "'s": " is", "'ll": " will",
+    "'ve": " have", "'d": " would", "'m": " am",
+    # Handle contractions without apostrophes
+    "dont": "do not", "wont": "will not", "cant": "cannot",
+    "shouldnt": "should not", "wouldnt": "would not", "couldnt": "could not",
+    "havent": "have not", "hasnt": "has not", "hadnt": "had not",
+    "isnt": "is not", "arent": "are not", "wasnt": "was not", "werent": "were not"
+}
+
+# Common academic transitions
+ACADEMIC_TRANSITIONS = [
+    "Moreover,", "Additionally,", "Furthermore,", "Hence,",
+    "Therefore,", "Consequently,", "Nonetheless,", "Nevertheless,"
+]
+
+# Simple synonym dictionary for common words (no external model needed)
+SIMPLE_SYNONYMS = {
+    'good': ['excellent', 'outstanding', 'superior', 'remarkable'],
+    'bad': ['poor', 'inadequate', 'substandard', 'deficient'],
+    'big': ['large', 'substantial', 'considerable', 'significant'],
+    'small': ['minor', 'minimal', 'limited', 'modest'],
+    'important': ['crucial', 'essential', 'vital', 'paramount'],
+    'easy': ['simple', 'straightforward', 'effortless', 'uncomplicated'],
+    'hard': ['difficult', 'challenging', 'complex', 'demanding'],
+    'fast': ['rapid', 'quick', 'swift', 'speedy'],
+    'slow': ['gradual', 'leisurely', 'deliberate', 'methodical'],
+    'new': ['recent', 'novel', 'innovative', 'contemporary'],
+    'old': ['ancient', 'traditional', 'conventional', 'established'],
+    'many': ['numerous', 'multiple', 'various', 'diverse'],
+    'few': ['limited', 'scarce', 'minimal', 'sparse'],
+    'great': ['excellent', 'outstanding', 'exceptional', 'remarkable'],
+    'nice': ['pleasant', 'agreeable', 'delightful', 'charming'],
+    'cool': ['impressive', 'remarkable', 'notable', 'distinguished'],
+    'awesome': ['remarkable', 'extraordinary', 'exceptional', 'outstanding'],
+    'amazing': ['remarkable', 'extraordinary', 'incredible', 'astonishing'],
+    'wonderful': ['excellent', 'outstanding', 'remarkable', 'exceptional'],
+    'terrible': ['dreadful', 'awful', 'appalling', 'deplorable']
+}
@@ -0,0 +1,162 @@
+"""
+Rate-limited, counted logging for hot paths.
+
+Per-sentence error handlers and per-request warnings used to print() every
+occurrence, which can mean hundreds of synchronous console writes for one
+document. Hot paths report through an EventLog instead:
+
+  - every occurrence is counted by event key (see EventLog.stats())
+  - each key is logged at most `burst` times per `interval` seconds; the next
+    line that gets through says how many were suppressed
+  - events below WARNING can be sampled
+  - records go through a queue to a background thread, so request threads
+    never block on console I/O (configure_logging)
+
+Startup and one-off messages keep using print().
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = "humanizer"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, including the event key and counters."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in ("event", "count", "suppressed"):
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class EventLog:
+    """
+    Counts events by key and logs a bounded number of them.
+
+    Args:
+        name: Logger name
+        interval: Seconds per rate-limit window
+        burst: Lines logged per key and window
+        sample_rate: Share of DEBUG/INFO events that are considered for logging
+        clock: Monotonic time function for the windows (time.monotonic)
+        rng: random.Random used for sampling (a private unseeded one)
+    """
+
+    def __init__(self, name=LOGGER_NAME, interval=60.0, burst=1, sample_rate=1.0, clock=None, rng=None):
+        self.logger = logging.getLogger(name)
+        self.interval = interval
+        self.burst = burst
+        self.sample_rate = sample_rate
+        self.counts = Counter()
+        # key -> [window start, lines logged, occurrences suppressed]
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._clock = clock or time.monotonic
+        # Own generator, so sampling never consumes the global random sequence
+        self._random = rng or random.Random()
+
+    def event(self, key, level, message, *args, exc_info=None):
+        """
+        Counts an occurrence of key and logs message % args unless it is
+        rate limited or sampled out. Returns True if a line was logged.
+        """
+        with self._lock:
+            self.counts[key] += 1
+            count = self.counts[key]
+            if not self.logger.isEnabledFor(level):
+                return False
+            if level < logging.WARNING and self.sample_rate < 1.0 and self._random.random() >= self.sample_rate:
+                return False
+
+            now = self._clock()
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+
+        extra = {"event": key, "count": count}
+        if suppressed:
+            message += " (%d similar messages suppressed)"
+            args += (suppressed,)
+            extra["suppressed"] = suppressed
+        self.logger.log(level, message, *args, exc_info=exc_info, extra=extra)
+        return True
+
+    def debug(self, key, message, *args, **kwargs):
+        return self.event(key, logging.DEBUG, message, *args, **kwargs)
+
+    def info(self, key, message, *args, **kwargs):
+        return self.event(key, logging.INFO, message, *args, **kwargs)
+
+    def warning(self, key, message, *args, **kwargs):
+        return self.event(key, logging.WARNING, message, *args, **kwargs)
+
+    def error(self, key, message, *args, **kwargs):
+        return self.event(key, logging.ERROR, message, *args, **kwargs)
+
+    def stats(self):
+        """Occurrences per event key since startup, logged or not."""
+        with self._lock:
+            return dict(self.counts)
+
+
+# Shared by the engines and the API
+events = EventLog()
+
+
+def configure_logging(level=None, fmt=None, interval=None, sample_rate=None):
+    """
+    Sets up the humanizer logger once per process: records are queued and
+    written to stderr by a background thread, as text or JSON lines.
+    Arguments default to LOG_LEVEL (INFO), LOG_FORMAT (text|json),
+    LOG_RATE_LIMIT_SECONDS (60) and LOG_SAMPLE_RATE (1.0).
+    """
+    global _listener
+    with _configure_lock:
+        events.interval = float(interval if interval is not None else os.getenv("LOG_RATE_LIMIT_SECONDS", "60"))
+        events.sample_rate = float(sample_rate if sample_rate is not None else os.getenv("LOG_SAMPLE_RATE", "1.0"))
+        if _listener is not None:
+            return
+
+        fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+        handler = logging.StreamHandler()
+        handler.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+        records = queue.SimpleQueue()
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+        logger.addHandler(QueueHandler(records))
+        logger.propagate = False
+
+        _listener = QueueListener(records, handler)
+        _listener.start()
+        atexit.register(_listener.stop)
@@ -0,0 +1,66 @@
+"""
+Sentence-level memoization for humanize_text.
+
+Documents often share sentences (disclaimers, headings, template phrasing).
+With a memo, each sentence is transformed with its own RNG seeded from the
+request's base seed and the sentence itself, so a repeated sentence has one
+deterministic result that can be looked up instead of recomputed - within a
+document and across documents.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def normalize_sentence(sentence):
+    """Collapses whitespace so layout differences do not miss the memo."""
+    return ' '.join(sentence.split())
+
+
+def sentence_seed(base, normalized):
+    """Derives a stable 64-bit seed for a sentence from a base seed."""
+    digest = hashlib.sha256(f"{base}:{normalized}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class SentenceMemo:
+    """
+    Thread-safe LRU mapping (normalized sentence, use_passive, use_synonyms,
+    seed) to the final transformed sentence, with hit counters.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
@@ -0,0 +1,229 @@
+"""
+Intra-document parallelism for large inputs.
+
+A large document is split at paragraph (or, failing that, sentence) boundaries
+into chunks that are transformed in a process pool, one preloaded humanizer per
+worker, and reassembled in order. Each chunk draws from its own RNG seeded from
+the request seed and the chunk index, so the output depends only on the text,
+the options and the seed - never on the pool size or on scheduling.
+"""
+
+import re
+import random
+import hashlib
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from transformer.logging_utils import configure_logging
+from transformer.timing import StageTimer
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+# Engine module and humanizer owned by each worker process, set by _init_worker
+_worker_module = None
+_worker_humanizer = None
+
+
+def split_into_chunks(text, max_chars):
+    """
+    Splits text into chunks of at most max_chars, breaking only between
+    paragraphs, or between sentences for paragraphs longer than max_chars.
+    A single sentence longer than max_chars becomes a chunk on its own.
+    """
+    # (separator to the previous piece, piece text)
+    pieces = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(('\n\n', paragraph))
+        else:
+            sentences = [s for s in SENTENCE_BREAK.split(paragraph) if s]
+            pieces.append(('\n\n', sentences[0]))
+            pieces.extend((' ', s) for s in sentences[1:])
+
+    chunks = []
+    current = ''
+    for separator, piece in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ''
+        current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def derive_seed(seed, index):
+    """Derives a stable 32-bit seed for a chunk from the request seed and chunk index."""
+    digest = hashlib.sha256(f"{seed}:{index}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big")
+
+
+def _init_worker(module_name, humanizer_kwargs):
+    """Process pool initializer: load the engine once per worker."""
+    global _worker_module, _worker_humanizer
+    configure_logging()
+    module = importlib.import_module(module_name)
+    module.download_nltk_resources()
+    _worker_module = module
+    _worker_humanizer = module.AcademicTextHumanizer(**humanizer_kwargs)
+
+
+def _chunk_statistics(text, transformed):
+    """Word and sentence counts, with the engine's own counters when it has them."""
+    if hasattr(_worker_module, "count_words"):
+        return {
+            "original_word_count": _worker_module.count_words(text),
+            "transformed_word_count": _worker_module.count_words(transformed),
+            "original_sentence_count": _worker_module.count_sentences(text),
+            "transformed_sentence_count": _worker_module.count_sentences(transformed),
+        }
+
+    from nltk.tokenize import word_tokenize
+
+    nlp = _worker_humanizer.nlp
+    return {
+        "original_word_count": len(word_tokenize(text, language='english', preserve_line=True)),
+        "transformed_word_count": len(word_tokenize(transformed, language='english', preserve_line=True)),
+        "original_sentence_count": len(list(_worker_humanizer.parse(text).sents)),
+        "transformed_sentence_count": len(list(nlp(transformed).sents)),
+    }
+
+
+def _humanize_chunk(task):
+    """Transform one chunk and return its text with word and sentence counts."""
+    text, use_passive, use_synonyms, seed, deadline = task
+    timer = StageTimer()
+    result = _worker_humanizer.humanize_text_with_status(
+        text,
+        use_passive=use_passive,
+        use_synonyms=use_synonyms,
+        rng=random.Random(seed),
+        deadline=deadline,
+        timer=timer
+    )
+    return {
+        "transformed_text": result.text,
+        "completed": result.completed,
+        "sentences_processed": result.sentences_processed,
+        **_chunk_statistics(text, result.text),
+        "timings": timer.to_dict(),
+    }
+
+
+class ParallelHumanizer:
+    """
+    Transforms large documents chunk by chunk across a process pool.
+    """
+
+    def __init__(
+        self,
+        workers,
+        module_name='transformer.app',
+        humanizer_kwargs=None,
+        chunk_chars=20000
+    ):
+        """
+        Args:
+            workers: Number of worker processes
+            module_name: Engine module providing AcademicTextHumanizer
+            humanizer_kwargs: Keyword arguments for each worker's humanizer
+            chunk_chars: Maximum chunk size in characters
+        """
+        self.workers = workers
+        self.chunk_chars = chunk_chars
+        # Spawned workers avoid inheriting torch/tokenizer thread state via fork
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(module_name, humanizer_kwargs or {})
+        )
+
+    def warm_up(self):
+        """Start every worker and load its humanizer ahead of the first request."""
+        list(self.executor.map(_humanize_chunk, [("Warm up.", False, False, 0, None)] * self.workers))
+
+    def transform_with_stats(self, text, use_passive=False, use_synonyms=False, seed=None,
+                             deadline=None, cancel_event=None, progress_callback=None):
+        """
+        Transform text in parallel chunks and return the joined text with
+        word and sentence counts summed over the chunks.
+
+        Workers stop at the deadline themselves. The cancel event cannot cross
+        the process boundary, so it is polled here: once set, chunks that have
+        not started are cancelled and kept unchanged. Either way "partial" is
+        True in the result.
+
+        progress_callback receives (sentences_processed, None) as chunks
+        finish; the total is not known until every chunk has been parsed.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+
+        chunks = split_into_chunks(text, self.chunk_chars)
+        futures = [
+            self.executor.submit(
+                _humanize_chunk, (chunk, use_passive, use_synonyms, derive_seed(seed, i), deadline)
+            )
+            for i, chunk in enumerate(chunks)
+        ]
+
+        pending = set(futures)
+        processed = 0
+        while pending:
+            done, pending = wait(pending, timeout=0.5)
+            if progress_callback is not None and done:
+                processed += sum(f.result()["sentences_processed"] for f in done if not f.cancelled())
+                progress_callback(processed, None)
+            if pending and cancel_event is not None and cancel_event.is_set():
+                for future in pending:
+                    future.cancel()
+                break
+
+        results = []
+        for chunk, future in zip(chunks, futures):
+            if future.cancelled():
+                results.append(self._unchanged_chunk(chunk))
+            else:
+                results.append(future.result())
+
+        stats = {
+            "transformed_text": ' '.join(r["transformed_text"] for r in results if r["transformed_text"].strip()),
+            "partial": not all(r["completed"] for r in results),
+        }
+        for key in ("original_word_count", "transformed_word_count",
+                    "original_sentence_count", "transformed_sentence_count"):
+            stats[key] = sum(r[key] for r in results)
+
+        # Stage times are summed over the chunks, i.e. worker time rather than wall time
+        timer = StageTimer()
+        for r in results:
+            timer.merge(r.get("timings", {}))
+        timer.count("parallel_chunks", len(chunks))
+        stats["timings"] = timer.to_dict()
+        return stats
+
+    @staticmethod
+    def _unchanged_chunk(chunk):
+        """Result entry for a chunk that was cancelled before it started."""
+        from nltk.tokenize import word_tokenize
+
+        words = len(word_tokenize(chunk, language='english', preserve_line=True))
+        sentences = len([s for s in SENTENCE_BREAK.split(chunk) if s.strip()])
+        return {
+            "transformed_text": chunk,
+            "completed": False,
+            "sentences_processed": 0,
+            "original_word_count": words,
+            "transformed_word_count": words,
+            "original_sentence_count": sentences,
+            "transformed_sentence_count": sentences,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
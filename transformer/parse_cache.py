@@ -0,0 +1,152 @@
+"""
+Cache of spaCy parses keyed by a hash of the text.
+
+Users often re-submit the same text with different options. A parse cache
+keeps recent Doc objects in an in-memory LRU and, optionally, serialized as
+DocBin files on disk, so a repeated text is deserialized instead of being run
+through the pipeline again. Keys include the pipeline name, version and
+components, so a different model never reuses stale parses.
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from transformer.logging_utils import events
+
+# Disk entries are pruned to max_disk_entries once every this many writes
+PRUNE_EVERY = 100
+
+
+class ParseCache:
+    """
+    In-memory LRU of parsed Docs backed by an optional DocBin directory.
+
+    Args:
+        nlp: spaCy pipeline used on a miss
+        max_size: Number of Docs kept in memory
+        directory: Directory for DocBin files, or None for memory only
+        max_disk_entries: Number of DocBin files kept in the directory
+    """
+
+    def __init__(self, nlp, max_size=256, directory=None, max_disk_entries=10000):
+        self.nlp = nlp
+        self.max_size = max_size
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self._docs = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        meta = getattr(nlp, "meta", {}) or {}
+        self._prefix = f"{meta.get('name')}|{meta.get('version')}|{','.join(nlp.pipe_names)}|"
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, text):
+        return hashlib.sha256((self._prefix + text).encode("utf-8")).hexdigest()
+
+    def parse(self, text):
+        """Returns the parse of text, from memory, disk or the pipeline."""
+        return self.lookup(text)[0]
+
+    def lookup(self, text):
+        """(doc, source) where source is "memory", "disk" or "miss"."""
+        key = self.key(text)
+
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None:
+                self._docs.move_to_end(key)
+                self.memory_hits += 1
+                return doc, "memory"
+
+        doc = self._load(key)
+        if doc is not None:
+            source = "disk"
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            source = "miss"
+            doc = self.nlp(text)
+            with self._lock:
+                self.misses += 1
+            self._store(key, doc)
+
+        with self._lock:
+            self._docs[key] = doc
+            while len(self._docs) > self.max_size:
+                self._docs.popitem(last=False)
+        return doc, source
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.spacy")
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        from spacy.tokens import DocBin
+        try:
+            doc_bin = DocBin().from_disk(path)
+        except Exception as e:
+            events.error("parse_cache_read_failed", "Error reading parse cache entry: %s", e)
+            return None
+        docs = list(doc_bin.get_docs(self.nlp.vocab))
+        return docs[0] if docs else None
+
+    def _store(self, key, doc):
+        if not self.directory:
+            return
+        from spacy.tokens import DocBin
+        doc_bin = DocBin(docs=[doc])
+        path = self._path(key)
+        # Write then rename so concurrent readers (and workers) never see partial files
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            doc_bin.to_disk(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            events.error("parse_cache_write_failed", "Error writing parse cache entry: %s", e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self._prune()
+
+    def _prune(self):
+        """Remove the oldest DocBin files beyond max_disk_entries."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".spacy")]
+        except OSError:
+            return
+        excess = len(entries) - self.max_disk_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._docs),
+                "max_size": self.max_size,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+            }
@@ -0,0 +1,280 @@
+"""
+Single-file snapshots of an initialized AcademicTextHumanizer.
+
+A new process normally runs spacy.load, the NLTK resource downloads and the
+SentenceTransformer construction (including hub lookups and, with quantize,
+the quantization check) before it can serve a request. A snapshot stores the
+result of that work in one zip archive:
+
+  - meta.json: format version, library versions and humanizer settings
+  - spacy/config.cfg, spacy/model.bin: the pipeline config and bytes
+  - model.pt: the (possibly quantized) sentence transformer, or
+    static/vectors.npy, static/vocab.txt, static/meta.json for a static
+    word-vector table, which is memory-mapped straight from the archive
+  - tables.json: contraction and transition tables
+  - wordnet/subset.bin: the WordNet synonym subset, if the humanizer uses
+    one, memory-mapped straight from the archive
+
+Members are stored uncompressed so they can be read or mapped without
+inflating. model.pt is a pickle: only load snapshots you built yourself.
+
+    python -m transformer.snapshot save humanizer.snapshot --model paraphrase-MiniLM-L6-v2
+    python -m transformer.snapshot info humanizer.snapshot
+
+and then AcademicTextHumanizer.from_snapshot("humanizer.snapshot").
+"""
+
+import io
+import os
+import json
+import time
+import struct
+import zipfile
+import argparse
+
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+META_MEMBER = "meta.json"
+SPACY_CONFIG_MEMBER = "spacy/config.cfg"
+SPACY_BYTES_MEMBER = "spacy/model.bin"
+MODEL_MEMBER = "model.pt"
+STATIC_PREFIX_MEMBER = "static/"
+TABLES_MEMBER = "tables.json"
+WORDNET_MEMBER = "wordnet/subset.bin"
+
+# Humanizer settings recorded in meta.json and reused by from_snapshot
+SETTINGS = (
+    "model_name", "quantize", "p_passive", "p_synonym_replacement",
+    "p_academic_transition", "batch_synonym_scoring", "pos_tagger",
+)
+
+# Size of a zip local file header before the file name and extra field
+_LOCAL_HEADER_SIZE = 30
+
+
+class Snapshot:
+    """
+    Components loaded from a snapshot archive.
+
+    Attributes:
+        path: Archive path
+        meta: Contents of meta.json (settings under "settings")
+        nlp: spaCy pipeline
+        model: Sentence transformer, StaticWordVectors or None
+        tables: Contraction and transition tables
+        wordnet_subset: WordNetSubset or None
+    """
+
+    def __init__(self, path, meta, nlp, model, tables, wordnet_subset=None):
+        self.path = path
+        self.meta = meta
+        self.nlp = nlp
+        self.model = model
+        self.tables = tables
+        self.wordnet_subset = wordnet_subset
+
+    @property
+    def settings(self):
+        return dict(self.meta.get("settings", {}))
+
+
+def save_snapshot(humanizer, path):
+    """
+    Writes an initialized AcademicTextHumanizer to a snapshot archive.
+    """
+    import spacy
+    from transformer.static_vectors import StaticWordVectors
+
+    model = humanizer.model
+    if model is None:
+        model_kind = None
+    elif isinstance(model, StaticWordVectors):
+        model_kind = "static"
+    else:
+        model_kind = "torch"
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "spacy_version": spacy.__version__,
+        "pipeline": {
+            "name": humanizer.nlp.meta.get("name"),
+            "version": humanizer.nlp.meta.get("version"),
+            "pipes": list(humanizer.nlp.pipe_names),
+        },
+        "model_kind": model_kind,
+        "quantization_agreement": humanizer.quantization_agreement,
+        "settings": {name: getattr(humanizer, name) for name in SETTINGS},
+    }
+    tables = {
+        "contraction_map": humanizer.contraction_map,
+        "academic_transitions": humanizer.academic_transitions,
+    }
+
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        archive.writestr(META_MEMBER, json.dumps(meta, indent=2))
+        archive.writestr(SPACY_CONFIG_MEMBER, humanizer.nlp.config.to_str())
+        archive.writestr(SPACY_BYTES_MEMBER, humanizer.nlp.to_bytes())
+        archive.writestr(TABLES_MEMBER, json.dumps(tables))
+
+        if model_kind == "static":
+            buffer = io.BytesIO()
+            np.save(buffer, np.ascontiguousarray(model.vectors))
+            archive.writestr(STATIC_PREFIX_MEMBER + "vectors.npy", buffer.getvalue())
+            vocab = sorted(model.vocab, key=model.vocab.get)
+            archive.writestr(STATIC_PREFIX_MEMBER + "vocab.txt", "\n".join(vocab))
+            archive.writestr(STATIC_PREFIX_MEMBER + "meta.json", json.dumps(model.meta))
+        elif model_kind == "torch":
+            import torch
+            buffer = io.BytesIO()
+            torch.save(model, buffer)
+            archive.writestr(MODEL_MEMBER, buffer.getvalue())
+
+        if humanizer.wordnet_subset is not None:
+            archive.writestr(WORDNET_MEMBER, humanizer.wordnet_subset.to_bytes())
+
+    # Renamed into place so a process starting meanwhile never loads half a snapshot
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_meta(path):
+    """meta.json of a snapshot, without loading anything else."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return json.loads(archive.read(META_MEMBER))
+    except (zipfile.BadZipFile, KeyError, EOFError) as e:
+        raise ValueError(f"{path} is not a valid humanizer snapshot: {e}") from e
+
+
+def load_snapshot(path):
+    """
+    Loads the components of a snapshot archive. Raises ValueError for
+    archives written by an unsupported format version, and for files that
+    are not zip archives, are truncated, fail a CRC check or lack a member.
+    """
+    try:
+        return _load_snapshot(path)
+    except (zipfile.BadZipFile, KeyError, EOFError) as e:
+        raise ValueError(f"{path} is not a valid humanizer snapshot: {e}") from e
+
+
+def _load_snapshot(path):
+    with zipfile.ZipFile(path) as archive:
+        meta = json.loads(archive.read(META_MEMBER))
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot version {meta.get('version')} in {path} (expected {SNAPSHOT_VERSION})"
+            )
+
+        import spacy
+        if meta.get("spacy_version") != spacy.__version__:
+            print(f"⚠️ Snapshot {path} was built with spaCy {meta.get('spacy_version')}, running {spacy.__version__}")
+
+        nlp = _load_spacy(archive.read(SPACY_CONFIG_MEMBER).decode("utf-8"), archive.read(SPACY_BYTES_MEMBER))
+        tables = json.loads(archive.read(TABLES_MEMBER))
+
+        model = None
+        if meta.get("model_kind") == "static":
+            model = _load_static_vectors(path, archive)
+        elif meta.get("model_kind") == "torch":
+            model = _load_torch_model(archive.read(MODEL_MEMBER))
+
+        wordnet_subset = None
+        if WORDNET_MEMBER in archive.namelist():
+            from transformer.wordnet_subset import WordNetSubset
+            info = archive.getinfo(WORDNET_MEMBER)
+            wordnet_subset = WordNetSubset(path, offset=_member_data_offset(path, info))
+
+    return Snapshot(path, meta, nlp, model, tables, wordnet_subset)
+
+
+def _load_spacy(config_text, data):
+    from spacy import util
+    from thinc.api import Config
+
+    config = Config().from_str(config_text)
+    lang_cls = util.get_lang_class(config["nlp"]["lang"])
+    nlp = lang_cls.from_config(config)
+    return nlp.from_bytes(data)
+
+
+def _load_torch_model(data):
+    import torch
+
+    map_location = None if torch.cuda.is_available() else "cpu"
+    return torch.load(io.BytesIO(data), map_location=map_location, weights_only=False)
+
+
+def _member_data_offset(path, info):
+    """File offset of an uncompressed member's data."""
+    with open(path, "rb") as f:
+        f.seek(info.header_offset)
+        header = f.read(_LOCAL_HEADER_SIZE)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    return info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length
+
+
+def map_npy_member(path, archive, name):
+    """
+    Memory-maps a .npy file stored uncompressed inside a zip archive.
+    Falls back to reading it into memory if the member is compressed.
+    """
+    info = archive.getinfo(name)
+    if info.compress_type != zipfile.ZIP_STORED:
+        return np.load(io.BytesIO(archive.read(name)))
+
+    offset = _member_data_offset(path, info)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode="r", offset=data_offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def _load_static_vectors(path, archive):
+    from transformer.static_vectors import StaticWordVectors
+
+    vectors = map_npy_member(path, archive, STATIC_PREFIX_MEMBER + "vectors.npy")
+    vocab_text = archive.read(STATIC_PREFIX_MEMBER + "vocab.txt").decode("utf-8")
+    meta = json.loads(archive.read(STATIC_PREFIX_MEMBER + "meta.json"))
+    return StaticWordVectors.from_arrays(vectors, vocab_text, meta, path=path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect AcademicTextHumanizer snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    save = subparsers.add_parser("save", help="Initialize a humanizer and write its snapshot")
+    save.add_argument("path")
+    save.add_argument("--model", default='paraphrase-MiniLM-L6-v2')
+    save.add_argument("--quantize", action="store_true")
+    info = subparsers.add_parser("info", help="Print a snapshot's metadata")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "save":
+        from transformer.app import AcademicTextHumanizer, download_nltk_resources
+
+        download_nltk_resources()
+        started = time.time()
+        humanizer = AcademicTextHumanizer(model_name=args.model, quantize=args.quantize)
+        print(f"🔄 Humanizer initialized in {time.time() - started:.2f}s, writing snapshot...")
+        save_snapshot(humanizer, args.path)
+
+        started = time.time()
+        AcademicTextHumanizer.from_snapshot(args.path)
+        print(f"✅ Snapshot written to {args.path} (loads in {time.time() - started:.2f}s)")
+    elif args.command == "info":
+        print(json.dumps(read_meta(args.path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
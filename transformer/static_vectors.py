@@ -0,0 +1,160 @@
+"""
+Static word-vector backend for synonym scoring.
+
+Synonym scoring only ever embeds single words, so running the full
+SentenceTransformer per request is unnecessary. This module distills the
+transformer's embeddings for the WordNet lemma vocabulary into a float16
+table that is memory-mapped at load time; scoring becomes a row lookup and a
+dot product, and torch is never imported while serving.
+
+Select it through AcademicTextHumanizer's model_name parameter:
+
+    AcademicTextHumanizer(model_name="static:/path/to/table")
+
+Build a table (requires sentence-transformers and the WordNet corpus):
+
+    python -m transformer.static_vectors build /path/to/table
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+
+STATIC_PREFIX = "static:"
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.txt"
+META_FILE = "meta.json"
+
+
+class StaticWordVectors:
+    """
+    Memory-mapped table of unit-length word embeddings with a
+    SentenceTransformer-compatible encode() method.
+
+    Words missing from the table are looked up by lowercase form and then by
+    their WordNet base form; anything still unknown embeds as a zero vector,
+    which scores 0 against every candidate and is therefore never replaced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(path, VOCAB_FILE), encoding="utf-8") as f:
+            self.vocab = {word: i for i, word in enumerate(f.read().split("\n")) if word}
+
+        meta_path = os.path.join(path, META_FILE)
+        self.meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+        self.morphy = None
+
+    @classmethod
+    def from_arrays(cls, vectors, vocab_text, meta=None, path=None):
+        """
+        Table from an already loaded (or memory-mapped) vector array and the
+        newline-separated vocabulary, e.g. read from a humanizer snapshot.
+        """
+        table = cls.__new__(cls)
+        table.path = path
+        table.vectors = vectors
+        table.vocab = {word: i for i, word in enumerate(vocab_text.split("\n")) if word}
+        table.meta = meta or {}
+        table.morphy = None
+        return table
+
+    def get_sentence_embedding_dimension(self):
+        return self.vectors.shape[1]
+
+    def _row(self, text):
+        row = self.vocab.get(text)
+        if row is None:
+            row = self.vocab.get(text.lower())
+        if row is None:
+            # A WordNet subset's morphy (set by the humanizer) avoids loading the corpus
+            morphy = self.morphy
+            if morphy is None:
+                from nltk.corpus import wordnet
+                morphy = wordnet.morphy
+            base = morphy(text.lower())
+            if base:
+                row = self.vocab.get(base.replace('_', ' '))
+        return row
+
+    def encode(self, sentences, normalize_embeddings=False, **kwargs):
+        """
+        Embed words by table lookup. Rows are stored normalised, so
+        normalize_embeddings is accepted for compatibility and has no effect.
+        """
+        single = isinstance(sentences, str)
+        words = [sentences] if single else list(sentences)
+
+        embeddings = np.zeros((len(words), self.vectors.shape[1]), dtype=np.float32)
+        for i, word in enumerate(words):
+            row = self._row(word)
+            if row is not None:
+                embeddings[i] = self.vectors[row]
+
+        return embeddings[0] if single else embeddings
+
+
+def build_static_vectors(output_dir, model_name='paraphrase-MiniLM-L6-v2', batch_size=512):
+    """
+    Distill a SentenceTransformer into a static table over the WordNet lemma vocabulary.
+    """
+    from nltk.corpus import wordnet
+    from sentence_transformers import SentenceTransformer
+
+    vocab = sorted({name.replace('_', ' ') for name in wordnet.all_lemma_names()})
+    print(f"🔄 Encoding {len(vocab)} WordNet lemmas with {model_name}...")
+
+    model = SentenceTransformer(model_name)
+    vectors = model.encode(
+        vocab,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        show_progress_bar=True,
+        convert_to_numpy=True
+    )
+
+    write_static_vectors(output_dir, vocab, vectors, model_name)
+    print(f"✅ Static word vectors written to {output_dir}")
+    return output_dir
+
+
+def write_static_vectors(output_dir, vocab, vectors, model_name=None):
+    """
+    Writes a table directory. Rows are scaled to unit length (zero rows stay
+    zero) before they are stored as float16.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = (vectors / np.where(norms > 0, norms, 1)).astype(np.float16)
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, VECTORS_FILE), vectors)
+    with open(os.path.join(output_dir, VOCAB_FILE), "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab))
+    with open(os.path.join(output_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"model_name": model_name, "dimension": int(vectors.shape[1]), "size": len(vocab)}, f)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a static word-vector table for synonym scoring")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Distill a SentenceTransformer over the WordNet vocabulary")
+    build.add_argument("output_dir")
+    build.add_argument("--model", default='paraphrase-MiniLM-L6-v2')
+    build.add_argument("--batch-size", type=int, default=512)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_static_vectors(args.output_dir, args.model, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
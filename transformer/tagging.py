@@ -0,0 +1,78 @@
+"""
+Part-of-speech tagging for synonym replacement.
+
+Two paths are provided:
+  - A process-wide NLTK perceptron tagger (the default), created and loaded
+    once. nltk.pos_tag() in NLTK 3.8.1, which requirements_no_models.txt pins,
+    builds and loads a new PerceptronTagger on every call; 3.9.1 caches one in
+    nltk.tag._get_tagger. The shared instance costs the same on both.
+  - Reuse of the Penn Treebank tags spaCy already computed for a sentence in
+    humanize_text, aligned onto the NLTK tokens of the transformed sentence,
+    so synonym mode needs no second tagger at all. spaCy tags the original
+    sentence, before the contraction, transition and passive rewrites, so its
+    tags can differ from NLTK's and change which words get synonyms; it is
+    opt-in (pos_tagger="spacy").
+"""
+
+import threading
+from difflib import SequenceMatcher
+
+_TAGGER = None
+_TAGGER_LOCK = threading.Lock()
+
+# Tags for tokens the pipeline itself inserts (contraction expansions, passive
+# auxiliaries, academic transitions), which have no counterpart in the spaCy parse
+INSERTED_TOKEN_TAGS = {
+    "not": "RB", "do": "VBP", "will": "MD", "would": "MD", "cannot": "MD",
+    "should": "MD", "could": "MD", "are": "VBP", "is": "VBZ", "am": "VBP",
+    "have": "VBP", "has": "VBZ", "had": "VBD", "was": "VBD", "were": "VBD",
+    "been": "VBN", "by": "IN", ",": ",",
+    "moreover": "RB", "additionally": "RB", "furthermore": "RB", "hence": "RB",
+    "therefore": "RB", "consequently": "RB", "nonetheless": "RB", "nevertheless": "RB",
+}
+
+
+def get_pos_tagger():
+    """
+    Returns the shared NLTK perceptron tagger, loading it on first use.
+    """
+    global _TAGGER
+    if _TAGGER is None:
+        with _TAGGER_LOCK:
+            if _TAGGER is None:
+                from nltk.tag import PerceptronTagger
+                _TAGGER = PerceptronTagger()
+    return _TAGGER
+
+
+def pos_tag(tokens):
+    """
+    Tags tokens with the shared perceptron tagger; same output as nltk.pos_tag(tokens).
+    """
+    return get_pos_tagger().tag(tokens)
+
+
+def align_tags(tokens, reference):
+    """
+    Tags tokens using a reference tagging of (mostly) the same sentence.
+
+    Args:
+        tokens: Tokens to tag
+        reference: (text, tag) pairs, e.g. from a spaCy span
+
+    Returns:
+        (token, tag) pairs. Tokens matched case-insensitively to a reference
+        token take its tag; unmatched tokens take INSERTED_TOKEN_TAGS or ''.
+    """
+    matcher = SequenceMatcher(
+        a=[token.lower() for token in tokens],
+        b=[text.lower() for text, _ in reference],
+        autojunk=False
+    )
+
+    tags = [INSERTED_TOKEN_TAGS.get(token.lower(), '') for token in tokens]
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            tags[block.a + offset] = reference[block.b + offset][1]
+
+    return list(zip(tokens, tags))
@@ -0,0 +1,56 @@
+"""
+Per-request stage timings and cache counters.
+
+Engines accept an optional StageTimer in humanize_text_with_status and time
+each stage (parse, contractions, transitions, passive voice, synonyms) with
+it, summed over the sentences of the request, and count cache hits. Without
+a timer they use NULL_TIMER, which does nothing.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class StageTimer:
+    """Accumulates seconds per stage name and counts per counter name."""
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.counts = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - started
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    def merge(self, timings):
+        """Adds the stages and counts of another timer's to_dict()."""
+        for name, ms in timings.get("stages_ms", {}).items():
+            self.seconds[name] += ms / 1000
+        self.counts.update(timings.get("counts", {}))
+
+    def to_dict(self):
+        return {
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.seconds.items()},
+            "counts": dict(self.counts),
+        }
+
+
+class _NullTimer:
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL_TIMER = _NullTimer()
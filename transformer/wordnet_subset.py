@@ -0,0 +1,322 @@
+"""
+Compact, memory-mapped subset of WordNet for synonym lookup.
+
+The full engine only asks WordNet two things: whether a word has any synsets,
+and which lemma names share a synset with it for a part of speech. The first
+such call in a process makes NLTK parse the whole WordNet index and exception
+files, which adds seconds to that request. This module stores exactly the data
+those two calls need - lemma form -> synonym lemma names per part of speech,
+plus the exception lists - in one pre-indexed binary file that is opened with
+a single mmap. Inflected forms are reduced the way nltk.corpus.wordnet does
+it in the NLTK version the full engine pins (3.9): the exception list when the
+form is in it, otherwise one pass of the suffix rules, so lookups return the
+same synonyms as that version. Older NLTK releases kept applying the rules
+while a pass found nothing, and there a few multiply-suffixed forms resolve
+where they do not here.
+
+Build (requires the NLTK WordNet corpus):
+
+    python -m transformer.wordnet_subset build wordnet_subset.bin
+
+and pass the path as AcademicTextHumanizer(wordnet_subset=...).
+
+File layout (little endian): b"HWS1", uint32 format version, uint64 length of
+a JSON header, the JSON header (exception lists, counts and section offsets
+relative to the data area), then from the next multiple of 8 the data area of
+8-byte aligned uint32/byte sections:
+
+    key_offsets, key_blob       sorted keys b"<pos> <form>"
+    value_offsets, value_ids    synonym string ids for each key
+    string_offsets, string_blob synonym lemma names
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import bisect
+import argparse
+
+import numpy as np
+
+MAGIC = b"HWS1"
+FORMAT_VERSION = 1
+PREFIX = struct.Struct("<4sIQ")
+
+# WordNet parts of speech, in nltk's POS_LIST order
+POS_LIST = ["n", "v", "a", "r"]
+
+# Penn Treebank tag prefix -> WordNet part of speech
+PENN_TO_WORDNET = {"J": "a", "N": "n", "R": "r", "V": "v"}
+
+# WordNet's morphy suffix rules (nltk WordNetCorpusReader.MORPHOLOGICAL_SUBSTITUTIONS)
+MORPHOLOGICAL_SUBSTITUTIONS = {
+    "n": [("s", ""), ("ses", "s"), ("ves", "f"), ("xes", "x"), ("zes", "z"),
+          ("ches", "ch"), ("shes", "sh"), ("men", "man"), ("ies", "y")],
+    "v": [("s", ""), ("ies", "y"), ("es", "e"), ("es", ""), ("ed", "e"),
+          ("ed", ""), ("ing", "e"), ("ing", "")],
+    "a": [("er", ""), ("est", ""), ("er", "e"), ("est", "e")],
+    "r": [],
+}
+
+_SECTIONS = ("key_offsets", "key_blob", "value_offsets", "value_ids", "string_offsets", "string_blob")
+
+# Exception list file names in the WordNet corpus
+_EXCEPTION_FILES = {"n": "noun.exc", "v": "verb.exc", "a": "adj.exc", "r": "adv.exc"}
+
+
+class _Keys:
+    """Sequence view of the sorted key blob, for bisect."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+
+class WordNetSubset:
+    """
+    Read-only synonym index in a memory-mapped file.
+
+    Args:
+        path: File written by build_wordnet_subset
+        offset: Byte offset of the index inside path (non-zero when it is
+            stored inside another archive, such as a humanizer snapshot)
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.offset = offset
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        # Views into the map, released by close() before the map itself
+        self._views = [buf]
+
+        magic, version, header_length = PREFIX.unpack_from(buf, offset)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} WordNet subset")
+        start = offset + PREFIX.size
+        self.header = json.loads(bytes(buf[start:start + header_length]))
+        data_start = offset + _align(PREFIX.size + header_length)
+        self.size = data_start - offset + max(start + length for start, length in self.header["sections"].values())
+
+        sections = {}
+        for name in _SECTIONS:
+            section_offset, length = self.header["sections"][name]
+            data = buf[data_start + section_offset:data_start + section_offset + length]
+            self._views.append(data)
+            if name.endswith("blob"):
+                sections[name] = data
+            elif sys.byteorder == "little":
+                # Cast in place; indexing a memoryview is cheaper than indexing numpy arrays
+                sections[name] = data.cast("I")
+                self._views.append(sections[name])
+            else:
+                sections[name] = np.frombuffer(data, dtype="<u4").tolist()
+
+        self._keys = _Keys(sections["key_offsets"], sections["key_blob"])
+        self._value_offsets = sections["value_offsets"]
+        self._value_ids = sections["value_ids"]
+        self._string_offsets = sections["string_offsets"]
+        self._string_blob = sections["string_blob"]
+        self.exceptions = self.header["exceptions"]
+
+    def __reduce__(self):
+        # Worker processes map the file again instead of copying it
+        return (self.__class__, (self.path, self.offset))
+
+    def _find(self, pos, form):
+        key = f"{pos} {form}".encode("utf-8")
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return i
+        return None
+
+    def _string(self, i):
+        return bytes(self._string_blob[self._string_offsets[i]:self._string_offsets[i + 1]]).decode("utf-8")
+
+    def _morphy(self, form, pos):
+        """
+        (base form, key index) of each base form of a lowercase form present
+        for pos, in the order of nltk's _morphy. The suffix rules are applied
+        once, as in NLTK 3.9; see the module docstring.
+        """
+        exceptions = self.exceptions.get(pos, {})
+        if form in exceptions:
+            forms = exceptions[form]
+        else:
+            forms = [
+                form[:-len(old)] + new
+                for old, new in MORPHOLOGICAL_SUBSTITUTIONS[pos]
+                if form.endswith(old)
+            ]
+
+        result = []
+        seen = set()
+        for candidate in [form] + forms:
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            i = self._find(pos, candidate)
+            if i is not None:
+                result.append((candidate, i))
+        return result
+
+    def morphy(self, form, pos=None):
+        """First base form of form in WordNet, or None (like wordnet.morphy)."""
+        for p in [pos] if pos else POS_LIST:
+            analyses = self._morphy(form.lower(), p)
+            if analyses:
+                return analyses[0][0]
+        return None
+
+    def has_synsets(self, word, pos=None):
+        """True if wordnet.synsets(word, pos) would return anything."""
+        word = word.lower()
+        return any(self._morphy(word, p) for p in ([pos] if pos else POS_LIST))
+
+    def lemma_names(self, word, pos=None):
+        """
+        Lemma names (spaces for underscores) of every synset of word, as
+        wordnet.synsets(word, pos) followed by syn.lemmas() would give them.
+        """
+        word = word.lower()
+        names = []
+        for p in [pos] if pos else POS_LIST:
+            for _, i in self._morphy(word, p):
+                for string_id in self._value_ids[self._value_offsets[i]:self._value_offsets[i + 1]]:
+                    names.append(self._string(string_id))
+        return names
+
+    def to_bytes(self):
+        """The index as written by write_wordnet_subset."""
+        return bytes(self._mmap[self.offset:self.offset + self.size])
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "keys": len(self._keys),
+            "strings": len(self._string_offsets) - 1,
+            "wordnet_version": self.header.get("wordnet_version"),
+        }
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._mmap.close()
+
+
+def _align(position):
+    return position + -position % 8
+
+
+def _pack(entries):
+    """Offsets (uint32, n + 1) and concatenated bytes of a list of byte strings."""
+    offsets = np.zeros(len(entries) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(entry) for entry in entries])
+    return offsets.tobytes(), b"".join(entries)
+
+
+def write_wordnet_subset(path, table, exceptions, wordnet_version=None):
+    """
+    Writes a subset file.
+
+    Args:
+        path: Output path
+        table: {(pos, form): [synonym lemma names]}
+        exceptions: {pos: {inflected form: [base forms]}}
+        wordnet_version: Recorded in the header
+    """
+    keys = sorted(table, key=lambda key: f"{key[0]} {key[1]}".encode("utf-8"))
+    strings = sorted({name for names in table.values() for name in names})
+    string_ids = {name: i for i, name in enumerate(strings)}
+
+    value_ids = []
+    value_offsets = [0]
+    for key in keys:
+        value_ids.extend(string_ids[name] for name in table[key])
+        value_offsets.append(len(value_ids))
+
+    data = {}
+    data["key_offsets"], data["key_blob"] = _pack([f"{pos} {form}".encode("utf-8") for pos, form in keys])
+    data["value_offsets"] = np.asarray(value_offsets, dtype="<u4").tobytes()
+    data["value_ids"] = np.asarray(value_ids, dtype="<u4").tobytes()
+    data["string_offsets"], data["string_blob"] = _pack([name.encode("utf-8") for name in strings])
+
+    sections = {}
+    position = 0
+    for name in _SECTIONS:
+        sections[name] = [position, len(data[name])]
+        position = _align(position + len(data[name]))
+
+    header = json.dumps({
+        "sections": sections,
+        "exceptions": exceptions,
+        "wordnet_version": wordnet_version,
+        "keys": len(keys),
+        "strings": len(strings),
+    }).encode("utf-8")
+    data_start = _align(PREFIX.size + len(header))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name in _SECTIONS:
+            f.write(b"\0" * (data_start + sections[name][0] - f.tell()))
+            f.write(data[name])
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_wordnet_subset(path):
+    """Extracts the synonym index from the NLTK WordNet corpus."""
+    from nltk.corpus import wordnet
+
+    wordnet.ensure_loaded()
+    table = {}
+    for pos in POS_LIST:
+        for form in wordnet.all_lemma_names(pos=pos):
+            names = []
+            # Synsets listing this exact form, i.e. the index entry for (form, pos)
+            for lemma in wordnet.lemmas(form, pos=pos):
+                for synonym in lemma.synset().lemmas():
+                    name = synonym.name().replace('_', ' ')
+                    if name not in names:
+                        names.append(name)
+            table[(pos, form)] = names
+
+    exceptions = {}
+    for pos, filename in _EXCEPTION_FILES.items():
+        exceptions[pos] = {}
+        with wordnet.open(filename) as f:
+            for line in f:
+                terms = line.split()
+                if terms:
+                    exceptions[pos][terms[0]] = terms[1:]
+
+    print(f"🔄 Writing {len(table)} WordNet entries to {path}...")
+    return write_wordnet_subset(path, table, exceptions, wordnet_version=wordnet.get_version())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped WordNet synonym subset")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Extract the subset from the NLTK WordNet corpus")
+    build.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_wordnet_subset(args.path)
+        print(f"✅ WordNet subset written to {args.path} ({os.path.getsize(args.path) / 1e6:.1f}MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Bounded ingestion for transform requests
+
+Two limits apply, at different points:
+
+  - BodySizeLimitMiddleware caps the raw body of the transform endpoints at
+    MAX_UPLOAD_BYTES before FastAPI parses it. This is the only limit
+    enforced before the body is received.
+  - The per-tier byte and word limits need the tier, which is a form field
+    or JSON field of the body itself, so they are checked after parsing.
+    For uploads Starlette has by then spooled the file (in memory up to
+    1MB, then to a temporary file), so a guest upload can still take up to
+    MAX_UPLOAD_BYTES of spool before its 256KB limit applies.
+    read_upload_text then reads the spooled file in chunks through an
+    incremental UTF-8 decoder and stops at the tier's limit, so the decoded
+    text held in memory never exceeds it.
+"""
+
+import codecs
+import json
+from typing import NamedTuple
+
+# Hard cap on any transform request body, matching the advertised max file size
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Allowance for multipart boundaries, headers and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class UploadLimit(NamedTuple):
+    max_bytes: int
+    max_words: int
+
+
+TIER_LIMITS = {
+    "guest": UploadLimit(256 * 1024, 5000),
+    "free": UploadLimit(1024 * 1024, 20000),
+    "pro": UploadLimit(5 * 1024 * 1024, 200000),
+    "pro_plus": UploadLimit(MAX_UPLOAD_BYTES, 1000000),
+}
+
+# The tier comes from the client, so requests that leave it out or name an
+# unknown one get the strictest limits rather than the largest
+DEFAULT_TIER = "guest"
+
+
+class UploadTooLarge(Exception):
+    """Raised when a request passes its byte or word limit."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def resolve_tier(tier=None):
+    """Known tier name for a client-supplied tier; unknown or missing tiers are DEFAULT_TIER."""
+    if tier and tier.lower() in TIER_LIMITS:
+        return tier.lower()
+    return DEFAULT_TIER
+
+
+def limits_for(tier=None):
+    """Limits for a tier name; unknown or missing tiers get the DEFAULT_TIER limits."""
+    return TIER_LIMITS[resolve_tier(tier)]
+
+
+def format_bytes(size):
+    """Human-readable size, e.g. 10MB or 256KB."""
+    for unit, scale in (("MB", 1024 * 1024), ("KB", 1024)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return f"{size}B"
+
+
+def _too_many_bytes(limits):
+    return UploadTooLarge(f"Request exceeds the {format_bytes(limits.max_bytes)} size limit for this tier")
+
+
+def _too_many_words(limits):
+    return UploadTooLarge(f"Request exceeds the {limits.max_words} word limit for this tier")
+
+
+def check_text(text, limits):
+    """Enforce limits on text that has already been received (JSON requests)."""
+    if len(text.encode('utf-8')) > limits.max_bytes:
+        raise _too_many_bytes(limits)
+    if len(text.split()) > limits.max_words:
+        raise _too_many_words(limits)
+
+
+async def read_upload_text(upload, limits, chunk_size=READ_CHUNK_BYTES):
+    """
+    Read an UploadFile as UTF-8 text, chunk by chunk, raising UploadTooLarge
+    as soon as the byte or word limit is passed. Invalid UTF-8 is dropped, as
+    with decode(errors='ignore'). The upload has already been spooled by the
+    form parser; only the raw body cap applies before that.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    parts = []
+    size = 0
+    words = 0
+    in_word = False
+
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+
+        size += len(chunk)
+        if size > limits.max_bytes:
+            raise _too_many_bytes(limits)
+
+        text = decoder.decode(chunk)
+        if text:
+            words += len(text.split())
+            # A word split across chunks was counted twice
+            if in_word and not text[0].isspace():
+                words -= 1
+            in_word = not text[-1].isspace()
+            if words > limits.max_words:
+                raise _too_many_words(limits)
+            parts.append(text)
+
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects requests to the given paths whose body is larger than max_bytes
+    (plus overhead_bytes for multipart framing) with 413, using Content-Length when present and counting streamed bytes
+    otherwise, so oversized bodies are never buffered in full.
+
+    A streamed body that passes the limit gets the 413 straight away; the
+    application then sees a client disconnect and its response is dropped.
+    """
+
+    def __init__(self, app, max_bytes, paths, overhead_bytes=MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + overhead_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.limit:
+            await self._reject(send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    rejected = True
+                    await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    async def _reject(self, send):
+        body = json.dumps({
+            "detail": f"Request body exceeds the {format_bytes(self.max_bytes)} limit"
+        }).encode('utf-8')
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode('ascii')),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})